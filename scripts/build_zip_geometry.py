@@ -0,0 +1,153 @@
+"""
+Build derived zip geometry from public/data/sd_zipcodes.json.
+
+Outputs:
+  public/data/sd_zipcodes.topo.json   quantized TopoJSON for the map dashboard;
+                                      borders shared by neighbouring zips are
+                                      stored once as arcs
+  scripts/.cache/geo/sd_zipcodes.zidx binary index memory-mapped by geo_index
+
+Run after sd_zipcodes.json changes. The Python index also rebuilds itself on
+demand; the TopoJSON must be regenerated with this script.
+"""
+import json
+
+from geo_index import ZIP_GEOJSON, ZIP_INDEX_BIN, build_zip_index
+
+TOPOJSON_PATH = ZIP_GEOJSON.with_name('sd_zipcodes.topo.json')
+OBJECT_NAME = 'zipcodes'
+
+# Grid steps per axis. The source coordinates are on a 0.01 degree grid, so
+# 1e5 steps over the county (~2 degrees) is lossless for display.
+QUANTIZATION = 100_000
+
+
+def _dedupe(points):
+    """Drop consecutive repeats (quantization can merge points), keeping the ring closed."""
+    out = [points[0]]
+    for p in points[1:]:
+        if p != out[-1]:
+            out.append(p)
+    if out[0] != out[-1]:
+        out.append(out[0])
+    return out
+
+
+def _rotate_to_min(pts):
+    i = pts.index(min(pts))
+    return pts[i:] + pts[:i]
+
+
+class ArcBuilder:
+    """Cuts quantized rings into arcs at junctions and stores each arc once.
+
+    A point is a junction when it has different neighbours in different
+    rings (where two borders meet or diverge). Arcs between junctions that
+    another ring already produced, in either direction, are reused; a
+    reversed reuse is written as ~index, per the TopoJSON spec.
+    """
+
+    def __init__(self, rings):
+        self.neighbours = {}
+        for ring in rings:
+            pts = ring[:-1]
+            n = len(pts)
+            for i, p in enumerate(pts):
+                self.neighbours.setdefault(p, set()).add(frozenset((pts[i - 1], pts[(i + 1) % n])))
+        self.arcs = []
+        self.index = {}
+
+    def _add(self, arc):
+        key = tuple(arc)
+        if key in self.index:
+            return self.index[key]
+        rev = key[::-1]
+        if rev in self.index:
+            return ~self.index[rev]
+        self.index[key] = len(self.arcs)
+        self.arcs.append(arc)
+        return self.index[key]
+
+    def ring_arcs(self, ring):
+        pts = ring[:-1]
+        cuts = [i for i, p in enumerate(pts) if len(self.neighbours[p]) > 1]
+        if not cuts:
+            # Free-standing ring: one closed arc from a canonical start point
+            fwd = _rotate_to_min(pts)
+            rev = _rotate_to_min(pts[::-1])
+            if tuple(rev + rev[:1]) in self.index:
+                return [~self.index[tuple(rev + rev[:1])]]
+            return [self._add(fwd + fwd[:1])]
+        start = cuts[0]
+        pts = pts[start:] + pts[:start]
+        cuts = [c - start for c in cuts] + [len(pts)]
+        pts = pts + pts[:1]
+        return [self._add(pts[a:b + 1]) for a, b in zip(cuts, cuts[1:])]
+
+
+def build_topology(geojson, quantization=QUANTIZATION):
+    """Quantized, delta-encoded TopoJSON Topology for a FeatureCollection of (Multi)Polygons."""
+    coords = [pt for f in geojson['features'] for poly in _polygons(f['geometry']) for ring in poly for pt in ring]
+    xs, ys = [c[0] for c in coords], [c[1] for c in coords]
+    x0, y0 = min(xs), min(ys)
+    kx = (max(xs) - x0) / (quantization - 1) or 1
+    ky = (max(ys) - y0) / (quantization - 1) or 1
+
+    def quantize(ring):
+        return _dedupe([(round((x - x0) / kx), round((y - y0) / ky)) for x, y in ring])
+
+    features = []
+    for f in geojson['features']:
+        polys = [[quantize(ring) for ring in poly] for poly in _polygons(f['geometry'])]
+        features.append((f, polys))
+
+    builder = ArcBuilder([ring for _, polys in features for poly in polys for ring in poly])
+    geometries = []
+    for f, polys in features:
+        arcs = [[builder.ring_arcs(ring) for ring in poly] for poly in polys]
+        geom = {'type': 'MultiPolygon', 'arcs': arcs} if len(arcs) != 1 else {'type': 'Polygon', 'arcs': arcs[0]}
+        geom['properties'] = f['properties']
+        geometries.append(geom)
+
+    encoded = []
+    for arc in builder.arcs:
+        prev = (0, 0)
+        deltas = []
+        for p in arc:
+            deltas.append([p[0] - prev[0], p[1] - prev[1]])
+            prev = p
+        encoded.append(deltas)
+
+    return {
+        'type': 'Topology',
+        'transform': {'scale': [kx, ky], 'translate': [x0, y0]},
+        'objects': {OBJECT_NAME: {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': encoded,
+    }
+
+
+def _polygons(geom):
+    if geom['type'] == 'Polygon':
+        return [geom['coordinates']]
+    if geom['type'] == 'MultiPolygon':
+        return geom['coordinates']
+    return []
+
+
+def main():
+    with open(ZIP_GEOJSON) as f:
+        geojson = json.load(f)
+
+    topology = build_topology(geojson)
+    with open(TOPOJSON_PATH, 'w') as f:
+        json.dump(topology, f, separators=(',', ':'))
+    n_points = sum(len(a) for a in topology['arcs'])
+    print(f"Wrote {TOPOJSON_PATH.name}: {len(topology['arcs'])} arcs, {n_points} points, "
+          f"{TOPOJSON_PATH.stat().st_size / 1024:.1f} KB (GeoJSON {ZIP_GEOJSON.stat().st_size / 1024:.1f} KB)")
+
+    build_zip_index(ZIP_GEOJSON, ZIP_INDEX_BIN)
+    print(f"Wrote {ZIP_INDEX_BIN}")
+
+
+if __name__ == '__main__':
+    main()
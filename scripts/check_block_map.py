@@ -1,13 +1,13 @@
 
-import urllib.request
 import csv
 
+import http_cache
+
 url = 'https://statewidedatabase.org/pub/data/G24/c073/c073_g24_sr_blk_map.csv'
 print(f"Checking {url}")
 try:
-    with urllib.request.urlopen(url) as response:
-        content = response.read().decode('utf-8')
-        reader = csv.reader(content.splitlines())
+    with http_cache.open_text(url) as lines:
+        reader = csv.reader(lines)
         headers = next(reader)
         print(f"Headers: {headers}")
         for i, row in enumerate(reader):
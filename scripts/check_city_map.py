@@ -1,13 +1,13 @@
 
-import urllib.request
 import csv
 
+import http_cache
+
 url = 'https://statewidedatabase.org/pub/data/G24/c073/c073_g24_srprec_to_city.csv'
 print(f"Checking {url}")
 try:
-    with urllib.request.urlopen(url) as response:
-        content = response.read().decode('utf-8')
-        reader = csv.reader(content.splitlines())
+    with http_cache.open_text(url) as lines:
+        reader = csv.reader(lines)
         headers = next(reader)
         print(f"Headers: {headers}")
         # Print first few rows to see content
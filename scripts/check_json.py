@@ -2,7 +2,7 @@
 import json
 from pathlib import Path
 
-path = Path('public/data/voting_data.json')
+path = Path('public/data/voting/index.json')
 try:
     with open(path, 'r') as f:
         data = json.load(f)
@@ -1,13 +1,8 @@
 import os
 import re
 import json
-import traceback
-import sys
-try:
-    import pdfplumber
-except ImportError:
-    print("pdfplumber not installed")
-    sys.exit(1)
+
+from sdar_common import extract_page_texts, map_pdfs
 
 MONTHS = {
     'Jan': 1, 'January': 1,
@@ -62,76 +57,83 @@ def extract_metric(text, metric_name):
     
     return None
 
+def extract_data_point(pdf_path):
+    """Parse one Monthly Indicators PDF (named e.g. "April 2017.pdf") into a history point, or None."""
+    filename = os.path.basename(pdf_path)
+    # Extract month and year from filename, e.g., "April 2017.pdf", "Dec 2025.pdf"
+    name_parts = os.path.splitext(filename)[0].split()
+    if len(name_parts) < 2:
+        print(f"Skipping {filename}: unexpected name format.")
+        return None
+        
+    month_str = name_parts[0]
+    year_str = name_parts[1]
+    
+    try:
+        year = int(year_str)
+        month = MONTHS.get(month_str[:3].capitalize(), 1) # Default to 1 if not found
+    except ValueError:
+        print(f"Skipping {filename}: could not parse year/month.")
+        return None
+    
+    data_point = {
+        'period': f"{year}-{month:02d}",
+        'year': year,
+        'month': month,
+        'monthName': month_str,
+        'detached': {},
+        'attached': {}
+    }
+    
+    try:
+        # Page 1 (index 0) = Cover / Market Snapshot
+        # Page 2 (index 1) = Detached Market Overview
+        # Page 3 (index 2) = Attached Market Overview
+        pages = extract_page_texts(pdf_path, [1, 2])
+        
+        if len(pages) > 1:
+            text_detached = pages[1]
+            data_point['detached'] = {
+                'medianPrice': extract_metric(text_detached, "Median Sales Price"),
+                'closedSales': extract_metric(text_detached, "Closed Sales"),
+                'inventory': extract_metric(text_detached, "Inventory of Homes for Sale"),
+                'monthsSupply': extract_metric(text_detached, "Months Supply of Inventory"),
+                'daysOnMarket': extract_metric(text_detached, "Days on Market Until Sale"),
+                'newListings': extract_metric(text_detached, "New Listings")
+            }
+            
+        if len(pages) > 2:
+            text_attached = pages[2]
+            data_point['attached'] = {
+                'medianPrice': extract_metric(text_attached, "Median Sales Price"),
+                'closedSales': extract_metric(text_attached, "Closed Sales"),
+                'inventory': extract_metric(text_attached, "Inventory of Homes for Sale"),
+                'monthsSupply': extract_metric(text_attached, "Months Supply of Inventory"),
+                'daysOnMarket': extract_metric(text_attached, "Days on Market Until Sale"),
+                'newListings': extract_metric(text_attached, "New Listings")
+            }
+                
+    except Exception as e:
+        print(f"Error extracting {filename}: {e}")
+        return None
+    
+    return data_point
+
 def process_pdfs(directory_path, output_json):
     history = []
     
     if not os.path.exists(directory_path):
         print(f"Directory not found: {directory_path}")
-        return
+        return None
         
     files = [f for f in os.listdir(directory_path) if f.lower().endswith('.pdf')]
     print(f"Found {len(files)} PDFs. Processing...")
     
-    for filename in sorted(files):
-        # Extract month and year from filename, e.g., "April 2017.pdf", "Dec 2025.pdf"
-        name_parts = os.path.splitext(filename)[0].split()
-        if len(name_parts) < 2:
-            print(f"Skipping {filename}: unexpected name format.")
-            continue
-            
-        month_str = name_parts[0]
-        year_str = name_parts[1]
-        
-        try:
-            year = int(year_str)
-            month = MONTHS.get(month_str[:3].capitalize(), 1) # Default to 1 if not found
-        except ValueError:
-            print(f"Skipping {filename}: could not parse year/month.")
-            continue
-            
-        pdf_path = os.path.join(directory_path, filename)
-        
-        data_point = {
-            'period': f"{year}-{month:02d}",
-            'year': year,
-            'month': month,
-            'monthName': month_str,
-            'detached': {},
-            'attached': {}
-        }
-        
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                # Page 1 (index 0) = Cover / Market Snapshot
-                # Page 2 (index 1) = Detached Market Overview
-                # Page 3 (index 2) = Attached Market Overview
-                
-                if len(pdf.pages) > 1:
-                    text_detached = pdf.pages[1].extract_text() or ""
-                    data_point['detached'] = {
-                        'medianPrice': extract_metric(text_detached, "Median Sales Price"),
-                        'closedSales': extract_metric(text_detached, "Closed Sales"),
-                        'inventory': extract_metric(text_detached, "Inventory of Homes for Sale"),
-                        'monthsSupply': extract_metric(text_detached, "Months Supply of Inventory"),
-                        'daysOnMarket': extract_metric(text_detached, "Days on Market Until Sale"),
-                        'newListings': extract_metric(text_detached, "New Listings")
-                    }
-                    
-                if len(pdf.pages) > 2:
-                    text_attached = pdf.pages[2].extract_text() or ""
-                    data_point['attached'] = {
-                        'medianPrice': extract_metric(text_attached, "Median Sales Price"),
-                        'closedSales': extract_metric(text_attached, "Closed Sales"),
-                        'inventory': extract_metric(text_attached, "Inventory of Homes for Sale"),
-                        'monthsSupply': extract_metric(text_attached, "Months Supply of Inventory"),
-                        'daysOnMarket': extract_metric(text_attached, "Days on Market Until Sale"),
-                        'newListings': extract_metric(text_attached, "New Listings")
-                    }
-                    
-        except Exception as e:
-            print(f"Error extracting {filename}: {e}")
+    # Each PDF is parsed in a recycled worker so a 100+ file run stays at flat memory.
+    paths = [os.path.join(directory_path, f) for f in sorted(files)]
+    for data_point in map_pdfs(extract_data_point, paths, label="Monthly Indicators"):
+        if data_point is None:
             continue
-            
         history.append(data_point)
         print(f"Processed: {data_point['period']}")
         
@@ -144,9 +146,13 @@ def process_pdfs(directory_path, output_json):
         json.dump(history, f, indent=2)
         
     print(f"\nSuccessfully extracted data to {output_json}")
+    return history
 
-if __name__ == "__main__":
+def main():
     _root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     pdf_dir = os.path.join(_root, "sdar_reports", "Monthly Indicators")
     output = os.path.join(_root, "public", "data", "historical_indicators.json")
-    process_pdfs(pdf_dir, output)
+    return process_pdfs(pdf_dir, output)
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,10 @@ Fetches S&P CoreLogic Case-Shiller U.S. National Home Price Index data from Fede
 """
 
 import json
-import requests
 from datetime import datetime
 from pathlib import Path
 
-# FRED API Configuration
-FRED_API_KEY = "a72b02db4318645167d222b3d497ae02"
-FRED_BASE_URL = "https://api.stlouisfed.org/fred/series/observations"
+from fred_client import fetch_fred_many, fetch_fred_many_since
 
 # San Diego Home Price Index series
 SD_HOME_PRICE_SERIES = {
@@ -36,34 +33,17 @@ SJ_HOME_PRICE_SERIES = {
     "ATNHPIUS41940Q": {"name": "Not Seasonally Adjusted (Quarterly)", "key": "nsa"},
 }
 
+# Output file -> its series; each series' "key" is its column in the file's history
+HOME_PRICE_FILES = {
+    "home_price_index.json": SD_HOME_PRICE_SERIES,
+    "us_home_price_index.json": US_HOME_PRICE_SERIES,
+    "la_home_price_index.json": LA_HOME_PRICE_SERIES,
+    "sj_home_price_index.json": SJ_HOME_PRICE_SERIES,
+}
 
-def fetch_fred_series(series_id: str, limit: int = 1000) -> list:
-    """Fetch observations from FRED API for a given series."""
-    params = {
-        "series_id": series_id,
-        "api_key": FRED_API_KEY,
-        "file_type": "json",
-        "sort_order": "desc",
-        "limit": limit,
-    }
-    
-    try:
-        response = requests.get(FRED_BASE_URL, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        observations = data.get("observations", [])
-        clean_obs = []
-        for obs in observations:
-            if obs.get("value") and obs["value"] != ".":
-                clean_obs.append({
-                    "date": obs["date"],
-                    "value": float(obs["value"])
-                })
-        return clean_obs
-    except Exception as e:
-        print(f"Error fetching {series_id}: {e}")
-        return []
+# Case-Shiller revises its latest months, so incremental runs re-request this
+# many months before the last stored date as well as anything newer
+REVISION_MONTHS = 6
 
 
 def calculate_changes(observations: list) -> dict:
@@ -101,13 +81,12 @@ def build_history(sa_obs: list, nsa_obs: list, limit: int = 1000) -> list:
     return history
 
 
-def fetch_home_price_data(sa_series: str, nsa_series: str, description: str) -> dict:
-    """Fetch home price index data and compile into JSON."""
-    print(f"Fetching {description} data from FRED...")
+def fetch_home_price_data(series: dict, sa_series: str, nsa_series: str, description: str) -> dict:
+    """Compile home price index data into JSON from prefetched {series_id: observations}."""
+    print(f"Building {description} data...")
     
-    # Fetch series
-    sa_obs = fetch_fred_series(sa_series, 1000)
-    nsa_obs = fetch_fred_series(nsa_series, 1000)
+    sa_obs = series.get(sa_series, [])
+    nsa_obs = series.get(nsa_series, [])
     
     if not sa_obs and not nsa_obs:
         print(f"Warning: No data fetched for {description}")
@@ -153,10 +132,10 @@ def fetch_home_price_data(sa_series: str, nsa_series: str, description: str) ->
     return output
 
 
-def fetch_sj_quarterly_data(series_id: str, description: str) -> dict:
-    """Fetch San Jose FHFA quarterly data."""
-    print(f"Fetching {description} data from FRED...")
-    obs = fetch_fred_series(series_id, 1000)
+def fetch_sj_quarterly_data(series: dict, series_id: str, description: str) -> dict:
+    """Compile San Jose FHFA quarterly data from prefetched {series_id: observations}."""
+    print(f"Building {description} data...")
+    obs = series.get(series_id, [])
     
     if not obs:
         print(f"Warning: No data fetched for {description}")
@@ -215,6 +194,82 @@ def fetch_sj_quarterly_data(series_id: str, description: str) -> dict:
 
 
 
+def load_history(path: Path) -> list:
+    """History rows of an existing output file, or [] if there is none."""
+    if not path.exists():
+        return []
+    try:
+        with open(path) as f:
+            return json.load(f).get("history", [])
+    except (OSError, ValueError):
+        return []
+
+
+def history_observations(history: list, key: str) -> list:
+    """Newest-first observations of one history column ("YYYY-MM" rows back to FRED dates)."""
+    return [{"date": f"{row['date']}-01", "value": row[key]}
+            for row in reversed(history) if row.get(key) is not None]
+
+
+def refetch_start(history: list, months: int = REVISION_MONTHS) -> str:
+    """First observation date to request: REVISION_MONTHS before the last stored month."""
+    year, month = map(int, history[-1]["date"].split("-"))
+    index = year * 12 + month - 1 - months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}-01"
+
+
+def merge_observations(stored: list, fetched: list) -> list:
+    """Newest-first union of two observation lists; fetched values replace stored ones."""
+    by_date = {obs["date"]: obs for obs in stored}
+    by_date.update({obs["date"]: obs for obs in fetched})
+    return [by_date[d] for d in sorted(by_date, reverse=True)]
+
+
+def fetch_all_series(base_path: Path) -> dict:
+    """{series_id: newest-first observations} for every home price series.
+
+    Series whose output file already has history only request observations
+    from refetch_start() on and are merged into that history; the rest are
+    fetched in full. If an incremental request fails the stored history is
+    kept, so the file is left unchanged.
+    """
+    stored, starts, full = {}, {}, {}
+    for filename, group in HOME_PRICE_FILES.items():
+        history = load_history(base_path / filename)
+        for series_id, config in group.items():
+            if history:
+                stored[series_id] = history_observations(history, config["key"])
+                starts[series_id] = refetch_start(history)
+            else:
+                full[series_id] = 1000
+
+    series = fetch_fred_many(full) if full else {}
+    if starts:
+        print(f"Requesting observations since {min(starts.values())} for {len(starts)} stored series...")
+        for series_id, fetched in fetch_fred_many_since(starts).items():
+            series[series_id] = merge_observations(stored[series_id], fetched or [])
+            if fetched:
+                print(f"  {series_id}: {len(fetched)} observations fetched")
+    return series
+
+
+def save_if_changed(data: dict, output_path: Path) -> bool:
+    """save_data() unless only meta.generated differs from the file on disk."""
+    def content(d):
+        return {**d, "meta": {k: v for k, v in d.get("meta", {}).items() if k != "generated"}}
+
+    if output_path.exists():
+        try:
+            with open(output_path) as f:
+                if content(json.load(f)) == content(data):
+                    print(f"{output_path.name} unchanged, not rewritten")
+                    return False
+        except (OSError, ValueError):
+            pass
+    save_data(data, str(output_path))
+    return True
+
+
 def save_data(data: dict, output_path: str):
     """Save data to JSON file."""
     path = Path(output_path)
@@ -229,43 +284,48 @@ def save_data(data: dict, output_path: str):
 def main():
     base_path = Path(__file__).parent.parent / "public" / "data"
     
-    # Fetch San Diego HPI (for main panel)
+    # Every series in one concurrent batch through the shared FRED client,
+    # incremental where an output file already holds the history
+    print("Fetching home price index series from FRED...")
+    series = fetch_all_series(base_path)
+    
+    # San Diego HPI (for main panel)
     sd_data = fetch_home_price_data(
-        "SDXRSA", "SDXRNSA", 
+        series, "SDXRSA", "SDXRNSA", 
         "S&P CoreLogic Case-Shiller CA-San Diego Home Price Index (Jan 2000 = 100)"
     )
     if sd_data:
-        save_data(sd_data, str(base_path / "home_price_index.json"))
+        save_if_changed(sd_data, base_path / "home_price_index.json")
         print(f"\nSan Diego SA Index: {sd_data['current']['seasonallyAdjusted']['value']}")
         print(f"San Diego YoY Change (SA): {sd_data['changes']['yearOverYear']['sa']}%")
     
-    # Fetch US National HPI (for key indicators panel)
+    # US National HPI (for key indicators panel)
     us_data = fetch_home_price_data(
-        "CSUSHPISA", "CSUSHPINSA",
+        series, "CSUSHPISA", "CSUSHPINSA",
         "S&P CoreLogic Case-Shiller U.S. National Home Price Index (Jan 2000 = 100)"
     )
     if us_data:
-        save_data(us_data, str(base_path / "us_home_price_index.json"))
+        save_if_changed(us_data, base_path / "us_home_price_index.json")
         print(f"\nUS National SA Index: {us_data['current']['seasonallyAdjusted']['value']}")
         print(f"US National YoY Change (SA): {us_data['changes']['yearOverYear']['sa']}%")
     
-    # Fetch Los Angeles HPI (for California comparison)
+    # Los Angeles HPI (for California comparison)
     la_data = fetch_home_price_data(
-        "LXXRSA", "LXXRNSA",
+        series, "LXXRSA", "LXXRNSA",
         "S&P CoreLogic Case-Shiller CA-Los Angeles Home Price Index (Jan 2000 = 100)"
     )
     if la_data:
-        save_data(la_data, str(base_path / "la_home_price_index.json"))
+        save_if_changed(la_data, base_path / "la_home_price_index.json")
         print(f"\nLos Angeles SA Index: {la_data['current']['seasonallyAdjusted']['value']}")
         print(f"Los Angeles YoY Change (SA): {la_data['changes']['yearOverYear']['sa']}%")
     
-    # Fetch San Jose HPI (FHFA)
+    # San Jose HPI (FHFA)
     sj_data = fetch_sj_quarterly_data(
-        "ATNHPIUS41940Q",
+        series, "ATNHPIUS41940Q",
         "All-Transactions House Price Index for San Jose-Sunnyvale-Santa Clara, CA (NSA)"
     )
     if sj_data:
-        save_data(sj_data, str(base_path / "sj_home_price_index.json"))
+        save_if_changed(sj_data, base_path / "sj_home_price_index.json")
         print(f"\nSan Jose NSA Index: {sj_data['current']['notSeasonallyAdjusted']['value']}")
         print(f"San Jose YoY Change (NSA): {sj_data['changes']['yearOverYear']['nsa']}%")
 
@@ -5,13 +5,10 @@ Fetches mortgage rates and economic data from Federal Reserve Economic Data API.
 """
 
 import json
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 
-# FRED API Configuration
-FRED_API_KEY = "a72b02db4318645167d222b3d497ae02"
-FRED_BASE_URL = "https://api.stlouisfed.org/fred/series/observations"
+from fred_client import fetch_fred_many
 
 # Series to fetch
 FRED_SERIES = {
@@ -34,35 +31,6 @@ SD_SERIES = {
     "CASAND5URN": {"name": "San Diego Unemployment Rate", "type": "rate"},
 }
 
-def fetch_fred_series(series_id: str, limit: int = 52) -> list:
-    """Fetch observations from FRED API for a given series."""
-    params = {
-        "series_id": series_id,
-        "api_key": FRED_API_KEY,
-        "file_type": "json",
-        "sort_order": "desc",
-        "limit": limit,
-    }
-    
-    try:
-        response = requests.get(FRED_BASE_URL, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        observations = data.get("observations", [])
-        # Filter out missing values and convert to proper format
-        clean_obs = []
-        for obs in observations:
-            if obs.get("value") and obs["value"] != ".":
-                clean_obs.append({
-                    "date": obs["date"],
-                    "value": float(obs["value"])
-                })
-        return clean_obs
-    except Exception as e:
-        print(f"Error fetching {series_id}: {e}")
-        return []
-
 def get_rate_change(observations: list) -> float:
     """Calculate week-over-week change from observations."""
     if len(observations) >= 2:
@@ -87,19 +55,28 @@ def fetch_lending_data() -> dict:
     """Fetch all lending data and compile into JSON."""
     print("Fetching FRED data...")
     
-    # Fetch main series (weekly Freddie Mac survey)
-    mortgage30 = fetch_fred_series("MORTGAGE30US", 52)
-    mortgage15 = fetch_fred_series("MORTGAGE15US", 52)
-    fedfunds = fetch_fred_series("FEDFUNDS", 12)
-    treasury10 = fetch_fred_series("DGS10", 52)  # 10-Year Treasury for spread calculation
-    
-    # Fetch Optimal Blue daily indices (replaced discontinued MORTGAGE5US)
-    jumbo_rate = fetch_fred_series("OBMMIJUMBO30YF", 52)
-    fha_rate = fetch_fred_series("OBMMIFHA30YF", 52)
-    va_rate = fetch_fred_series("OBMMIVA30YF", 52)
-    
+    # All series in one concurrent batch through the shared FRED client:
+    # weekly Freddie Mac survey, 10-Year Treasury for spread calculation,
+    # Optimal Blue daily indices (replaced discontinued MORTGAGE5US) and
     # San Diego unemployment (CASAND5URN replaced deleted CASAND0URN)
-    sd_unemployment = fetch_fred_series("CASAND5URN", 12)
+    series = fetch_fred_many({
+        "MORTGAGE30US": 52,
+        "MORTGAGE15US": 52,
+        "FEDFUNDS": 12,
+        "DGS10": 52,
+        "OBMMIJUMBO30YF": 52,
+        "OBMMIFHA30YF": 52,
+        "OBMMIVA30YF": 52,
+        "CASAND5URN": 12,
+    })
+    mortgage30 = series["MORTGAGE30US"]
+    mortgage15 = series["MORTGAGE15US"]
+    fedfunds = series["FEDFUNDS"]
+    treasury10 = series["DGS10"]
+    jumbo_rate = series["OBMMIJUMBO30YF"]
+    fha_rate = series["OBMMIFHA30YF"]
+    va_rate = series["OBMMIVA30YF"]
+    sd_unemployment = series["CASAND5URN"]
     
     # Build current rates
     current_rates = {
@@ -4,14 +4,23 @@ Fetch San Diego retail/business data from OpenStreetMap Overpass API
 for gentrification indicators (cafes, yoga studios, breweries, etc.)
 """
 
-import json
-import requests
-from datetime import datetime, timedelta
+import argparse
+import asyncio
+import csv
+import re
+from datetime import datetime, timezone
 from pathlib import Path
 from collections import defaultdict
 
-# Overpass API endpoint (no API key required)
-OVERPASS_API = "https://overpass-api.de/api/interpreter"
+import numpy as np
+
+from geo_index import ZipIndex
+from osm_poi_store import PoiStore
+from overpass_client import TIMEOUT_MARGIN, OverpassClient, OverpassError
+from poi_grid import PoiGrid
+from retail_store import write_retail_data
+
+# Overpass API mirrors (no API key required) are configured in overpass_client
 
 # Global Chains List (for Boutique Logic)
 CHAINS = {
@@ -25,6 +34,48 @@ CHAINS = {
     "US Bank", "Citibank", "Shell", "Chevron", "Mobil", "ARCO", "76"
 }
 
+# Wikidata ids of chains above, matched against OSM brand:wikidata tags so
+# branches whose name tag differs from the brand are still caught
+CHAIN_WIKIDATA = {
+    "Q37158",    # Starbucks
+    "Q38076",    # McDonald's
+    "Q244457",   # Subway
+    "Q259340",   # 7-Eleven
+    "Q177054",   # Burger King
+    "Q752941",   # Taco Bell
+    "Q491516",   # Chick-fil-A
+    "Q847743",   # Dunkin'
+    "Q839466",   # Domino's Pizza
+    "Q191615",   # Pizza Hut
+    "Q524757",   # KFC
+    "Q550258",   # Wendy's
+    "Q1358690",  # Panda Express
+    "Q465751",   # Chipotle Mexican Grill
+    "Q1809448",  # Whole Foods Market
+    "Q688825",   # Trader Joe's
+    "Q715583",   # Costco
+    "Q1046951",  # Target
+    "Q483551",   # Walmart
+    "Q2078880",  # CVS Pharmacy
+    "Q1591889",  # Walgreens
+    "Q487907",   # Bank of America
+    "Q744149",   # Wells Fargo
+    "Q319642",   # Chevron
+}
+
+def compile_chain_pattern(chains):
+    """One case-insensitive alternation over all chain names, matched on word boundaries.
+
+    Longest names come first so "Peet's Coffee" wins over any shorter prefix;
+    the boundaries keep "76" from matching "1976 Diner". \\w lookarounds are
+    used instead of \\b because names can start or end with punctuation
+    ("Dunkin'").
+    """
+    alternation = "|".join(re.escape(c) for c in sorted(chains, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+
+CHAIN_PATTERN = compile_chain_pattern(CHAINS)
+
 # Vibe Tags Configuration (User Specified + Inferred)
 VIBE_TAGS = {
     "92101-Downtown": "The Urban Core",
@@ -99,6 +150,9 @@ SD_NEIGHBORHOODS = {
     "92173-San Ysidro": {"s": 32.54, "w": -117.08, "n": 32.58, "e": -117.02},
 }
 
+# Zip -> SDAR neighborhood name, for zips outside SD_NEIGHBORHOODS in county mode
+SDAR_ZIPS_CSV = Path(__file__).parent / "sdar_zips.csv"
+
 # Comprehensive OSM Categories
 CATEGORIES = {
     # Food & Drink
@@ -140,102 +194,153 @@ CATEGORIES = {
     "coworking": {"query": 'amenity=coworking_space', "label": "Coworking", "icon": "💼"},
 }
 
-def build_overpass_query(category_query, bbox):
-    """Build Overpass QL query for a specific category and bounding box, fetching metadata."""
+# Category key -> (OSM tag key, tag value), parsed once from the "key=value" queries
+CATEGORY_TAGS = {key: tuple(config["query"].split("=", 1)) for key, config in CATEGORIES.items()}
+
+def build_overpass_query(bbox, categories=CATEGORIES, timeout=90, out="meta", newer=None):
+    """Build one Overpass QL query for every category's tag in a bounding box, fetching metadata.
+
+    Values are grouped per tag key into a single anchored regex filter, so
+    28 categories become a handful of node/way statements in one request.
+    With `newer` (an ISO timestamp) only elements edited since then are
+    returned, filtered on the tag key alone so that an element re-tagged out
+    of every category still comes back and can be dropped from the store.
+    """
+    values_by_key = defaultdict(list)
+    for key in categories:
+        tag, value = CATEGORY_TAGS[key]
+        values_by_key[tag].append(value)
+
+    area = f"({bbox['s']},{bbox['w']},{bbox['n']},{bbox['e']})"
+    statements = []
+    for tag, values in values_by_key.items():
+        if newer:
+            tag_filter = f'["{tag}"](newer:"{newer}")'
+        else:
+            tag_filter = f'["{tag}"~"^({"|".join(sorted(values))})$"]'
+        statements.append(f'      node{tag_filter}{area};')
+        statements.append(f'      way{tag_filter}{area};')
+    body = "\n".join(statements)
     return f"""
-    [out:json][timeout:30];
+    [out:json][timeout:{timeout}];
     (
-      node[{category_query}]({bbox['s']},{bbox['w']},{bbox['n']},{bbox['e']});
-      way[{category_query}]({bbox['s']},{bbox['w']},{bbox['n']},{bbox['e']});
+{body}
     );
-    out meta;
+    out {out};
     """
 
-def fetch_category_data(category_query, bbox, timeout=30):
-    """Fetch POI elements (nodes/ways) with metadata from Overpass API."""
-    query = build_overpass_query(category_query, bbox)
-    
-    try:
-        response = requests.post(
-            OVERPASS_API,
-            data={"data": query},
-            timeout=timeout
-        )
-        response.raise_for_status()
-        data = response.json()
-        return data.get("elements", [])
-    except Exception as e:
-        print(f"  Error fetching {category_query}: {e}")
-        return []
-
-def is_recent(element, days=365):
-    """Check if element was modified/created in the last X days."""
-    timestamp_str = element.get("timestamp")
-    if not timestamp_str:
-        return False
+async def fetch_bbox_elements(client, bbox, timeout=90, out="meta", label=""):
+    """Fetch every POI element (nodes/ways) with metadata for a bbox in one request.
+
+    Raises OverpassError once the client's retries are exhausted, so a failed
+    request is never mistaken for an area with no businesses.
+    """
+    query = build_overpass_query(bbox, timeout=timeout, out=out)
+    data = await client.query(query, label=label, timeout=timeout + TIMEOUT_MARGIN)
+    return data.get("elements", [])
+
+def classify(element):
+    """Category keys whose tag filter the element matches (an element can match several)."""
+    tags = element.get("tags", {})
+    return [key for key, (tag, value) in CATEGORY_TAGS.items() if tags.get(tag) == value]
+
+# Momentum windows (days) for new openings; 365 is the headline "new_openings"
+RECENCY_WINDOWS = (90, 365, 730)
+
+# One reference time for the whole run, so every window and area is measured
+# against the same instant
+RUN_TIME = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "s")
+
+def parse_timestamps(elements):
+    """datetime64[s] array of element timestamps ("2023-12-01T20:00:00Z"); NaT where missing or invalid."""
+    raw = [(e.get("timestamp") or "NaT").rstrip("Z") for e in elements]
     try:
-        # Format: "2023-12-01T20:00:00Z"
-        ts = datetime.strptime(timestamp_str, "%Y-%m-%dT%H:%M:%SZ")
-        cutoff = datetime.now() - timedelta(days=days)
-        return ts > cutoff
-    except:
-        return False
+        return np.array(raw, dtype="datetime64[s]")
+    except ValueError:
+        parsed = []
+        for value in raw:
+            try:
+                parsed.append(np.datetime64(value, "s"))
+            except ValueError:
+                parsed.append(np.datetime64("NaT"))
+        return np.array(parsed, dtype="datetime64[s]")
+
+def recency_masks(elements, reference=None, windows=RECENCY_WINDOWS):
+    """{days: bool array} of elements modified/created within each window of the reference time."""
+    reference = RUN_TIME if reference is None else reference
+    ages = (reference - parse_timestamps(elements)) / np.timedelta64(1, "D")
+    # NaT ages are NaN and compare False, so undated elements are never recent
+    return {days: ages < days for days in windows}
 
 def is_boutique(element):
-    """Check if element is likely NOT a national chain."""
-    name = element.get("tags", {}).get("name", "")
-    if not name:
+    """Check if element is likely NOT a national chain (by brand:wikidata, then name/brand text)."""
+    tags = element.get("tags", {})
+    if tags.get("brand:wikidata") in CHAIN_WIKIDATA:
+        return False
+    text = " ".join(filter(None, (tags.get("name"), tags.get("brand"))))
+    if not text:
         return True # Assume unnamed/local is boutique
-    
-    # Check exact match or substring for chains
-    for chain in CHAINS:
-        if chain.lower() in name.lower():
-            return False
-    return True
+    return CHAIN_PATTERN.search(text.replace("\u2019", "'")) is None
 
-def fetch_neighborhood_data(neighborhood_name, bbox):
+async def fetch_neighborhood_data(client, neighborhood_name, bbox):
     """Fetch all indicator counts for a neighborhood with momentum analysis."""
     print(f"  Fetching {neighborhood_name}...")
-    
+    # One union request for the bbox, split into categories client-side
+    elements = await fetch_bbox_elements(client, bbox, label=neighborhood_name)
+    return summarize_neighborhood(neighborhood_name, elements)
+
+def summarize_neighborhood(neighborhood_name, elements, reference=None):
+    """Category counts, new openings and boutique ratio for a neighborhood's POI elements.
+
+    Timestamps are parsed and chain names matched once per element; each
+    category then sums its elements' rows of those arrays.
+    """
     result = {
         "name": neighborhood_name,
         "vibe": VIBE_TAGS.get(neighborhood_name, "Emerging Community"),
         "categories": {},
         "total_businesses": 0,
         "total_new_openings": 0,
+        "momentum": {},
         "boutique_count": 0,
         "chain_count": 0
     }
-    
+
+    elements = list(elements)
+    recent = recency_masks(elements, reference)
+    boutique = np.fromiter((is_boutique(e) for e in elements), dtype=bool, count=len(elements))
+
+    rows = {key: [] for key in CATEGORIES}
+    for i, element in enumerate(elements):
+        for key in classify(element):
+            rows[key].append(i)
+
     total = 0
-    new_openings_total = 0
     boutique_total = 0
-    chain_total = 0
-    
-    # Fetch all categories
+    new_by_window = dict.fromkeys(RECENCY_WINDOWS, 0)
     for key, config in CATEGORIES.items():
-        elements = fetch_category_data(config["query"], bbox)
-        count = len(elements)
-        
-        # Calculate Momentrum & Boutique stats
-        new_in_category = sum(1 for e in elements if is_recent(e, days=365))
-        boutique_in_category = sum(1 for e in elements if is_boutique(e))
-        
+        idx = np.array(rows[key], dtype=np.intp)
+        count = len(idx)
+        new_in_category = {days: int(mask[idx].sum()) for days, mask in recent.items()}
+
         result["categories"][key] = {
             "count": count,
             "label": config["label"],
             "icon": config["icon"],
-            "new_openings": new_in_category
+            "new_openings": new_in_category[365]
         }
-        
+
         total += count
-        new_openings_total += new_in_category
-        boutique_total += boutique_in_category
-        chain_total += (count - boutique_in_category)
-    
+        boutique_total += int(boutique[idx].sum())
+        for days, n in new_in_category.items():
+            new_by_window[days] += n
+
     result["total_businesses"] = total
-    result["total_new_openings"] = new_openings_total
-    
+    result["total_new_openings"] = new_by_window[365]
+    result["momentum"] = {f"{days}d": n for days, n in new_by_window.items()}
+    result["boutique_count"] = boutique_total
+    result["chain_count"] = total - boutique_total
+
     if total > 0:
         result["boutique_ratio"] = round(boutique_total / total * 100) # As percentage integer
     else:
@@ -243,21 +348,124 @@ def fetch_neighborhood_data(neighborhood_name, bbox):
         
     return result
 
-def fetch_all_neighborhoods():
-    """Fetch data for all neighborhoods."""
+def fetch_all_neighborhoods(client):
+    """Fetch data for all neighborhoods concurrently; returns (neighborhoods, missing names)."""
     print("Fetching OSM retail data for San Diego neighborhoods...")
-    
-    neighborhoods = []
-    
-    for name, bbox in SD_NEIGHBORHOODS.items():
-        try:
-            data = fetch_neighborhood_data(name, bbox)
-            neighborhoods.append(data)
-        except Exception as e:
-            print(f"  Error with {name}: {e}")
+
+    async def fetch_all():
+        return await asyncio.gather(
+            *(fetch_neighborhood_data(client, name, bbox) for name, bbox in SD_NEIGHBORHOODS.items()),
+            return_exceptions=True)
+
+    neighborhoods, missing = [], []
+    for name, data in zip(SD_NEIGHBORHOODS, asyncio.run(fetch_all())):
+        if isinstance(data, Exception):
+            print(f"  Error with {name}: {data}")
+            missing.append(name)
             continue
+        neighborhoods.append(data)
     
-    return neighborhoods
+    return neighborhoods, missing
+
+def element_point(element):
+    """(lon, lat) of a node, or of a way's center (requires `out center`)."""
+    if "lon" in element:
+        return element["lon"], element["lat"]
+    center = element.get("center")
+    if center:
+        return center["lon"], center["lat"]
+    return None
+
+def zip_neighborhood_names():
+    """{zip: "ZIP-Name"}, keeping the SD_NEIGHBORHOODS names (and their vibe tags) where they exist."""
+    names = {}
+    if SDAR_ZIPS_CSV.exists():
+        with open(SDAR_ZIPS_CSV, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                names[row["zip"]] = f"{row['zip']}-{row['neighborhood']}"
+    for name in SD_NEIGHBORHOODS:
+        names[name.split("-", 1)[0]] = name
+    return names
+
+def county_bbox(zip_index):
+    minx, miny, maxx, maxy = zip_index.extent
+    return {"s": miny, "w": minx, "n": maxy, "e": maxx}
+
+def sync_poi_store(client, store, bbox, full=False):
+    """Bring the POI store up to date: a delta since its last sync, or a full download.
+
+    A full download replaces the store (this is how deletions are picked
+    up); a delta upserts edited elements and drops any that no longer match
+    a category. The store's sync time is Overpass's own data timestamp, so
+    edits made while a query runs are picked up next time.
+    """
+    full = full or store.needs_full_refresh()
+    newer = None if full else store.last_sync
+    print(f"  {'Full' if full else 'Incremental'} POI sync" + (f" since {newer}" if newer else ""))
+    query = build_overpass_query(bbox, timeout=300, out="center meta", newer=newer)
+    data = asyncio.run(client.query(query, label="county" if full else "county delta", timeout=300 + TIMEOUT_MARGIN))
+    elements = data.get("elements", [])
+    synced_at = (data.get("osm3s", {}).get("timestamp_osm_base")
+                 or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
+
+    if full:
+        store.replace(elements, synced_at)
+        print(f"  Stored {len(store.elements)} POIs")
+        return
+    changed = store.upsert(elements, synced_at)
+    dropped = store.remove([key for key, e in store.elements.items() if not classify(e)])
+    print(f"  {len(elements)} edited elements: {changed} upserted, {dropped} no longer tagged as retail; "
+          f"{len(store.elements)} POIs in store")
+
+def build_poi_grid(extent, located):
+    """PoiGrid of (element, (lon, lat)) pairs, with the same category, chain and recency rules as the zips."""
+    elements = [e for e, _ in located]
+    element_rows, category_rows = [], []
+    positions = {key: i for i, key in enumerate(CATEGORIES)}
+    for i, element in enumerate(elements):
+        for key in classify(element):
+            element_rows.append(i)
+            category_rows.append(positions[key])
+    boutique = np.fromiter((is_boutique(e) for e in elements), dtype=bool, count=len(elements))
+    return PoiGrid.build(extent, [pt[0] for _, pt in located], [pt[1] for _, pt in located],
+                         element_rows, category_rows, list(CATEGORIES), boutique, recency_masks(elements))
+
+def fetch_county_neighborhoods(client, store=None, full_refresh=False):
+    """Fetch every tagged POI in the county in one request and bin it into zip polygons.
+
+    Ways are placed by their center (`out center`). Each POI lands in exactly
+    one zip via the zip polygon index, so nothing is double counted and every
+    zip in sd_zipcodes.json is covered, including ones with no POIs.
+
+    With a PoiStore only the elements edited since the last run are
+    downloaded; counts, new openings and boutique ratios are recomputed from
+    the whole store.
+
+    Returns (neighborhoods, PoiGrid of every located POI).
+    """
+    print("Fetching OSM retail data for San Diego County (single request)...")
+    zip_index = ZipIndex.load()
+    bbox = county_bbox(zip_index)
+    if store is not None:
+        sync_poi_store(client, store, bbox, full=full_refresh)
+        elements = store.values()
+    else:
+        elements = asyncio.run(fetch_bbox_elements(client, bbox, timeout=300, out="center meta", label="county"))
+
+    located = [(e, element_point(e)) for e in elements]
+    located = [(e, pt) for e, pt in located if pt]
+    zips = zip_index.assign([pt[0] for _, pt in located], [pt[1] for _, pt in located])
+
+    by_zip = defaultdict(list)
+    for (element, _), zipcode in zip(located, zips):
+        if zipcode:
+            by_zip[zipcode].append(element)
+    print(f"  {len(elements)} POIs, {sum(len(v) for v in by_zip.values())} inside zip polygons")
+
+    names = zip_neighborhood_names()
+    all_zips = sorted({entry[0] for entry in zip_index.entries})
+    neighborhoods = [summarize_neighborhood(names.get(z, z), by_zip.get(z, [])) for z in all_zips]
+    return neighborhoods, build_poi_grid(zip_index.extent, located)
 
 def calculate_county_summary(neighborhoods):
     """Calculate county-wide summary statistics."""
@@ -283,10 +491,33 @@ def calculate_county_summary(neighborhoods):
     }
 
 def main():
-    output_path = Path(__file__).parent.parent / "public" / "data" / "retail_data.json"
-    
+    parser = argparse.ArgumentParser(description="Fetch OSM retail signals for San Diego neighborhoods.")
+    parser.add_argument("--county", action="store_true",
+                        help="One county-wide request, binned into zip polygons (instead of per-bbox requests)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="County mode backed by the local POI store: download only elements edited since the last run")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="With --incremental, rebuild the POI store from a full download")
+    parser.add_argument("--zip-shards", action="store_true",
+                        help="Also write one content-hashed file per zip under public/data/retail/zips")
+    args = parser.parse_args()
+    args.county = args.county or args.incremental
+
     # Fetch all neighborhood data
-    neighborhoods = fetch_all_neighborhoods()
+    client = OverpassClient()
+    grid = None
+    if args.county:
+        store = PoiStore.load() if args.incremental else None
+        try:
+            (neighborhoods, grid), missing = fetch_county_neighborhoods(client, store, args.full_refresh), []
+            if store is not None:
+                store.save()
+        except OverpassError as e:
+            print(f"County-wide fetch failed: {e}")
+            neighborhoods, missing = [], ["county"]
+    else:
+        neighborhoods, missing = fetch_all_neighborhoods(client)
+    print(client.summary())
     
     if not neighborhoods:
         print("No data fetched, exiting")
@@ -295,24 +526,16 @@ def main():
     # Calculate summary
     summary = calculate_county_summary(neighborhoods)
     
-    # Build output
-    output = {
-        "meta": {
-            "generated": datetime.now().isoformat(),
-            "source": "OpenStreetMap Overpass API",
-            "neighborhoods_count": len(neighborhoods),
-        },
-        "summary": summary,
-        "neighborhoods": neighborhoods,
-        "categories": {k: v["label"] for k, v in CATEGORIES.items()}
+    meta = {
+        "generated": datetime.now().isoformat(),
+        "source": "OpenStreetMap Overpass API",
+        "neighborhoods_count": len(neighborhoods),
+        "binning": "zip polygons" if args.county else "bounding boxes",
+        # Areas whose requests failed: left out rather than reported as zero
+        "missing": missing,
     }
+    write_retail_data(meta, summary, neighborhoods, CATEGORIES, zip_shards=args.zip_shards, grid=grid)
     
-    # Save to file
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(output, f, indent=2)
-    
-    print(f"\nSuccessfully saved data to {output_path}")
     print(f"Neighborhoods: {len(neighborhoods)}")
     print(f"Top districts: {summary['topBusinessDistricts']}")
 
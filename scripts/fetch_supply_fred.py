@@ -5,13 +5,10 @@ Fetches Active Listing Count (ACTLISCOU6073) data from Federal Reserve Economic
 """
 
 import json
-import requests
 from datetime import datetime
 from pathlib import Path
 
-# FRED API Configuration
-FRED_API_KEY = "a72b02db4318645167d222b3d497ae02"
-FRED_BASE_URL = "https://api.stlouisfed.org/fred/series/observations"
+from fred_client import fetch_fred_series
 
 # San Diego Supply Series
 SUPPLY_SERIES = {
@@ -19,36 +16,6 @@ SUPPLY_SERIES = {
 }
 
 
-def fetch_fred_series(series_id: str, limit: int = 120) -> list:
-    """Fetch observations from FRED API for a given series."""
-    params = {
-        "series_id": series_id,
-        "api_key": FRED_API_KEY,
-        "file_type": "json",
-        "sort_order": "desc",
-        "limit": limit,  # 10 years of data
-    }
-    
-    try:
-        response = requests.get(FRED_BASE_URL, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        observations = data.get("observations", [])
-        clean_obs = []
-        for obs in observations:
-            if obs.get("value") and obs["value"] != ".":
-                clean_obs.append({
-                    "date": obs["date"],
-                    "value": float(obs["value"])
-                })
-        # Sort ascending for chart
-        return sorted(clean_obs, key=lambda x: x["date"])
-    except Exception as e:
-        print(f"Error fetching {series_id}: {e}")
-        return []
-
-
 def calculate_changes(observations: list) -> dict:
     """Calculate year-over-year changes."""
     if len(observations) < 13:
@@ -76,7 +43,8 @@ def save_data(data: dict, output_path: str):
 def main():
     print("Fetching Supply data from FRED...")
     series_id = "ACTLISCOU6073"
-    observations = fetch_fred_series(series_id)
+    # 10 years of data, sorted ascending for the chart
+    observations = sorted(fetch_fred_series(series_id, 120), key=lambda x: x["date"])
     
     if not observations:
         print("Failed to fetch data")
@@ -4,11 +4,14 @@ Data source: California Statewide Database (UC Berkeley)
 
 Uses SR (Super Registration) precinct data which maps cleanly to cities.
 """
-import csv
-import json
-import urllib.request
+import argparse
 from pathlib import Path
-from collections import defaultdict
+
+import http_cache
+from sov_races import aggregate_races, detect_races, district_columns, race_columns, race_slices, split_districts
+from swdb import read_header, stream_csv
+from vote_matrix import group_sum, parse_votes
+from voting_store import VOTING_DIR, write_voting_data
 
 # San Diego County = c073
 DATA_URLS = {
@@ -22,7 +25,8 @@ DATA_URLS = {
     }
 }
 
-# Presidential race column prefixes
+# Presidential candidate names (the SOV header only has party codes); other
+# contests are detected from the header by sov_races
 PRES_COLUMNS_2024 = {
     'PRSDEM01': 'Harris',
     'PRSREP01': 'Trump',
@@ -44,66 +48,49 @@ PRES_COLUMNS_2020 = {
 OUTPUT_DIR = Path(__file__).parent.parent / 'public' / 'data'
 
 
-def download_csv(url: str) -> list[dict]:
-    """Download and parse a CSV file from URL."""
-    print(f"  Downloading: {url.split('/')[-1]}")
-    with urllib.request.urlopen(url) as response:
-        content = response.read().decode('utf-8')
-        reader = csv.DictReader(content.splitlines())
-        return list(reader)
+def read_sov(url: str, pres_columns: dict):
+    """(races, precinct ids, votes array) for every contest in an SOV file, read in one pass."""
+    races = detect_races(read_header(url), named={'president': pres_columns})
+    columns, district_cols = race_columns(races), district_columns(races)
+    precincts, votes, districts = parse_votes(
+        stream_csv(url, ('srprec', *district_cols, *columns)), len(columns), len(district_cols))
+    races, votes = split_districts(races, votes, dict(zip(district_cols, districts)))
+    return races, precincts, votes
 
 
-def safe_int(value) -> int:
-    """Convert value to int, treating non-numeric as 0."""
-    if value is None or value == '' or value == '***':
-        return 0
-    try:
-        return int(float(value))
-    except ValueError:
-        return 0
+def extract_presidential_data(races, precincts, all_votes, year: str, city_map: dict = None) -> dict:
+    """Presidential results by precinct and city, plus every other contest by city."""
+    president = next(r for r in races if r['key'] == 'president')
+    candidates = president['choices']
+    votes = all_votes[:, race_slices(races)['president']]
+    precinct_totals = votes.sum(axis=1)
 
+    cities = [city_map.get(p, 'Unincorporated') if city_map else 'Unknown' for p in precincts]
+    city_names, all_city_votes = group_sum(all_votes, cities)
+    city_votes = all_city_votes[:, race_slices(races)['president']]
 
-def extract_presidential_data(rows: list[dict], pres_columns: dict, year: str, city_map: dict = None) -> dict:
-    """Extract presidential voting data from SOV rows."""
-    totals = defaultdict(int)
-    precinct_data = []
-    city_totals = defaultdict(lambda: defaultdict(int))
-    
-    for row in rows:
-        # Get precinct ID
-        precinct_id = row.get('srprec') or row.get('SRPREC') or row.get('precinct', 'unknown')
-        city = city_map.get(precinct_id, 'Unincorporated') if city_map else 'Unknown'
-        
-        precinct_votes = {'precinct': precinct_id, 'city': city}
-        precinct_total = 0
-        
-        for col, candidate in pres_columns.items():
-            votes = safe_int(row.get(col, 0))
-            totals[candidate] += votes
-            precinct_votes[candidate] = votes
-            precinct_total += votes
-            city_totals[city][candidate] += votes
-        
-        city_totals[city]['total'] += precinct_total
-        precinct_votes['total'] = precinct_total
-        if precinct_total > 0:
-            precinct_data.append(precinct_votes)
-    
+    precinct_data = [
+        {'precinct': prec, 'city': city, **{c: round(v) for c, v in zip(candidates, row)}, 'total': round(total)}
+        for prec, city, row, total in zip(precincts, cities, votes.tolist(), precinct_totals.tolist())
+        if total > 0
+    ]
+
+    totals = dict(zip(candidates, (round(v) for v in votes.sum(axis=0).tolist())))
     total_votes = sum(totals.values())
-    
+
     # Build city-level results
     cities_data = {}
-    for city, votes in city_totals.items():
-        city_total = votes['total']
+    for city, row in zip(city_names, city_votes.tolist()):
+        city_total = round(sum(row))
         if city_total > 0:
             cities_data[city] = {
                 'total_votes': city_total,
                 'candidates': {
                     name: {
-                        'votes': votes[name],
-                        'percentage': round(votes[name] / city_total * 100, 2)
+                        'votes': round(v),
+                        'percentage': round(round(v) / city_total * 100, 2)
                     }
-                    for name in pres_columns.values() if votes[name] > 0
+                    for name, v in zip(candidates, row) if round(v) > 0
                 }
             }
     
@@ -120,11 +107,18 @@ def extract_presidential_data(rows: list[dict], pres_columns: dict, year: str, c
             for name, votes in sorted(totals.items(), key=lambda x: -x[1])
         },
         'by_city': dict(sorted(cities_data.items(), key=lambda x: -x[1]['total_votes'])),
-        'precincts': precinct_data  # All precincts
+        'precincts': precinct_data,  # All precincts
+        'races': aggregate_races(races, all_votes.sum(axis=0), city_names, all_city_votes, skip=('president',)),
     }
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Fetch San Diego presidential results from SWDB.")
+    parser.add_argument('--offline', action='store_true',
+                        help="Use only files already in the local download cache")
+    if parser.parse_args().offline:
+        http_cache.set_offline()
+
     print("Fetching San Diego County Presidential Voting Data")
     print("=" * 50)
     
@@ -133,12 +127,10 @@ def main():
     # Download city mapping
     print("\nDownloading city mapping...")
     try:
-        city_rows = download_csv(DATA_URLS['2024']['city_map'])
+        url = DATA_URLS['2024']['city_map']
         city_map = {}
-        for row in city_rows:
-            prec = row.get('srprec') or row.get('SRPREC', '')
-            city = row.get('city') or row.get('CITY', 'Unknown')
-            city_map[prec] = city
+        for prec, city in stream_csv(url, ('srprec', 'city')):
+            city_map[prec or ''] = city or 'Unknown'
         print(f"  Mapped {len(city_map)} precincts to cities")
     except Exception as e:
         print(f"  Warning: Could not load city mapping: {e}")
@@ -148,32 +140,26 @@ def main():
     
     # 2024 data
     print("\n2024 General Election:")
-    rows_2024 = download_csv(DATA_URLS['2024']['sov'])
-    print(f"  Downloaded {len(rows_2024)} SR precinct records")
-    if rows_2024:
-        # Show available columns
-        cols = list(rows_2024[0].keys())
-        pres_cols = [c for c in cols if c.startswith('PRS')]
-        print(f"  Presidential columns: {pres_cols}")
-    results['2024'] = extract_presidential_data(rows_2024, PRES_COLUMNS_2024, '2024', city_map)
+    sov_2024 = read_sov(DATA_URLS['2024']['sov'], PRES_COLUMNS_2024)
+    results['2024'] = extract_presidential_data(*sov_2024, '2024', city_map)
+    print(f"  Read {results['2024']['num_precincts']} SR precincts with presidential votes, "
+          f"{len(results['2024']['races'])} other races")
     
     # 2020 data
     print("\n2020 General Election:")
-    rows_2020 = download_csv(DATA_URLS['2020']['sov'])
-    print(f"  Downloaded {len(rows_2020)} SR precinct records")
-    results['2020'] = extract_presidential_data(rows_2020, PRES_COLUMNS_2020, '2020', city_map)
+    sov_2020 = read_sov(DATA_URLS['2020']['sov'], PRES_COLUMNS_2020)
+    results['2020'] = extract_presidential_data(*sov_2020, '2020', city_map)
+    print(f"  Read {results['2020']['num_precincts']} SR precincts with presidential votes, "
+          f"{len(results['2020']['races'])} other races")
     
     # Save results
-    output_file = OUTPUT_DIR / 'voting_data.json'
-    with open(output_file, 'w') as f:
-        json.dump({
-            'source': 'California Statewide Database (UC Berkeley)',
-            'county': 'San Diego',
-            'last_updated': '2024-12-20',
-            'granularity': 'precinct',
-            'note': 'Data is at precinct level, aggregated to cities. Can be further aggregated to zip codes using census block mapping.',
-            'elections': results
-        }, f, indent=2)
+    output_file = write_voting_data({
+        'source': 'California Statewide Database (UC Berkeley)',
+        'county': 'San Diego',
+        'last_updated': '2024-12-20',
+        'granularity': 'precinct',
+        'note': 'Data is at precinct level, aggregated to cities. Can be further aggregated to zip codes using census block mapping.',
+    }, results, VOTING_DIR)
     
     print(f"\nSaved to: {output_file}")
     
@@ -1,32 +1,66 @@
 
-import csv
+import argparse
+import gzip
+import hashlib
+import io
 import json
-import urllib.request
-import math
+import os
+import pickle
+import struct
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
 from pathlib import Path
 from collections import defaultdict
 
+import http_cache
+from geo_index import ZIP_GEOJSON, ZipIndex
+from sov_races import aggregate_races, detect_races, district_columns, race_columns, race_slices, split_districts
+from swdb import read_header, stream_csv
+from vote_matrix import SparseWeights, group_sum, parse_votes
+from voting_store import write_voting_data
+
 # Constants
 COUNTY_FIPS = "06073" # San Diego
 SWDB_BASE = "https://statewidedatabase.org/pub/data"
 GAZ_URL = "https://www2.census.gov/geo/docs/maps-data/data/gazetteer/2020_Gazetteer/2020_gaz_tracts_06.txt"
+# The Gazetteer stops at tracts; block internal points come from the TIGER/Line block DBF.
+BLOCK_URL = "https://www2.census.gov/geo/tiger/TIGER2020PL/STATE/06_CALIFORNIA/06073/tl_2020_06073_tabblock20.zip"
+BLOCK_VINTAGE = '2020'  # census blocks in BLOCK_URL
+
+CROSSWALK_CACHE = Path(__file__).parent / '.cache' / 'crosswalk'
+
+# General elections to build: SWDB election code, census block vintage of its
+# sr_blk_map and presidential column -> candidate
+ELECTIONS = [
+    {'year': '2024', 'code': 'g24', 'block_vintage': '2020',
+     'pres': {'PRSDEM01': 'Harris', 'PRSREP01': 'Trump', 'PRSAIP01': 'Kennedy', 'PRSGRN01': 'Stein', 'PRSLIB01': 'Oliver', 'PRSPAF01': 'De la Cruz'}},
+    {'year': '2020', 'code': 'g20', 'block_vintage': '2010',
+     'pres': {'PRSDEM01': 'Biden', 'PRSREP01': 'Trump', 'PRSLIB01': 'Jorgensen', 'PRSGRN01': 'Hawkins', 'PRSAIP01': 'De La Fuente', 'PRSPAF01': 'La Riva'}},
+    {'year': '2016', 'code': 'g16', 'block_vintage': '2010',
+     'pres': {'PRSDEM01': 'Clinton', 'PRSREP01': 'Trump', 'PRSLIB01': 'Johnson', 'PRSGRN01': 'Stein', 'PRSPAF01': 'La Riva'}},
+    {'year': '2012', 'code': 'g12', 'block_vintage': '2010',
+     'pres': {'PRSDEM01': 'Obama', 'PRSREP01': 'Romney', 'PRSLIB01': 'Johnson', 'PRSGRN01': 'Stein', 'PRSPAF01': 'Barr', 'PRSAIP01': 'Hoefling'}},
+]
+
+# Elections aggregated in parallel (one process each); downloads overlap on threads
+GEO_WORKERS = int(os.environ.get('VOTING_GEO_WORKERS', min(len(ELECTIONS), os.cpu_count() or 1)))
 
-OUTPUT_DIR = Path(__file__).parent.parent / 'public' / 'data'
-ZIP_GEOJSON = OUTPUT_DIR / 'sd_zipcodes.json'
+# Only these columns are ever pulled out of the (large) SWDB files
+BLK_MAP_COLUMNS = ('srprec', 'tract', 'block', 'pctsrprec')
+CITY_MAP_COLUMNS = ('srprec', 'city')
 
-def download_csv(url):
-    print(f"Downloading {url}...")
-    with urllib.request.urlopen(url) as response:
-        return list(csv.DictReader(response.read().decode('utf-8').splitlines()))
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
 
 def parse_gazetteer():
-    """Downloads and parses Census Gazetteer for CA Tracts."""
-    print("Downloading Gazetteer...")
+    """Parses the (cached) Census Gazetteer for CA Tracts."""
+    print("Loading Gazetteer...")
     tract_centroids = {}
-    with urllib.request.urlopen(GAZ_URL) as response:
+    with http_cache.open_text(GAZ_URL) as lines:
         # Tab separated
-        lines = response.read().decode('utf-8').splitlines()
-        headers = lines[0].split('\t')
+        headers = next(lines).rstrip('\r\n').split('\t')
         # Find indices
         try:
             geoid_idx = [i for i, h in enumerate(headers) if 'GEOID' in h][0]
@@ -36,8 +70,8 @@ def parse_gazetteer():
             print("Error parsing Gazetteer headers")
             return {}
             
-        for line in lines[1:]:
-            parts = line.split('\t')
+        for line in lines:
+            parts = line.rstrip('\r\n').split('\t')
             if len(parts) <= lon_idx: continue
             geoid = parts[geoid_idx].strip()
             if not geoid.startswith(COUNTY_FIPS): continue
@@ -52,70 +86,59 @@ def parse_gazetteer():
     print(f"Mapped {len(tract_centroids)} SD Tracts.")
     return tract_centroids
 
-def load_zip_polygons():
-    """Loads Zip Code polygons from GeoJSON."""
-    if not ZIP_GEOJSON.exists():
-        print("Zip GeoJSON not found!")
-        return {}
-        
-    with open(ZIP_GEOJSON, 'r') as f:
-        data = json.load(f)
-        
-    zip_polys = {}
-    for feature in data['features']:
-        zipcode = feature['properties']['ZIPCODE']
-        geom = feature['geometry']
-        # Handle Polygon and MultiPolygon
-        polys = []
-        if geom['type'] == 'Polygon':
-            polys.append(geom['coordinates'][0]) # Outer ring
-        elif geom['type'] == 'MultiPolygon':
-            for poly in geom['coordinates']:
-                polys.append(poly[0])
-        
-        zip_polys[zipcode] = polys
-        
-    return zip_polys
-
-def point_in_polygon(x, y, poly):
-    """Ray casting algorithm."""
-    n = len(poly)
-    inside = False
-    p1x, p1y = poly[0]
-    for i in range(n + 1):
-        p2x, p2y = poly[i % n]
-        if y > min(p1y, p2y):
-            if y <= max(p1y, p2y):
-                if x <= max(p1x, p2x):
-                    if p1y != p2y:
-                        xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                    if p1x == p2x or x <= xinters:
-                        inside = not inside
-        p1x, p1y = p2x, p2y
-    return inside
-
-def map_tracts_to_zips(tract_centroids, zip_polys):
+def map_tracts_to_zips(tract_centroids, zip_index):
     print("Mapping Tracts to Zips...")
-    tract_to_zip = {}
+    tracts = list(tract_centroids)
+    lons = [tract_centroids[t][0] for t in tracts]
+    lats = [tract_centroids[t][1] for t in tracts]
+    # One vectorized crossing test per zip polygon over all centroids in its bbox
+    zips = zip_index.assign(lons, lats)
+    tract_to_zip = {t: z for t, z in zip(tracts, zips) if z}
     
-    for tract, (lon, lat) in tract_centroids.items():
-        # Check against all zips (optimization: bounding box check could be added)
-        # For ~600 tracts and ~100 zips, brute force is acceptable (~60k ops)
-        mapped = False
-        for zipcode, polys in zip_polys.items():
-            for poly in polys:
-                if point_in_polygon(lon, lat, poly):
-                    tract_to_zip[tract] = zipcode
-                    mapped = True
-                    break
-            if mapped: break
-        
-        if not mapped:
-            pass # Tract outside defined Zips
-            
     print(f"Mapped {len(tract_to_zip)} Tracts to Zips.")
     return tract_to_zip
 
+def read_dbf(raw, fields):
+    """Yield {field: value} for the named columns of a dBase III table (a shapefile's .dbf)."""
+    n_records, header_len, record_len = struct.unpack('<IHH', raw[4:12])
+    columns, offset, pos = [], 1, 32  # byte 0 of each record is the deletion flag
+    while raw[pos] != 0x0D:
+        name = raw[pos:pos + 11].split(b'\0')[0].decode('ascii')
+        length = raw[pos + 16]
+        if name in fields:
+            columns.append((name, offset, length))
+        offset += length
+        pos += 32
+    for i in range(n_records):
+        start = header_len + i * record_len
+        record = raw[start:start + record_len]
+        if record[:1] == b'*':
+            continue
+        yield {name: record[o:o + n].decode('latin-1').strip() for name, o, n in columns}
+
+def load_block_centroids():
+    """{block GEOID: (lon, lat)} for every 2020 census block in the county, plus the source hash."""
+    print("Loading block internal points...")
+    with zipfile.ZipFile(io.BytesIO(http_cache.read_bytes(BLOCK_URL))) as zf:
+        dbf_name = next(n for n in zf.namelist() if n.endswith('.dbf'))
+        dbf = zf.read(dbf_name)
+    centroids = {}
+    for rec in read_dbf(dbf, {'GEOID20', 'INTPTLAT20', 'INTPTLON20'}):
+        try:
+            centroids[rec['GEOID20']] = (float(rec['INTPTLON20']), float(rec['INTPTLAT20']))
+        except ValueError:
+            continue
+    print(f"Loaded {len(centroids)} SD blocks.")
+    return centroids, http_cache.content_hash(BLOCK_URL)
+
+def map_blocks_to_zips(block_centroids, zip_index):
+    print("Mapping Blocks to Zips...")
+    blocks = list(block_centroids)
+    zips = zip_index.assign([block_centroids[b][0] for b in blocks], [block_centroids[b][1] for b in blocks])
+    block_to_zip = {b: z for b, z in zip(blocks, zips) if z}
+    print(f"Mapped {len(block_to_zip)} Blocks to Zips.")
+    return block_to_zip
+
 def normalize_tract_suffix(t):
     # SWDB tract: '20706' -> Need to match Gazetteer '06073020706'
     # Gazetteer has full FIPS.
@@ -127,24 +150,27 @@ def normalize_tract_suffix(t):
         t = '0' + t
     return f"{COUNTY_FIPS}{t}"
 
-def build_precinct_zip_weights(sr_blk_map, tract_to_zip):
+def build_precinct_zip_weights(sr_blk_map, tract_to_zip, block_to_zip=None):
+    """Population-weighted {precinct: {zip: share}} from (srprec, tract, block, pctsrprec) rows.
+
+    Each block row is placed by its own centroid when the block is in
+    block_to_zip, otherwise by its tract centroid. block_to_zip must be of
+    the same census block vintage as sr_blk_map (see election_block_map):
+    tract+block IDs are reused across vintages for different blocks.
+    """
     print("Building Precinct -> Zip weights...")
+    block_to_zip = block_to_zip or {}
     prec_zip_counts = defaultdict(lambda: defaultdict(float))
     
-    for row in sr_blk_map:
-        prec = row.get('srprec')
-        tract_suffix = row.get('tract')
+    for prec, tract_suffix, block, pct in sr_blk_map:
         if not prec or not tract_suffix: continue
         
-        # We don't have block-to-tract map in this file directly?
-        # Column 'tract' is in the file (checked headers earlier).
-        # Headers: ['srprec', 'tract', 'block', ... 'pctsrprec']
-        
         full_tract = normalize_tract_suffix(tract_suffix)
-        zipcode = tract_to_zip.get(full_tract)
+        block = (block or '').strip().zfill(4)
+        zipcode = block_to_zip.get(full_tract + block) or tract_to_zip.get(full_tract)
         
         try:
-            pct = float(row['pctsrprec'])
+            pct = float(pct)
         except:
             pct = 0.0
             
@@ -164,203 +190,241 @@ def build_precinct_zip_weights(sr_blk_map, tract_to_zip):
             
     return prec_weights
 
-def process_year(year, blk_map_url, sov_url, city_map_url, tract_to_zip, pres_columns):
+def election_urls(code):
+    """(block map, SOV, city map) URLs for a SWDB election code like 'g24'."""
+    base = f"{SWDB_BASE}/{code.upper()}/c073/c073_{code}"
+    return f"{base}_sr_blk_map.csv", f"{base}_sov_data_by_{code}_srprec.csv", f"{base}_srprec_to_city.csv"
+
+def cached_precinct_zip_weights(year, input_hashes, build):
+    """Load the precinct -> zip weights for `year` from disk, or build() and store them.
+
+    The cache key covers every input (block map, block centroids, zip
+    polygons), so any changed file forces a rebuild.
+    """
+    key = hashlib.sha256('|'.join(input_hashes).encode()).hexdigest()[:16]
+    path = CROSSWALK_CACHE / f"g{year}_{key}.json.gz"
+    if path.exists():
+        print(f"Using cached crosswalk {path.name}")
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    weights = build()
+    CROSSWALK_CACHE.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(weights, f, separators=(',', ':'))
+    return weights
+
+def process_year(year, blk_map_url, sov_url, city_map_url, tract_to_zip, pres_columns,
+                 block_to_zip=None, geo_hashes=()):
     print(f"\nProcessing {year}...")
     
-    # 1. Block Map
+    # 1. Block Map (from the HTTP cache; its content hash keys the crosswalk cache)
     try:
-        sr_blk_map = download_csv(blk_map_url)
+        blk_hash = http_cache.content_hash(blk_map_url)
     except Exception as e:
         print(f"Failed to download block map: {e}")
         return None
         
-    prec_weights = build_precinct_zip_weights(sr_blk_map, tract_to_zip)
+    prec_weights = cached_precinct_zip_weights(
+        year, [blk_hash, *geo_hashes],
+        lambda: build_precinct_zip_weights(
+            stream_csv(blk_map_url, BLK_MAP_COLUMNS), tract_to_zip, block_to_zip))
     
     # 2. City Map
     city_map = {}
     try:
-        city_rows = download_csv(city_map_url)
-        for row in city_rows:
-            prec = row.get('srprec') or row.get('SRPREC')
-            city = row.get('city') or row.get('CITY', 'Unknown')
-            if prec: city_map[prec] = city
+        for prec, city in stream_csv(city_map_url, CITY_MAP_COLUMNS):
+            if prec: city_map[prec] = city or 'Unknown'
     except Exception as e:
         print(f"Failed to download city map: {e}")
 
     # 3. SOV Data
     try:
-        sov_data = download_csv(sov_url)
+        http_cache.fetch(sov_url)
     except Exception as e:
         print(f"Failed to download SOV data: {e}")
         return None
-        
-    # Aggregation Buckets
-    zip_votes = defaultdict(lambda: defaultdict(float))
-    zip_meta = defaultdict(lambda: {'precincts': set()})
-    
-    city_votes = defaultdict(lambda: defaultdict(float))
-    
-    county_votes = defaultdict(float)
-    
-    all_precincts = []
-    
-    for row in sov_data:
-        prec = row.get('srprec') or row.get('SRPREC')
-        if not prec: continue
-        
-        # Parse Votes
-        prec_candidate_votes = {}
-        prec_total = 0
-        for col, cand in pres_columns.items():
-            try:
-                val = float(row.get(col, 0))
-            except:
-                val = 0
-            if val > 0:
-                prec_candidate_votes[cand] = val
-                prec_total += val
-        
-        if prec_total == 0: continue
+    # Every contest in the file, read in a single pass into one precinct x column array
+    races = detect_races(read_header(sov_url), named={'president': pres_columns})
+    columns, district_cols = race_columns(races), district_columns(races)
+    precincts, all_votes, districts = parse_votes(
+        stream_csv(sov_url, ('srprec', *district_cols, *columns)), len(columns), len(district_cols))
+    # District offices become one race per cddist/sddist/addist value
+    races, all_votes = split_districts(races, all_votes, dict(zip(district_cols, districts)))
+    candidates = list(pres_columns.values())
+    pres_cols = race_slices(races)['president']
+    votes = all_votes[:, pres_cols]
+    prec_totals = votes.sum(axis=1)
+    has_pres = prec_totals > 0
+
+    # City group-by (missing from the city map -> Unincorporated)
+    city_names, all_city_votes = group_sum(all_votes, [city_map.get(p) or 'Unincorporated' for p in precincts])
+    city_votes = all_city_votes[:, pres_cols]
+
+    # Zip totals: sparse precinct x zip weights times the precinct x column votes
+    xwalk = SparseWeights.from_weights(precincts, prec_weights)
+    all_zip_votes = xwalk.transpose_dot(all_votes)
+    zip_votes = all_zip_votes[:, pres_cols]
+    zip_counts = xwalk.precinct_counts(has_pres)
+    zip_members = xwalk.members(precincts, has_pres)
 
-        # County Totals
-        for cand, val in prec_candidate_votes.items():
-            county_votes[cand] += val
-        county_votes['total'] += prec_total
-        
-        # Precinct List
-        all_precincts.append({
-            'precinct': prec, 
-            'total': round(prec_total),
-            'city': city_map.get(prec, 'Unknown'),
-            **{c: round(v) for c, v in prec_candidate_votes.items()}
-        })
-
-        # City Aggregation
-        city = city_map.get(prec, 'Unincorporated') # Default to Unincorporated if missing
-        # Some maps use 'Unincorporated' explicitly, others might not map it?
-        # Use city map value, default to Unknown? Or specific default?
-        if not city_map.get(prec): city = 'Unincorporated' 
-        
-        for cand, val in prec_candidate_votes.items():
-            city_votes[city][cand] += val
-        city_votes[city]['total'] += prec_total
-
-        # Zip Aggregation
-        weights = prec_weights.get(prec, {'Unknown': 1.0})
-        for z, w in weights.items():
-            if w <= 0: continue
-            for cand, votes in prec_candidate_votes.items():
-                zip_votes[z][cand] += votes * w
-            zip_votes[z]['total'] += prec_total * w
-            zip_meta[z]['precincts'].add(prec)
-            
     # Formatter
-    def format_cand_stats(votes_dict, total):
+    def format_cand_stats(row):
+        total = row.sum()
         return {
             cand: {
                 'votes': round(val),
                 'percentage': round(val / total * 100, 2) if total > 0 else 0
             }
-            for cand, val in votes_dict.items() 
-            if cand != 'total' and round(val) > 0
+            for cand, val in zip(candidates, row.tolist())
+            if round(val) > 0
         }
 
     # Output Construction
     output = {
         'year': year,
         'county': 'San Diego',
-        'total_votes': round(county_votes['total']),
-        'num_precincts': len(all_precincts),
-        'candidates': format_cand_stats(county_votes, county_votes['total']),
-        'precincts': all_precincts, # Include full list for drill down
+        'total_votes': round(prec_totals.sum()),
+        'num_precincts': int(has_pres.sum()),
+        'candidates': format_cand_stats(votes.sum(axis=0)),
+        'precincts': [  # Include full list for drill down
+            {
+                'precinct': prec,
+                'total': round(total),
+                'city': city_map.get(prec, 'Unknown'),
+                **{c: round(v) for c, v in zip(candidates, row) if v > 0}
+            }
+            for prec, total, row in zip(precincts, prec_totals.tolist(), votes.tolist())
+            if total > 0
+        ],
         'by_city': {},
         'by_zipcode': {}
     }
     
     # Process Cities
-    for city, counts in city_votes.items():
-        if counts['total'] < 10: continue
+    for city, row in zip(city_names, city_votes):
+        if row.sum() < 10: continue
         output['by_city'][city] = {
-            'total_votes': round(counts['total']),
-            'candidates': format_cand_stats(counts, counts['total'])
+            'total_votes': round(row.sum()),
+            'candidates': format_cand_stats(row)
         }
         
     # Process Zips
-    for z, counts in zip_votes.items():
+    for z, row, count in zip(xwalk.labels, zip_votes, zip_counts.tolist()):
         if z == 'Unknown': continue
-        if counts['total'] < 10: continue
+        if row.sum() < 10: continue
         
         output['by_zipcode'][z] = {
-            'total_votes': round(counts['total']),
-            'candidates': format_cand_stats(counts, counts['total']),
-            'precinct_count': len(zip_meta[z]['precincts']),
-            'precinct_ids': list(zip_meta[z]['precincts'])
+            'total_votes': round(row.sum()),
+            'candidates': format_cand_stats(row),
+            'precinct_count': count,
+            'precinct_ids': zip_members[z]
         }
     
-    print(f"  Aggregated {len(output['by_city'])} Cities, {len(output['by_zipcode'])} Zips")
+    # Down-ballot contests and propositions from the same arrays
+    output['races'] = aggregate_races(
+        races, all_votes.sum(axis=0), city_names, all_city_votes,
+        xwalk.labels, all_zip_votes, skip=('president',))
+
+    print(f"  Aggregated {len(output['by_city'])} Cities, {len(output['by_zipcode'])} Zips, {len(output['races'])} other races")
     return output
 
+def prefetch(elections):
+    """Download every election's files concurrently (I/O bound, so threads)."""
+    urls = [url for e in elections for url in election_urls(e['code'])]
+
+    def fetch(url):
+        try:
+            http_cache.fetch(url)
+        except Exception as e:
+            # process_year reports the failure for its own election
+            print(f"  Prefetch failed for {url.split('/')[-1]}: {e}")
+
+    with ThreadPoolExecutor(max_workers=min(8, len(urls) or 1)) as pool:
+        list(pool.map(fetch, urls))
+
+_GEO = {}
+
+def _init_worker(geo_path, offline):
+    """Load the shared tract/block -> zip crosswalk once per worker process."""
+    with open(geo_path, 'rb') as f:
+        _GEO.update(pickle.load(f))
+    http_cache.set_offline(offline)
+
+def election_block_map(election, block_to_zip, geo_hashes):
+    """(block_to_zip, geo_hashes) to build an election's crosswalk with.
+
+    The block centroids are BLOCK_VINTAGE blocks; an election whose block
+    map uses another vintage gets no block table, so every row falls back
+    to its tract centroid (and its crosswalk cache key says so).
+    """
+    if election['block_vintage'] == BLOCK_VINTAGE:
+        return block_to_zip, geo_hashes
+    return {}, ('no-blocks', *geo_hashes[1:])
+
+def _process_election(election):
+    blk_map_url, sov_url, city_map_url = election_urls(election['code'])
+    block_to_zip, geo_hashes = election_block_map(election, _GEO['block_to_zip'], _GEO['geo_hashes'])
+    return election['year'], process_year(
+        election['year'], blk_map_url, sov_url, city_map_url,
+        _GEO['tract_to_zip'], election['pres'], block_to_zip, geo_hashes)
+
+def process_elections(elections, tract_to_zip, block_to_zip, geo_hashes, workers=GEO_WORKERS):
+    """{year: output} for every election, aggregated in a process pool.
+
+    The crosswalk is pickled to one temp file that each worker loads in its
+    initializer, instead of being re-sent with every task.
+    """
+    prefetch(elections)
+    with tempfile.TemporaryDirectory() as tmp:
+        geo_path = Path(tmp) / 'geo.pickle'
+        with open(geo_path, 'wb') as f:
+            pickle.dump({'tract_to_zip': tract_to_zip, 'block_to_zip': block_to_zip,
+                         'geo_hashes': geo_hashes}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        init_args = (geo_path, http_cache.is_offline())
+        if workers <= 1:
+            _init_worker(*init_args)
+            return dict(map(_process_election, elections))
+        with Pool(min(workers, len(elections)), initializer=_init_worker, initargs=init_args) as pool:
+            return dict(pool.map(_process_election, elections))
+
 def main():
+    parser = argparse.ArgumentParser(description="Build the voting index and precinct shards from SWDB precinct results.")
+    parser.add_argument('--offline', action='store_true',
+                        help="Use only files already in the local download cache")
+    if parser.parse_args().offline:
+        http_cache.set_offline()
+
     # 1. Gazetteer & Zip Polys
-    tract_centroids = parse_gazetteer()
-    zip_polys = load_zip_polygons()
-    if not tract_centroids or not zip_polys: return
-    tract_to_zip = map_tracts_to_zips(tract_centroids, zip_polys)
-    
-    results = {}
-    
-    # 2024
-    results['2024'] = process_year(
-        '2024',
-        f"{SWDB_BASE}/G24/c073/c073_g24_sr_blk_map.csv",
-        f"{SWDB_BASE}/G24/c073/c073_g24_sov_data_by_g24_srprec.csv",
-        f"{SWDB_BASE}/G24/c073/c073_g24_srprec_to_city.csv",
-        tract_to_zip,
-        {'PRSDEM01': 'Harris', 'PRSREP01': 'Trump', 'PRSAIP01': 'Kennedy', 'PRSGRN01': 'Stein', 'PRSLIB01': 'Oliver', 'PRSPAF01': 'De la Cruz'}
-    )
-    
-    # 2020
-    results['2020'] = process_year(
-        '2020',
-        f"{SWDB_BASE}/G20/c073/c073_g20_sr_blk_map.csv",
-        f"{SWDB_BASE}/G20/c073/c073_g20_sov_data_by_g20_srprec.csv",
-        f"{SWDB_BASE}/G20/c073/c073_g20_srprec_to_city.csv",
-        tract_to_zip,
-        {'PRSDEM01': 'Biden', 'PRSREP01': 'Trump', 'PRSLIB01': 'Jorgensen', 'PRSGRN01': 'Hawkins', 'PRSAIP01': 'De La Fuente', 'PRSPAF01': 'La Riva'}
+    try:
+        tract_centroids = parse_gazetteer()
+    except http_cache.OfflineMiss as e:
+        print(f"Gazetteer unavailable: {e}")
+        return
+    zip_index = ZipIndex.load()
+    if not tract_centroids or not zip_index.entries: return
+    tract_to_zip = map_tracts_to_zips(tract_centroids, zip_index)
+    try:
+        block_centroids, block_hash = load_block_centroids()
+        block_to_zip = map_blocks_to_zips(block_centroids, zip_index)
+    except Exception as e:
+        print(f"Block centroids unavailable, using tract centroids only: {e}")
+        block_to_zip, block_hash = {}, 'no-blocks'
+    geo_hashes = (
+        block_hash,
+        content_hash(json.dumps(sorted(tract_to_zip.items())).encode()),
+        content_hash(ZIP_GEOJSON.read_bytes()),
     )
     
-    # 2016
-    results['2016'] = process_year(
-        '2016',
-        f"{SWDB_BASE}/G16/c073/c073_g16_sr_blk_map.csv",
-        f"{SWDB_BASE}/G16/c073/c073_g16_sov_data_by_g16_srprec.csv",
-        f"{SWDB_BASE}/G16/c073/c073_g16_srprec_to_city.csv",
-        tract_to_zip,
-        {'PRSDEM01': 'Clinton', 'PRSREP01': 'Trump', 'PRSLIB01': 'Johnson', 'PRSGRN01': 'Stein', 'PRSPAF01': 'La Riva'}
-    )
-
-    # 2012
-    results['2012'] = process_year(
-        '2012',
-        f"{SWDB_BASE}/G12/c073/c073_g12_sr_blk_map.csv",
-        f"{SWDB_BASE}/G12/c073/c073_g12_sov_data_by_g12_srprec.csv",
-        f"{SWDB_BASE}/G12/c073/c073_g12_srprec_to_city.csv",
-        tract_to_zip,
-        {'PRSDEM01': 'Obama', 'PRSREP01': 'Romney', 'PRSLIB01': 'Johnson', 'PRSGRN01': 'Stein', 'PRSPAF01': 'Barr', 'PRSAIP01': 'Hoefling'}
-    )
+    results = process_elections(ELECTIONS, tract_to_zip, block_to_zip, geo_hashes)
     
     # Full overwrite of elections data
-    final_data = {
+    meta = {
         "source": "California Statewide Database (UC Berkeley)",
         "county": "San Diego",
         "last_updated": "2025-01-07",
         "granularity": "precinct",
-        "elections": results
     }
-            
-    with open(OUTPUT_DIR / 'voting_data.json', 'w') as f:
-        json.dump(final_data, f, indent=2)
-    print(f"\nUpdated {OUTPUT_DIR / 'voting_data.json'}")
+    write_voting_data(meta, results)
 
 if __name__ == '__main__':
     main()
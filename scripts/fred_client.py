@@ -0,0 +1,198 @@
+"""
+Shared client for FRED series observations.
+
+One keep-alive requests.Session serves every call, and fetch_many() runs
+several series concurrently under a token-bucket rate limit (FRED allows 120
+requests a minute per key).
+
+Observations are cached per series under scripts/.cache/fred/. Once a series
+is cached, a refresh only asks for observations from REVISION_DAYS before
+the last cached date (`observation_start`), so routine runs transfer a few
+points instead of the whole history while recent revisions are still picked
+up. If a request fails, the cached observations are served with a warning.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+FRED_API_KEY = os.environ.get("FRED_API_KEY", "a72b02db4318645167d222b3d497ae02")
+FRED_BASE_URL = "https://api.stlouisfed.org/fred/series/observations"
+
+CACHE_DIR = Path(__file__).parent / ".cache" / "fred"
+REVISION_DAYS = 90
+MAX_WORKERS = 4
+
+
+class RateLimiter:
+    """Token bucket: up to `burst` calls at once, refilled at `per_second`."""
+
+    def __init__(self, per_second=2.0, burst=8):
+        self.per_second = per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.per_second)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.per_second
+            time.sleep(delay)
+
+
+def _clean(observations):
+    """[{date, value}] without FRED's "." placeholders for missing values."""
+    return [{"date": o["date"], "value": float(o["value"])}
+            for o in observations if o.get("value") and o["value"] != "."]
+
+
+class FredClient:
+    def __init__(self, api_key=FRED_API_KEY, cache_dir=CACHE_DIR, revision_days=REVISION_DAYS,
+                 max_workers=MAX_WORKERS, limiter=None):
+        self.api_key = api_key
+        self.cache_dir = cache_dir
+        self.revision_days = revision_days
+        self.max_workers = max_workers
+        self.limiter = limiter or RateLimiter()
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+        self.transferred = 0  # observations received from the API this run
+        self._lock = threading.Lock()
+
+    def _cache_path(self, series_id):
+        return self.cache_dir / f"{series_id}.json"
+
+    def _load(self, series_id):
+        path = self._cache_path(series_id)
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save(self, series_id, entry):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._cache_path(series_id)
+        tmp = path.with_name(path.name + ".part")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def _request(self, series_id, **params):
+        """Raw observation rows (including "." placeholders) for one API call."""
+        self.limiter.wait()
+        response = self.session.get(FRED_BASE_URL, params={
+            "series_id": series_id,
+            "api_key": self.api_key,
+            "file_type": "json",
+            **params,
+        }, timeout=30)
+        response.raise_for_status()
+        observations = response.json().get("observations", [])
+        with self._lock:
+            self.transferred += len(observations)
+        return observations
+
+    def observations(self, series_id, limit=None):
+        """Newest-first observations of a series (the latest `limit` if given).
+
+        The cache holds ascending observations, how many of the latest rows
+        were originally requested ("depth") and whether it reaches back to
+        the start of the series ("complete"). It is extended incrementally
+        when it goes back far enough for the request, and refetched otherwise.
+        """
+        entry = self._load(series_id)
+        enough = entry and (entry["complete"] or (limit is not None and entry.get("depth", 0) >= limit))
+
+        if enough and entry["observations"]:
+            last = date.fromisoformat(entry["observations"][-1]["date"])
+            start = (last - timedelta(days=self.revision_days)).isoformat()
+            recent = _clean(self._request(series_id, observation_start=start, sort_order="asc"))
+            kept = [o for o in entry["observations"] if o["date"] < start]
+            entry["observations"] = kept + recent
+        elif limit is None:
+            entry = {"complete": True, "observations": _clean(self._request(series_id, sort_order="asc"))}
+        else:
+            newest = self._request(series_id, sort_order="desc", limit=limit)
+            # Fewer rows than asked for means the whole series came back
+            entry = {"complete": len(newest) < limit, "depth": limit, "observations": _clean(newest)[::-1]}
+
+        entry["fetched"] = datetime.now().isoformat(timespec="seconds")
+        self._save(series_id, entry)
+        observations = entry["observations"][::-1]
+        return observations[:limit] if limit is not None else observations
+
+    def fetch_series(self, series_id, limit=None):
+        """observations(), falling back to the cache (or []) with a message on failure."""
+        try:
+            return self.observations(series_id, limit)
+        except Exception as e:
+            entry = self._load(series_id)
+            if entry and entry["observations"]:
+                print(f"Error fetching {series_id}: {e}; using cached observations from {entry.get('fetched')}")
+                observations = entry["observations"][::-1]
+                return observations[:limit] if limit is not None else observations
+            print(f"Error fetching {series_id}: {e}")
+            return []
+
+    def fetch_since(self, series_id, start):
+        """Newest-first observations dated on or after `start` (YYYY-MM-DD), bypassing the cache.
+
+        For callers that keep their own history; returns None on failure so
+        that an error is not mistaken for "no new observations".
+        """
+        try:
+            return _clean(self._request(series_id, observation_start=start, sort_order="desc"))
+        except Exception as e:
+            print(f"Error fetching {series_id} since {start}: {e}")
+            return None
+
+    def _fetch_all(self, fn, args_by_series):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {sid: pool.submit(fn, sid, arg) for sid, arg in args_by_series.items()}
+            return {sid: future.result() for sid, future in futures.items()}
+
+    def fetch_many(self, requests_by_series):
+        """{series_id: observations} for {series_id: limit}, fetched concurrently."""
+        return self._fetch_all(self.fetch_series, requests_by_series)
+
+    def fetch_many_since(self, starts_by_series):
+        """{series_id: observations or None} for {series_id: start date}, fetched concurrently."""
+        return self._fetch_all(self.fetch_since, starts_by_series)
+
+
+_default_client = None
+
+
+def default_client():
+    global _default_client
+    if _default_client is None:
+        _default_client = FredClient()
+    return _default_client
+
+
+def fetch_fred_series(series_id, limit=None):
+    """Newest-first [{date, value}] for one series via the shared client ([] on failure)."""
+    return default_client().fetch_series(series_id, limit)
+
+
+def fetch_fred_many(requests_by_series):
+    """{series_id: newest-first observations} for {series_id: limit}, fetched concurrently."""
+    return default_client().fetch_many(requests_by_series)
+
+
+def fetch_fred_many_since(starts_by_series):
+    """{series_id: newest-first observations or None} for {series_id: start date}, fetched concurrently."""
+    return default_client().fetch_many_since(starts_by_series)
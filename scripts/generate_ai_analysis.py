@@ -124,9 +124,11 @@ def generate_general_overview(zip_code, data_detached, data_attached):
 
     return intro
 
-def main():
+def main(data=None):
+    """Generate analysis from the given sdar_neighborhood_data dict (default: read it from disk)."""
     print("Generating AI Analysis for all zip codes...")
-    data = load_data()
+    if data is None:
+        data = load_data()
     analysis_output = {}
 
     # The data structure is { "meta": ..., "neighborhoods": [ { "zip_code": "...", ... } ] }
@@ -1,7 +1,8 @@
-import json
 import csv
 import os
 
+from geo_index import load_zip_geometry
+
 # Data from User Request
 METRO_SAN_DIEGO = {
     "zone": "Metro San Diego",
@@ -29,15 +30,8 @@ CAMP_PENDLETON_ZIPS = {
 }
 
 def generate_csv():
-    # Load all SD zip codes to ensure coverage
-    with open('public/data/sd_zipcodes.json', 'r') as f:
-        data = json.load(f)
-    
-    zip_to_city = {}
-    for feature in data['features']:
-        zip_code = feature['properties']['ZIPCODE']
-        city = feature['properties']['NAME']
-        zip_to_city[zip_code] = city
+    # Load all SD zip codes to ensure coverage (memory-mapped zip index)
+    zip_to_city = dict(load_zip_geometry().names)
 
     # Add any missing zips mentioned by user that weren't in the GeoJSON
     missing_zips = {
@@ -0,0 +1,399 @@
+"""
+Zip-code polygon index for point -> zip lookups.
+
+Built once from public/data/sd_zipcodes.json: every polygon's bounding box is
+binned into a uniform lon/lat grid, so a lookup only ray-tests the few
+polygons whose boxes overlap the point's cell instead of every ring of every
+zip. For bulk joins (census block centroids, POIs) ZipIndex.assign() runs the
+NumPy crossing-test kernel over whole coordinate arrays at once.
+
+Polygons are lists of rings: [outer, hole, hole, ...].
+
+build_zip_geometry.py also compiles the GeoJSON into a flat binary index
+(per-zip bbox, centroid and area plus packed ring coordinates) that
+load_zip_geometry() memory-maps, so scripts get polygons as NumPy views
+without parsing JSON. The index records the GeoJSON's hash and is rebuilt
+whenever the source changes.
+"""
+import hashlib
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+
+ZIP_GEOJSON = Path(__file__).parent.parent / 'public' / 'data' / 'sd_zipcodes.json'
+ZIP_INDEX_BIN = Path(__file__).parent / '.cache' / 'geo' / 'sd_zipcodes.zidx'
+INDEX_MAGIC = b'ZIDX1\n'
+
+# Cells per side of the grid. sd_zipcodes.json has ~70 zips, so 64x64 cells
+# leaves only a few candidate polygons per cell.
+GRID_SIZE = 64
+
+
+def load_zip_polygons(path=ZIP_GEOJSON, names=None):
+    """{zip: [[outer, *holes], ...]} from the zip GeoJSON (one entry per Polygon part).
+
+    If `names` is a dict it is filled with {zip: NAME}.
+    """
+    if not path.exists():
+        print("Zip GeoJSON not found!")
+        return {}
+
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    zip_polys = {}
+    for feature in data['features']:
+        if names is not None:
+            names[feature['properties']['ZIPCODE']] = feature['properties'].get('NAME')
+        zipcode = feature['properties']['ZIPCODE']
+        geom = feature['geometry']
+        # Handle Polygon and MultiPolygon; keep holes after the outer ring
+        polys = []
+        if geom['type'] == 'Polygon':
+            polys.append(geom['coordinates'])
+        elif geom['type'] == 'MultiPolygon':
+            polys.extend(geom['coordinates'])
+
+        zip_polys[zipcode] = polys
+
+    return zip_polys
+
+
+def point_in_polygon(x, y, poly):
+    """Ray casting algorithm for a single ring."""
+    n = len(poly)
+    inside = False
+    p1x, p1y = poly[0]
+    for i in range(n + 1):
+        p2x, p2y = poly[i % n]
+        if y > min(p1y, p2y):
+            if y <= max(p1y, p2y):
+                if x <= max(p1x, p2x):
+                    if p1y != p2y:
+                        xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
+                    if p1x == p2x or x <= xinters:
+                        inside = not inside
+        p1x, p1y = p2x, p2y
+    return inside
+
+
+def point_in_rings(x, y, rings):
+    """Inside the outer ring and outside every hole."""
+    if not point_in_polygon(x, y, rings[0]):
+        return False
+    return not any(point_in_polygon(x, y, hole) for hole in rings[1:])
+
+
+def points_in_ring(xs, ys, ring):
+    """Boolean mask of which points (xs[i], ys[i]) fall inside ring.
+
+    Even-odd crossing test evaluated for every point at once, one edge at a
+    time, so cost is O(edges) array operations regardless of point count.
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    ring = np.asarray(ring, dtype=float)
+    inside = np.zeros(xs.shape, dtype=bool)
+    ax, ay = ring[:, 0], ring[:, 1]
+    bx, by = np.roll(ax, -1), np.roll(ay, -1)
+    for x1, y1, x2, y2 in zip(ax, ay, bx, by):
+        if y1 == y2:
+            continue  # horizontal (or closing zero-length) edge never crosses
+        straddles = (y1 > ys) != (y2 > ys)
+        x_cross = x1 + (ys - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= straddles & (xs < x_cross)
+    return inside
+
+
+def points_in_polygon(xs, ys, rings):
+    """Boolean mask for a polygon given as [outer, *holes]."""
+    mask = points_in_ring(xs, ys, rings[0])
+    for hole in rings[1:]:
+        if mask.any():
+            mask &= ~points_in_ring(xs, ys, hole)
+    return mask
+
+
+def ring_bbox(ring):
+    xs = [p[0] for p in ring]
+    ys = [p[1] for p in ring]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def ring_area_centroid(ring):
+    """(signed area, centroid x, centroid y) of a ring by the shoelace formula."""
+    ring = np.asarray(ring, dtype=float)
+    x, y = ring[:, 0], ring[:, 1]
+    x2, y2 = np.roll(x, -1), np.roll(y, -1)
+    cross = x * y2 - x2 * y
+    area = cross.sum() / 2
+    if area == 0:
+        return 0.0, float(x.mean()), float(y.mean())
+    return float(area), float(((x + x2) * cross).sum() / (6 * area)), float(((y + y2) * cross).sum() / (6 * area))
+
+
+def zip_area_centroid(polygons):
+    """(area in km^2, centroid lon, centroid lat) of a zip's polygons, holes subtracted.
+
+    Areas use a local equirectangular projection, which is accurate to well
+    under a percent at the size of a zip code.
+    """
+    total = cx = cy = 0.0
+    for rings in polygons:
+        for i, ring in enumerate(rings):
+            area, x, y = ring_area_centroid(ring)
+            area = abs(area) * (-1 if i else 1)
+            total += area
+            cx += area * x
+            cy += area * y
+    if total == 0:
+        pts = np.concatenate([np.asarray(r[0], dtype=float) for r in polygons])
+        return 0.0, float(pts[:, 0].mean()), float(pts[:, 1].mean())
+    cx, cy = cx / total, cy / total
+    km2 = total * 111.320 * math.cos(math.radians(cy)) * 110.574
+    return km2, cx, cy
+
+
+def write_zip_index(zip_polys, names, source_hash, path=ZIP_INDEX_BIN):
+    """Pack zip polygons into the binary index read by ZipGeometry.
+
+    Layout: magic, uint32 header length, JSON header (zips, names, source
+    hash, array table), then each array's raw bytes at a 16-byte aligned
+    offset.
+    """
+    zips = list(zip_polys)
+    zip_poly_start, poly_ring_start, ring_coord_start = [0], [0], [0]
+    coords, bbox, centroid, area = [], [], [], []
+    for z in zips:
+        for rings in zip_polys[z]:
+            for ring in rings:
+                coords.append(np.asarray(ring, dtype=np.float64).reshape(-1, 2))
+                ring_coord_start.append(ring_coord_start[-1] + len(ring))
+            poly_ring_start.append(poly_ring_start[-1] + len(rings))
+        zip_poly_start.append(zip_poly_start[-1] + len(zip_polys[z]))
+        outers = [np.asarray(rings[0], dtype=float) for rings in zip_polys[z]]
+        pts = np.concatenate(outers) if outers else np.zeros((1, 2))
+        bbox.append((pts[:, 0].min(), pts[:, 1].min(), pts[:, 0].max(), pts[:, 1].max()))
+        km2, x, y = zip_area_centroid(zip_polys[z]) if outers else (0.0, 0.0, 0.0)
+        centroid.append((x, y))
+        area.append(km2)
+
+    arrays = {
+        'bbox': np.array(bbox, dtype=np.float64).reshape(-1, 4),
+        'centroid': np.array(centroid, dtype=np.float64).reshape(-1, 2),
+        'area_km2': np.array(area, dtype=np.float64),
+        'zip_poly_start': np.array(zip_poly_start, dtype=np.int32),
+        'poly_ring_start': np.array(poly_ring_start, dtype=np.int32),
+        'ring_coord_start': np.array(ring_coord_start, dtype=np.int64),
+        'coords': np.concatenate(coords) if coords else np.zeros((0, 2)),
+    }
+
+    table, offset = {}, 0
+    for name, arr in arrays.items():
+        table[name] = {'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+        offset += -(-arr.nbytes // 16) * 16
+    header = json.dumps({'source_hash': source_hash, 'zips': zips,
+                         'names': [names.get(z) for z in zips], 'arrays': table}).encode()
+    data_start = -(-(len(INDEX_MAGIC) + 4 + len(header)) // 16) * 16
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.part')
+    with open(tmp, 'wb') as f:
+        f.write(INDEX_MAGIC + len(header).to_bytes(4, 'little') + header)
+        for name, arr in arrays.items():
+            f.seek(data_start + table[name]['offset'])
+            f.write(np.ascontiguousarray(arr).tobytes())
+    tmp.replace(path)
+    return path
+
+
+class ZipGeometry:
+    """Read-only, memory-mapped view of the binary zip index."""
+
+    def __init__(self, path=ZIP_INDEX_BIN):
+        self.path = path
+        mm = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(mm[:len(INDEX_MAGIC)]) != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a zip index")
+        pos = len(INDEX_MAGIC)
+        header_len = int.from_bytes(bytes(mm[pos:pos + 4]), 'little')
+        header = json.loads(bytes(mm[pos + 4:pos + 4 + header_len]))
+        data_start = -(-(pos + 4 + header_len) // 16) * 16
+
+        self.source_hash = header['source_hash']
+        self.zips = header['zips']
+        self.names = dict(zip(self.zips, header['names']))
+        for name, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            start = data_start + spec['offset']
+            count = int(np.prod(spec['shape']))
+            view = mm[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+            setattr(self, name, view)
+
+    def _ring(self, r):
+        return self.coords[self.ring_coord_start[r]:self.ring_coord_start[r + 1]]
+
+    def polygons(self):
+        """{zip: [[outer, *holes], ...]} with rings as (n, 2) array views."""
+        out = {}
+        for i, z in enumerate(self.zips):
+            out[z] = [
+                [self._ring(r) for r in range(self.poly_ring_start[p], self.poly_ring_start[p + 1])]
+                for p in range(self.zip_poly_start[i], self.zip_poly_start[i + 1])
+            ]
+        return out
+
+
+def source_hash(path=ZIP_GEOJSON):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def build_zip_index(source=ZIP_GEOJSON, path=ZIP_INDEX_BIN):
+    names = {}
+    return write_zip_index(load_zip_polygons(source, names), names, source_hash(source), path)
+
+
+def load_zip_geometry(source=ZIP_GEOJSON, path=ZIP_INDEX_BIN):
+    """Memory-mapped zip geometry, (re)building the index if the GeoJSON changed."""
+    expected = source_hash(source) if source.exists() else None
+    if path.exists():
+        geometry = ZipGeometry(path)
+        if expected is None or geometry.source_hash == expected:
+            return geometry
+    if expected is None:
+        raise FileNotFoundError(source)
+    build_zip_index(source, path)
+    return ZipGeometry(path)
+
+
+class ZipIndex:
+    """Uniform-grid index over zip polygon bounding boxes.
+
+    lookup() and assign() return the same zip a brute-force scan in GeoJSON
+    feature order would: candidates are kept in insertion order and the
+    first polygon that contains the point wins.
+    """
+
+    def __init__(self, zip_polys, grid_size=GRID_SIZE):
+        self.entries = []  # (zip, [outer, *holes], bbox of outer)
+        for zipcode, polygons in zip_polys.items():
+            for rings in polygons:
+                self.entries.append((zipcode, rings, ring_bbox(rings[0])))
+
+        self.grid_size = grid_size
+        self.cells = {}
+        self._csr = None
+        if not self.entries:
+            self.extent = (0.0, 0.0, 0.0, 0.0)
+            return
+        self.extent = (
+            min(e[2][0] for e in self.entries), min(e[2][1] for e in self.entries),
+            max(e[2][2] for e in self.entries), max(e[2][3] for e in self.entries),
+        )
+        minx, miny, maxx, maxy = self.extent
+        self.cell_w = (maxx - minx) / grid_size or 1.0
+        self.cell_h = (maxy - miny) / grid_size or 1.0
+
+        for idx, (_, _, (x0, y0, x1, y1)) in enumerate(self.entries):
+            cx0, cy0 = self._cell(x0, y0)
+            cx1, cy1 = self._cell(x1, y1)
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    self.cells.setdefault((cx, cy), []).append(idx)
+
+    @classmethod
+    def from_geojson(cls, path=ZIP_GEOJSON, grid_size=GRID_SIZE):
+        return cls(load_zip_polygons(path), grid_size)
+
+    @classmethod
+    def load(cls, grid_size=GRID_SIZE):
+        """Index over the memory-mapped zip geometry (no GeoJSON parsing)."""
+        return cls(load_zip_geometry().polygons(), grid_size)
+
+    def _cell(self, x, y):
+        minx, miny, _, _ = self.extent
+        cx = min(max(int((x - minx) / self.cell_w), 0), self.grid_size - 1)
+        cy = min(max(int((y - miny) / self.cell_h), 0), self.grid_size - 1)
+        return cx, cy
+
+    def candidates(self, x, y):
+        """Entries whose bounding box contains (x, y), in insertion order."""
+        minx, miny, maxx, maxy = self.extent
+        if not (minx <= x <= maxx and miny <= y <= maxy):
+            return []
+        out = []
+        for idx in self.cells.get(self._cell(x, y), ()):
+            entry = self.entries[idx]
+            x0, y0, x1, y1 = entry[2]
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                out.append(entry)
+        return out
+
+    def lookup(self, x, y):
+        """Zip containing (lon, lat), or None."""
+        for zipcode, rings, _ in self.candidates(x, y):
+            if point_in_rings(x, y, rings):
+                return zipcode
+        return None
+
+    def _cell_table(self):
+        """CSR form of the grid: (cell start offsets, entry ids), built on first use."""
+        if self._csr is None:
+            n = self.grid_size * self.grid_size
+            counts = np.zeros(n + 1, dtype=np.int64)
+            ids = []
+            for cell in range(n):
+                members = self.cells.get(divmod(cell, self.grid_size), ())
+                counts[cell + 1] = len(members)
+                ids.extend(members)
+            self._csr = (np.cumsum(counts), np.asarray(ids, dtype=np.int64))
+            self._bboxes = np.array([e[2] for e in self.entries], dtype=float).reshape(-1, 4)
+        return self._csr
+
+    def assign(self, xs, ys):
+        """Zip for every point in the coordinate arrays (None where unmatched).
+
+        Vectorized counterpart of lookup(): points are binned into grid
+        cells, paired with their cell's candidate polygons and bbox-filtered,
+        then each polygon runs the crossing kernel on just its pairs. Where
+        several polygons contain a point, the first in insertion order wins.
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        out = np.full(xs.shape, None, dtype=object)
+        if not self.entries:
+            return out
+        minx, miny, maxx, maxy = self.extent
+        pts = np.flatnonzero((xs >= minx) & (xs <= maxx) & (ys >= miny) & (ys <= maxy))
+        if not pts.size:
+            return out
+
+        # Same cell arithmetic as _cell(), for all points at once
+        ptr, ids = self._cell_table()
+        last = self.grid_size - 1
+        cx = np.minimum(((xs[pts] - minx) / self.cell_w).astype(np.int64), last)
+        cy = np.minimum(((ys[pts] - miny) / self.cell_h).astype(np.int64), last)
+        cell = cx * self.grid_size + cy
+
+        # (point, candidate) pairs from each point's cell
+        counts = ptr[cell + 1] - ptr[cell]
+        pair_pt = np.repeat(pts, counts)
+        first = np.repeat(ptr[cell] - (np.cumsum(counts) - counts), counts)
+        pair_entry = ids[first + np.arange(len(pair_pt))]
+        x0, y0, x1, y1 = self._bboxes[pair_entry].T
+        px, py = xs[pair_pt], ys[pair_pt]
+        keep = (px >= x0) & (px <= x1) & (py >= y0) & (py <= y1)
+        pair_pt, pair_entry = pair_pt[keep], pair_entry[keep]
+
+        best = np.full(xs.shape, len(self.entries), dtype=np.int64)
+        order = np.argsort(pair_entry, kind='stable')
+        entry_ids, starts = np.unique(pair_entry[order], return_index=True)
+        for idx, members in zip(entry_ids.tolist(), np.split(pair_pt[order], starts[1:])):
+            hit = members[points_in_polygon(xs[members], ys[members], self.entries[idx][1])]
+            np.minimum.at(best, hit, idx)
+
+        matched = np.flatnonzero(best < len(self.entries))
+        out[matched] = [self.entries[i][0] for i in best[matched].tolist()]
+        return out
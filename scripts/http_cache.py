@@ -0,0 +1,135 @@
+"""
+On-disk cache for immutable bulk downloads (Statewide Database CSVs, Census
+Gazetteer and TIGER files).
+
+Each URL is stored once as a gzip file under scripts/.cache/http/, named by
+a hash of the URL; index.json records the sha256 of the decompressed content
+so callers can key derived artifacts (e.g. crosswalks) on it without
+re-reading the file. Downloads are streamed straight to disk.
+
+Offline mode (set_offline(True), a script's --offline flag, or
+BULK_OFFLINE=1) serves only from the cache and raises OfflineMiss for
+anything not already there, so rebuilds after a code change need no network.
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / '.cache' / 'http'
+INDEX_PATH = CACHE_DIR / 'index.json'
+CHUNK_SIZE = 1 << 16
+UA = "Mozilla/5.0 (compatible; warn-monitor data pipeline)"
+
+_offline = os.environ.get('BULK_OFFLINE', '') not in ('', '0')
+_lock = threading.Lock()
+
+
+class OfflineMiss(RuntimeError):
+    """Offline mode and the URL is not cached."""
+
+
+def set_offline(flag=True):
+    global _offline
+    _offline = bool(flag)
+
+
+def is_offline():
+    return _offline
+
+
+def _load_index():
+    if not INDEX_PATH.exists():
+        return {}
+    with open(INDEX_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _path_for(url):
+    return CACHE_DIR / f"{hashlib.sha256(url.encode()).hexdigest()[:24]}.gz"
+
+
+def _record(url, sha, size):
+    with _lock:
+        index = _load_index()
+        index[url] = {
+            'file': _path_for(url).name,
+            'sha256': sha,
+            'bytes': size,
+            'fetched': datetime.now().isoformat(timespec='seconds'),
+        }
+        tmp = INDEX_PATH.with_name(INDEX_PATH.name + '.part')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, INDEX_PATH)
+
+
+def fetch(url):
+    """Path of the gzip-cached copy of url, downloading it first if needed."""
+    path = _path_for(url)
+    if is_cached(url):
+        return path
+    if _offline:
+        raise OfflineMiss(f"offline and not cached: {url}")
+
+    print(f"  Downloading: {url.split('/')[-1]}")
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.part")
+    sha, size = hashlib.sha256(), 0
+    req = urllib.request.Request(url, headers={'User-Agent': UA})
+    try:
+        with urllib.request.urlopen(req) as response, gzip.open(tmp, 'wb') as out:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b''):
+                sha.update(chunk)
+                size += len(chunk)
+                out.write(chunk)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    _record(url, sha.hexdigest(), size)
+    return path
+
+
+def is_cached(url):
+    return _path_for(url).exists() and url in _load_index()
+
+
+def read_head(url, size):
+    """The first `size` bytes of url's content: from the cache if it is
+    there, otherwise with an HTTP Range request (nothing is cached)."""
+    if is_cached(url):
+        with gzip.open(_path_for(url), 'rb') as f:
+            return f.read(size)
+    if _offline:
+        raise OfflineMiss(f"offline and not cached: {url}")
+    req = urllib.request.Request(url, headers={'User-Agent': UA, 'Range': f'bytes=0-{size - 1}'})
+    with urllib.request.urlopen(req) as response:
+        # A server that ignores Range sends the whole file; stop after size bytes
+        return response.read(size)
+
+
+def open_binary(url):
+    """Decompressed binary stream of url's content (from the cache)."""
+    return gzip.open(fetch(url), 'rb')
+
+
+def open_text(url, encoding='utf-8-sig'):
+    """Text stream of url's content, decoded incrementally."""
+    return io.TextIOWrapper(open_binary(url), encoding=encoding, newline='')
+
+
+def read_bytes(url):
+    with open_binary(url) as f:
+        return f.read()
+
+
+def content_hash(url):
+    """sha256 of url's content as recorded when it was cached."""
+    fetch(url)
+    return _load_index()[url]['sha256']
@@ -0,0 +1,24 @@
+"""
+Writers for the minified JSON files served from public/data.
+
+Each file is written with a precompressed .gz next to it. The gzip header
+carries no name or timestamp, so unchanged data gives byte-identical files
+and no spurious diffs in the committed output.
+"""
+import gzip
+import json
+
+
+def dumps_compact(obj):
+    """Minified UTF-8 JSON bytes (also what content hashes are taken over)."""
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def write_json_variants(path, obj):
+    """Write obj as minified JSON plus a byte-for-byte reproducible .gz sibling."""
+    raw = dumps_compact(obj)
+    path.write_bytes(raw)
+    with open(path.with_name(path.name + '.gz'), 'wb') as f:
+        with gzip.GzipFile(filename='', mode='wb', fileobj=f, compresslevel=9, mtime=0) as gz:
+            gz.write(raw)
+    return raw
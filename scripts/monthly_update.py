@@ -21,20 +21,20 @@ Report sources (sdar.stats.10kresearch.com):
   Lender-Med. : /docs/fss/<YYYY-MM>/x/report?src=page  ("FSS" per the PDF's Subject metadata)
 """
 import argparse
+import contextlib
 import csv
 import datetime
-import json
+import io
 import shutil
-import subprocess
-import sys
 import time
 import urllib.parse
 from pathlib import Path
 
-import pdfplumber
 import requests
 
-from sdar_common import MONTH_NAMES, REPORTS_ROOT, parse_month_folder
+from sdar_common import (
+    CURRENT_YEAR, MONTH_NAMES, PRIOR_YEAR, REPORTS_ROOT, RunContext, extract_page_texts, parse_month_folder,
+)
 
 BASE = "https://sdar.stats.10kresearch.com/docs"
 UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -65,8 +65,7 @@ def fetch_pdf(url, dest):
 
 
 def pdf_first_page_text(path):
-    with pdfplumber.open(path) as pdf:
-        return pdf.pages[0].extract_text() or ""
+    return extract_page_texts(path, [0])[0]
 
 
 def assert_period(path, period, label):
@@ -131,41 +130,54 @@ def download_all(period, month_dir):
         print(f"  copied Monthly Indicators -> {hist.name}")
 
 
-def run_parsers(period):
+def run_parsers(period, month_dir):
+    """Run every parser stage in-process and collect its output into a RunContext."""
+    import extract_historical_data
+    import generate_ai_analysis
+    import process_lender_mediated
+    import process_sdar_pdfs
+    import process_supply
+
+    month_name = period.split()[0]
+    ctx = RunContext(period)
     steps = [
-        (["python", "process_sdar_pdfs.py", "--month", period], "sdar neighborhoods + county"),
-        (["python", "process_supply.py", "--month", period], "housing supply"),
-        (["python", "process_lender_mediated.py", "--month", period], "lender-mediated"),
-        (["python", "generate_ai_analysis.py"], "neighborhood analysis"),
-        (["python", "extract_historical_data.py"], "historical indicators"),
+        ("sdar", lambda: process_sdar_pdfs.run(month_dir, period, month_name), "sdar neighborhoods + county"),
+        ("supply", lambda: process_supply.run(month_dir, period, month_name), "housing supply"),
+        ("lender", lambda: process_lender_mediated.run(month_dir, period, month_name), "lender-mediated"),
+        (None, lambda: generate_ai_analysis.main(ctx["sdar"]), "neighborhood analysis"),
+        ("history", extract_historical_data.main, "historical indicators"),
     ]
-    for cmd, label in steps:
+    for stage, fn, label in steps:
         print(f"\n--- {label} ---")
-        r = subprocess.run(cmd, cwd=SCRIPTS, capture_output=True, text=True)
-        tail = "\n".join((r.stdout + r.stderr).strip().splitlines()[-3:])
-        print(tail)
-        if r.returncode != 0:
-            raise SystemExit(f"ABORT: {label} failed (exit {r.returncode})")
-
-
-def load(name):
-    return json.load(open(DATA / name, encoding="utf-8"))
-
-
-def figures_report(period):
+        buf = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+                result = fn()
+        except Exception as e:
+            print(buf.getvalue())
+            raise SystemExit(f"ABORT: {label} failed ({type(e).__name__}: {e})")
+        print("\n".join(buf.getvalue().strip().splitlines()[-3:]))
+        if stage:
+            if result is None:
+                raise SystemExit(f"ABORT: {label} produced no data")
+            ctx.add(stage, result)
+    return ctx
+
+
+def figures_report(ctx):
     """Print every figure the hand-written AI summaries reference."""
-    sd, hs, lm = load("sdar_neighborhood_data.json"), load("housing_supply_data.json"), load("lender_mediated_data.json")
-    hist = load("historical_indicators.json")
+    period = ctx.period
     print("\n" + "=" * 62)
     print(f"FIGURES REPORT — {period}  (for the AI executive summaries)")
     print("=" * 62)
-    for f, d in [("sdar", sd), ("supply", hs), ("lender", lm)]:
-        assert d["meta"]["report_period"] == period, f"{f} report_period != {period}"
+    for f in ("sdar", "supply", "lender"):
+        assert ctx[f]["meta"]["report_period"] == period, f"{f} report_period != {period}"
     yyyymm = f"{period.split()[1]}-{MONTH_NAMES.index(period.split()[0]) + 1:02d}"
-    assert hist[-1]["period"] == yyyymm, f"historical last period {hist[-1]['period']} != {yyyymm} — historical step failed?"
-    print(f"report_period OK in all 3 JSONs | historical last: {hist[-1]['period']}")
+    last = ctx.history_latest["period"]
+    assert last == yyyymm, f"historical last period {last} != {yyyymm} — historical step failed?"
+    print(f"report_period OK in all 3 JSONs | historical last: {last}")
 
-    cw = sd["county_wide"]
+    cw = ctx["sdar"]["county_wide"]
     for seg in ("detached", "attached"):
         c = cw[seg]
         print(f"\n[county {seg}]")
@@ -176,47 +188,40 @@ def figures_report(period):
               f" | new listings {c['new_listings_pct_change']:+}% | pending {c['pending_sales_pct_change']:+}%"
               f" | closed {c['closed_sales_pct_change']:+}%")
 
-    inv = hs["inventory"]["by_price_range"]
-    def tot(sec, sub, yr):
-        return sum(i.get(sub, {}).get(yr, 0) for i in hs[sec]["by_price_range"])
+    tot = ctx.supply_total
+    top, band = "$5,000,001 and Above", "$750,001 to $1,000,000"
     print("\n[supply rolling-12mo]")
     for sub in ("all_properties", "single_family", "condos"):
-        a, b = tot("inventory", sub, "2025"), tot("inventory", sub, "2026")
+        a, b = tot("inventory", sub, PRIOR_YEAR), tot("inventory", sub, CURRENT_YEAR)
         print(f"  inventory {sub}: {a:,} -> {b:,} ({(b - a) / a * 100:+.1f}%)")
-    a, b = tot("closed_sales", "all_properties", "2025"), tot("closed_sales", "all_properties", "2026")
+    a, b = tot("closed_sales", "all_properties", PRIOR_YEAR), tot("closed_sales", "all_properties", CURRENT_YEAR)
     print(f"  closed all: {a:,} -> {b:,} ({(b - a) / a * 100:+.1f}%)")
-    print(f"  $5M+ inv: {inv[-1]['all_properties']} | $5M+ closed: {hs['closed_sales']['by_price_range'][-1]['all_properties']}")
-    dom = hs["days_on_market"]["by_price_range"]
-    band = next(i for i in dom if "750,001" in i["category"])
-    print(f"  DOM $750K-1M: {band['all_properties']} | DOM $5M+: {dom[-1]['all_properties']}")
-    plp = next(i for i in hs["pct_list_price"]["by_price_range"] if "750,001" in i["category"])
-    print(f"  pct-list $750K-1M: {plp['all_properties']} | median 6001+sqft: {hs['median_price']['by_sq_footage'][-1]['all_properties']}")
+    row = ctx.supply_row
+    print(f"  $5M+ inv: {row('inventory', top)['all_properties']} | $5M+ closed: {row('closed_sales', top)['all_properties']}")
+    print(f"  DOM $750K-1M: {row('days_on_market', band)['all_properties']} | DOM $5M+: {row('days_on_market', top)['all_properties']}")
+    sqft = row("median_price", "6,001 Sq Ft and Above", axis="by_sq_footage")
+    print(f"  pct-list $750K-1M: {row('pct_list_price', band)['all_properties']} | median 6001+sqft: {sqft['all_properties']}")
 
     print("\n[lender-mediated]")
-    li = {r["type"]: r for r in lm["inventory"]["by_property_type"]}
-    for t in ("All Properties", "Single-Family Homes", "Condos - Townhomes"):
-        print(f"  inv {t}: {li[t]['lender_mediated']} share {li[t]['share']}")
+    lm = ctx["lender"]
+    types = ("All Properties", "Single-Family Homes", "Condos - Townhomes")
+    for t in types:
+        r = ctx.lm_by_type[("inventory", t)]
+        print(f"  inv {t}: {r['lender_mediated']} share {r['share']}")
     act = lm["activity"]
     print(f"  new listings: {act['new_listings']['lender_mediated']} | closed: {act['closed_sales']['lender_mediated']} share {act['closed_sales']['share']}")
-    pd_ = {r["type"]: r for r in lm["price_dom"]["median_price"]}
-    for t in ("All Properties", "Single-Family Homes", "Condos - Townhomes"):
-        print(f"  median {t}: LM {pd_[t]['lender_mediated']} | trad {pd_[t]['traditional']}")
-    hi25 = sum(i["lender_mediated"]["2025"] for i in lm["inventory"]["by_price_range"] if "1,250,001" in i["range"])
-    hi26 = sum(i["lender_mediated"]["2026"] for i in lm["inventory"]["by_price_range"] if "1,250,001" in i["range"])
+    for t in types:
+        r = ctx.lm_by_type[("median_price", t)]
+        print(f"  median {t}: LM {r['lender_mediated']} | trad {r['traditional']}")
+    hi = ctx.lm_by_range.get("$1,250,001 and Above", {}).get("lender_mediated", {})
+    hi25, hi26 = hi.get(PRIOR_YEAR, 0), hi.get(CURRENT_YEAR, 0)
     print(f"  $1.25M+ LM inv: {hi25} -> {hi26} ({(hi26 - hi25) / hi25 * 100:+.1f}%)" if hi25 else "")
-    rows, zero = [], []
-    for it in lm["area_inventory_sales"]:
-        ivn = it["inventory"]; tm = ivn.get("total_market") or 0; l = ivn.get("lender_mediated") or 0
-        if l == 0 and tm > 0:
-            zero.append(f"{it['neighborhood']} ({it['zip_code']})")
-        if ivn.get("share") is not None and tm >= 5:
-            rows.append((ivn["share"], it["zip_code"], it["neighborhood"]))
-    rows.sort(reverse=True)
-    print(f"  top LM share: {[(z, n, f'{s}%') for s, z, n in rows[:3]]}")
+    zero = ctx.lm_zero_zips
+    print(f"  top LM share: {[(z, n, f'{s}%') for s, z, n in ctx.lm_share_ranking[:3]]}")
     print(f"  zero-LM zips ({len(zero)}): {', '.join(zero[:5])}")
-    print(f"\n  LM trend-chart point to append in LenderMediatedDashboard.jsx: "
-          f"{{ date: '{datetime.datetime.strptime(period.split()[0], '%B').month:02d}-{period.split()[1]}', "
-          f"value: {li['All Properties']['lender_mediated']['2026']} }}")
+    hist_hash = ctx["lender"]["meta"].get("history_hash")
+    print(f"\n  LM trend point recorded in lender_mediated_history.json: "
+          f"{ctx.lm_by_type[('inventory', 'All Properties')]['lender_mediated'][CURRENT_YEAR]} (series hash {hist_hash})")
     print("=" * 62)
 
 
@@ -234,14 +239,13 @@ def main():
     print(f"Target report period: {period}\n")
 
     if args.figures_only:
-        figures_report(period)
+        figures_report(RunContext.from_disk(period, DATA))
         return
     if not args.skip_download:
         download_all(period, month_dir)
-    run_parsers(period)
-    figures_report(period)
+    figures_report(run_parsers(period, month_dir))
     print("\nNEXT (manual, judgment-based): update month labels via meta.report_period fallbacks,")
-    print("rewrite the 3 AI summaries from the figures above, append the LM trend point, verify, commit.")
+    print("rewrite the 3 AI summaries from the figures above, verify, commit.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+"""
+Local store of OSM POI elements for incremental retail refreshes.
+
+Elements are keyed by "type/id" (e.g. "node/123") and keep their version,
+timestamp, position and tags. A refresh asks Overpass only for elements
+changed since the store's last sync (the `newer:` filter) and upserts them,
+so a routine run transfers a small delta instead of the whole county.
+
+`newer:` cannot report deletions or elements whose tags no longer match a
+category, so the store is rebuilt from a full download once it is older
+than FULL_REFRESH_DAYS.
+"""
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+STORE_PATH = Path(__file__).parent / "osm_poi_store.json.gz"
+FULL_REFRESH_DAYS = 30
+
+KEEP_FIELDS = ("type", "id", "version", "timestamp", "lat", "lon", "center", "tags")
+
+
+def element_key(element):
+    return f"{element['type']}/{element['id']}"
+
+
+def _parse_time(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc) if value else None
+
+
+class PoiStore:
+    def __init__(self, elements=None, last_sync=None, full_sync=None):
+        self.elements = elements or {}
+        self.last_sync = last_sync   # Overpass data timestamp of the last refresh
+        self.full_sync = full_sync   # ... of the last full download
+
+    @classmethod
+    def load(cls, path=STORE_PATH):
+        if not path.exists():
+            return cls()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("elements", {}), data.get("last_sync"), data.get("full_sync"))
+
+    def save(self, path=STORE_PATH):
+        raw = json.dumps({
+            "last_sync": self.last_sync,
+            "full_sync": self.full_sync,
+            "elements": dict(sorted(self.elements.items())),
+        }, separators=(",", ":")).encode("utf-8")
+        tmp = path.with_name(path.name + ".part")
+        with open(tmp, "wb") as f:
+            with gzip.GzipFile(filename="", mode="wb", fileobj=f, mtime=0) as gz:
+                gz.write(raw)
+        tmp.replace(path)
+
+    def needs_full_refresh(self, now=None):
+        if not self.elements or not self.full_sync:
+            return True
+        now = now or datetime.now(timezone.utc)
+        return now - _parse_time(self.full_sync) > timedelta(days=FULL_REFRESH_DAYS)
+
+    def replace(self, elements, synced_at):
+        """Full download: the store becomes exactly `elements`."""
+        self.elements = {}
+        self.upsert(elements)
+        self.last_sync = self.full_sync = synced_at
+
+    def upsert(self, elements, synced_at=None):
+        """Insert or update elements (older versions never overwrite newer ones); returns changed count."""
+        changed = 0
+        for element in elements:
+            key = element_key(element)
+            current = self.elements.get(key)
+            if current and current.get("version", 0) > element.get("version", 0):
+                continue
+            slim = {k: element[k] for k in KEEP_FIELDS if k in element}
+            if slim != current:
+                self.elements[key] = slim
+                changed += 1
+        if synced_at:
+            self.last_sync = synced_at
+        return changed
+
+    def remove(self, keys):
+        """Drop elements by key; returns how many were present."""
+        return sum(self.elements.pop(key, None) is not None for key in keys)
+
+    def values(self):
+        return list(self.elements.values())
@@ -0,0 +1,173 @@
+"""
+Asyncio client for the Overpass API.
+
+Requests run on worker threads (asyncio.to_thread around requests) behind a
+small semaphore, so several queries can be in flight without hammering one
+server. Each attempt goes to the next mirror in MIRRORS. 429/502/503/504
+responses, network errors and "runtime error" remarks (Overpass answers a
+timed-out query with HTTP 200 and partial data) are retried after a
+Retry-After-style wait. A query that never succeeds raises OverpassError so
+callers can record the data as missing rather than as zero results.
+
+The HTTP timeout of a request follows the query's own [timeout:N] (plus a
+small margin), and a query holds a concurrency slot only while a request is
+in flight. Every attempt is logged in client.metrics; client.summary() reports
+latency percentiles and failures per mirror.
+"""
+import asyncio
+import email.utils
+import random
+import re
+import time
+import weakref
+from collections import defaultdict
+
+import requests
+
+MIRRORS = [
+    "https://overpass-api.de/api/interpreter",
+    "https://overpass.kumi.systems/api/interpreter",
+    "https://overpass.private.coffee/api/interpreter",
+]
+
+RETRY_STATUSES = {429, 502, 503, 504}
+MAX_BACKOFF = 120
+
+# The HTTP timeout must outlast the server-side [timeout:N] of the query
+QL_TIMEOUT = re.compile(r"\[timeout:(\d+)\]")
+TIMEOUT_MARGIN = 10
+
+
+class OverpassError(RuntimeError):
+    """A query failed on every attempt (or was rejected as invalid)."""
+
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+def backoff_seconds(attempt, base=5.0):
+    """Exponential backoff with jitter: ~5s, 10s, 20s, ... capped at MAX_BACKOFF."""
+    return min(base * 2 ** attempt, MAX_BACKOFF) * random.uniform(0.8, 1.2)
+
+
+class OverpassClient:
+    def __init__(self, mirrors=MIRRORS, concurrency=2, max_attempts=5, timeout=180):
+        self.mirrors = list(mirrors)
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.metrics = []  # one dict per attempt
+        self._next_mirror = 0
+        self._semaphores = weakref.WeakKeyDictionary()  # event loop -> Semaphore
+
+    def _mirror(self):
+        mirror = self.mirrors[self._next_mirror % len(self.mirrors)]
+        self._next_mirror += 1
+        return mirror
+
+    def _record(self, label, mirror, attempt, started, status, outcome, size=0):
+        self.metrics.append({
+            "label": label,
+            "mirror": mirror,
+            "attempt": attempt,
+            "status": status,
+            "outcome": outcome,
+            "seconds": round(time.monotonic() - started, 3),
+            "bytes": size,
+        })
+
+    def _semaphore(self):
+        """The concurrency limit for the running event loop (a Semaphore is bound to one loop)."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    def request_timeout(self, ql):
+        """HTTP timeout for a query: its QL [timeout:N] plus a margin, else the client default."""
+        m = QL_TIMEOUT.search(ql)
+        return int(m.group(1)) + TIMEOUT_MARGIN if m else self.timeout
+
+    async def _attempt(self, ql, label, attempt, timeout):
+        """One request on the next mirror; returns (data or None, error, wait before retrying)."""
+        mirror = self._mirror()
+        started = time.monotonic()
+        wait = backoff_seconds(attempt)
+        try:
+            response = await asyncio.to_thread(
+                requests.post, mirror, data={"data": ql}, timeout=timeout)
+        except requests.RequestException as e:
+            self._record(label, mirror, attempt, started, None, "network")
+            return None, f"{e} from {mirror}", wait
+
+        status = response.status_code
+        if status == 200:
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            remark = (data or {}).get("remark", "")
+            if data is not None and "error" not in remark.lower():
+                self._record(label, mirror, attempt, started, status, "ok", len(response.content))
+                return data, None, 0
+            self._record(label, mirror, attempt, started, status, "incomplete")
+            return None, f"{remark or 'response was not JSON'} from {mirror}", wait
+        if status in RETRY_STATUSES:
+            self._record(label, mirror, attempt, started, status, "retry")
+            after = retry_after_seconds(response.headers.get("Retry-After"))
+            if after is not None:
+                wait = min(after, MAX_BACKOFF)
+            return None, f"HTTP {status} from {mirror}", wait
+        self._record(label, mirror, attempt, started, status, "rejected")
+        raise OverpassError(f"{label or 'query'}: HTTP {status} from {mirror}")
+
+    async def query(self, ql, label="", timeout=None):
+        """Run an Overpass QL query and return the decoded JSON response.
+
+        `timeout` is the HTTP timeout in seconds; by default it is derived
+        from the query's own [timeout:N]. A query only holds a concurrency
+        slot while a request is in flight, not while it backs off.
+        """
+        timeout = timeout or self.request_timeout(ql)
+        last_error = None
+        for attempt in range(self.max_attempts):
+            async with self._semaphore():
+                data, last_error, wait = await self._attempt(ql, label, attempt, timeout)
+            if data is not None:
+                return data
+            if attempt + 1 < self.max_attempts:
+                print(f"  {label or 'query'}: {last_error}; retrying in {wait:.0f}s")
+                await asyncio.sleep(wait)
+
+        raise OverpassError(f"{label or 'query'}: gave up after {self.max_attempts} attempts ({last_error})")
+
+    def summary(self):
+        """Human-readable latency/failure summary per mirror."""
+        if not self.metrics:
+            return "Overpass: no requests"
+        lines = [f"Overpass: {len(self.metrics)} attempts"]
+        by_mirror = defaultdict(list)
+        for m in self.metrics:
+            by_mirror[m["mirror"]].append(m)
+        for mirror, ms in by_mirror.items():
+            ok = sorted(m["seconds"] for m in ms if m["outcome"] == "ok")
+            p50 = ok[len(ok) // 2] if ok else None
+            p95 = ok[min(len(ok) - 1, int(len(ok) * 0.95))] if ok else None
+            failed = len(ms) - len(ok)
+            host = mirror.split("/")[2]
+            timing = f"p50 {p50:.1f}s, p95 {p95:.1f}s" if ok else "no successes"
+            lines.append(f"  {host}: {len(ok)} ok, {failed} failed/retried, {timing}")
+        return "\n".join(lines)
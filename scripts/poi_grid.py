@@ -0,0 +1,128 @@
+"""
+Precomputed POI density grid for the retail signals.
+
+POIs are binned into fixed square cells of CELL_KM on a side, laid out from
+the county's south-west corner (degrees per cell are scaled by the cosine of
+the origin latitude so cells are roughly square on the ground). Only
+occupied cells are stored, as a sparse table:
+
+  cells       flat cell ids (row * cols + col) of occupied cells, sorted
+  total       POI x category matches per cell (same counting as the per-zip
+              totals, so a POI tagged into two categories counts twice)
+  boutique    how many of those are not national chains
+  new_90d...  how many were edited within each recency window
+  entries     COO triplets (cell position, category position, count),
+              flattened
+
+Map overlays read cells directly; near() answers "what is around this point"
+by summing the cells whose centers fall within a radius, with no raw POI
+lists or Overpass requests involved.
+"""
+import math
+
+import numpy as np
+
+CELL_KM = 1.0
+KM_PER_DEGREE = 111.32
+
+
+class PoiGrid:
+    def __init__(self, origin, cell_deg, shape, categories, cells, total, boutique, recent, entries):
+        self.origin = tuple(origin)          # (lon, lat) of the south-west corner
+        self.cell_deg = tuple(cell_deg)      # (dlon, dlat) per cell
+        self.shape = tuple(shape)            # (rows, cols)
+        self.categories = list(categories)
+        self.cells = np.asarray(cells, dtype=np.int64)
+        self.total = np.asarray(total, dtype=np.int64)
+        self.boutique = np.asarray(boutique, dtype=np.int64)
+        self.recent = {days: np.asarray(v, dtype=np.int64) for days, v in recent.items()}
+        self.entries = np.asarray(entries, dtype=np.int64).reshape(-1, 3)
+
+    @classmethod
+    def build(cls, extent, lons, lats, element_rows, category_rows, categories, boutique, recent, cell_km=CELL_KM):
+        """Grid over extent (minx, miny, maxx, maxy) from per-element arrays.
+
+        element_rows/category_rows are parallel arrays of (element, category)
+        matches; boutique and recent[days] are per-element boolean arrays.
+        Elements outside the extent are skipped.
+        """
+        minx, miny, maxx, maxy = extent
+        dlat = cell_km / KM_PER_DEGREE
+        dlon = cell_km / (KM_PER_DEGREE * math.cos(math.radians(miny)))
+        rows = int(math.ceil((maxy - miny) / dlat)) or 1
+        cols = int(math.ceil((maxx - minx) / dlon)) or 1
+
+        lons, lats = np.asarray(lons, dtype=float), np.asarray(lats, dtype=float)
+        col = np.floor((lons - minx) / dlon).astype(np.int64)
+        row = np.floor((lats - miny) / dlat).astype(np.int64)
+        inside = (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+        flat = np.where(inside, row * cols + col, -1)
+
+        element_rows = np.asarray(element_rows, dtype=np.int64)
+        category_rows = np.asarray(category_rows, dtype=np.int64)
+        keep = flat[element_rows] >= 0
+        element_rows, category_rows = element_rows[keep], category_rows[keep]
+        pair_cell = flat[element_rows]
+
+        cells, cell_pos = np.unique(pair_cell, return_inverse=True)
+        n = len(cells)
+        total = np.bincount(cell_pos, minlength=n)
+        boutique_counts = np.bincount(cell_pos, weights=np.asarray(boutique)[element_rows], minlength=n)
+        recent_counts = {
+            days: np.bincount(cell_pos, weights=np.asarray(mask)[element_rows], minlength=n)
+            for days, mask in recent.items()
+        }
+
+        n_cat = len(categories)
+        keys, counts = np.unique(cell_pos * n_cat + category_rows, return_counts=True)
+        entries = np.column_stack([keys // n_cat, keys % n_cat, counts])
+
+        return cls((minx, miny), (dlon, dlat), (rows, cols), categories, cells, total,
+                   boutique_counts.astype(np.int64), {d: v.astype(np.int64) for d, v in recent_counts.items()},
+                   entries)
+
+    def cell_centers(self):
+        """(lons, lats) of the occupied cells' centers."""
+        row, col = np.divmod(self.cells, self.shape[1])
+        return (self.origin[0] + (col + 0.5) * self.cell_deg[0],
+                self.origin[1] + (row + 0.5) * self.cell_deg[1])
+
+    def near(self, lon, lat, radius_km=2.0):
+        """Category counts, boutique share and recency summed over cells within radius_km of a point."""
+        lons, lats = self.cell_centers()
+        dx = (lons - lon) * KM_PER_DEGREE * math.cos(math.radians(lat))
+        dy = (lats - lat) * KM_PER_DEGREE
+        selected = np.flatnonzero(dx * dx + dy * dy <= radius_km * radius_km)
+
+        in_range = np.isin(self.entries[:, 0], selected)
+        counts = np.bincount(self.entries[in_range, 1], weights=self.entries[in_range, 2],
+                             minlength=len(self.categories))
+        total = int(self.total[selected].sum())
+        boutique = int(self.boutique[selected].sum())
+        return {
+            "categories": {key: int(c) for key, c in zip(self.categories, counts) if c},
+            "total": total,
+            "boutique_share": round(boutique / total, 3) if total else None,
+            "new": {f"{days}d": int(v[selected].sum()) for days, v in self.recent.items()},
+            "cells": len(selected),
+        }
+
+    def to_json(self):
+        return {
+            "cell_km": round(self.cell_deg[1] * KM_PER_DEGREE, 6),
+            "origin": list(self.origin),
+            "cell_deg": list(self.cell_deg),
+            "shape": list(self.shape),
+            "categories": self.categories,
+            "cells": self.cells.tolist(),
+            "total": self.total.tolist(),
+            "boutique": self.boutique.tolist(),
+            **{f"new_{days}d": v.tolist() for days, v in self.recent.items()},
+            "entries": self.entries.ravel().tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        recent = {int(k[4:-1]): v for k, v in data.items() if k.startswith("new_") and k.endswith("d")}
+        return cls(data["origin"], data["cell_deg"], data["shape"], data["categories"], data["cells"],
+                   data["total"], data["boutique"], recent, data["entries"])
@@ -1,16 +1,14 @@
 
-import urllib.request
-import urllib.error
+import http_cache
 
 # California Tracts
 url = 'https://www2.census.gov/geo/docs/maps-data/data/gazetteer/2020_Gazetteer/2020_gaz_tracts_06.txt'
 
 print(f"Checking {url}")
 try:
-    with urllib.request.urlopen(url) as response:
-        print(f"[FOUND] {url} - {response.getcode()}")
+    with http_cache.open_text(url) as lines:
+        print(f"[FOUND] {url}")
         # Check header
-        content = response.read(200).decode('utf-8')
-        print(f"Header: {content.splitlines()[0]}")
+        print(f"Header: {next(lines).rstrip()}")
 except Exception as e:
     print(f"[ERROR] {e}")
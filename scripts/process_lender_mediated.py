@@ -3,13 +3,23 @@ Lender-Mediated Properties Report PDF Parser
 Extracts all data from the SDAR Lender-Mediated Properties Report.
 """
 
-import pdfplumber
+import bisect
+import hashlib
 import json
 import re
 import os
 from pathlib import Path
 from datetime import datetime
 
+from sdar_common import (
+    CURRENT_YEAR, PRIOR_YEAR, build_period_series, extract_page_texts, month_arg_parser, parse_all_months,
+    parse_month_folder, resolve_report_month,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "public" / "data"
+HISTORY_PATH = DATA_DIR / "lender_mediated_history.json"
+MARKET_GROUPS = ('lender_mediated', 'traditional', 'total_market', 'share')
+
 def parse_number(value_str):
     """Parse a number from string."""
     if not value_str or value_str == '--' or value_str == '-':
@@ -134,23 +144,23 @@ def extract_inventory_data(text):
             inventory['by_property_type'].append({
                 'type': ptype,
                 'lender_mediated': {
-                    '2025': int(match.group(1)),
-                    '2026': int(match.group(2)),
+                    PRIOR_YEAR: int(match.group(1)),
+                    CURRENT_YEAR: int(match.group(2)),
                     'change': parse_pct(match.group(3), match.group(4))
                 },
                 'traditional': {
-                    '2025': parse_number(match.group(5)),
-                    '2026': parse_number(match.group(6)),
+                    PRIOR_YEAR: parse_number(match.group(5)),
+                    CURRENT_YEAR: parse_number(match.group(6)),
                     'change': parse_pct(match.group(7), match.group(8))
                 },
                 'total_market': {
-                    '2025': parse_number(match.group(9)),
-                    '2026': parse_number(match.group(10)),
+                    PRIOR_YEAR: parse_number(match.group(9)),
+                    CURRENT_YEAR: parse_number(match.group(10)),
                     'change': parse_pct(match.group(11), match.group(12))
                 },
                 'share': {
-                    '2025': float(match.group(13)),
-                    '2026': float(match.group(14))
+                    PRIOR_YEAR: float(match.group(13)),
+                    CURRENT_YEAR: float(match.group(14))
                 }
             })
     
@@ -173,23 +183,23 @@ def extract_inventory_data(text):
             inventory['by_price_range'].append({
                 'range': prange,
                 'lender_mediated': {
-                    '2025': int(match.group(1)),
-                    '2026': int(match.group(2)),
+                    PRIOR_YEAR: int(match.group(1)),
+                    CURRENT_YEAR: int(match.group(2)),
                     'change': parse_pct(match.group(3), match.group(4))
                 },
                 'traditional': {
-                    '2025': parse_number(match.group(5)),
-                    '2026': parse_number(match.group(6)),
+                    PRIOR_YEAR: parse_number(match.group(5)),
+                    CURRENT_YEAR: parse_number(match.group(6)),
                     'change': parse_pct(match.group(7), match.group(8))
                 },
                 'total_market': {
-                    '2025': parse_number(match.group(9)),
-                    '2026': parse_number(match.group(10)),
+                    PRIOR_YEAR: parse_number(match.group(9)),
+                    CURRENT_YEAR: parse_number(match.group(10)),
                     'change': parse_pct(match.group(11), match.group(12))
                 },
                 'share': {
-                    '2025': float(match.group(13)),
-                    '2026': float(match.group(14))
+                    PRIOR_YEAR: float(match.group(13)),
+                    CURRENT_YEAR: float(match.group(14))
                 }
             })
     
@@ -204,23 +214,23 @@ def extract_listings_sales_data(text):
     if match:
         data['new_listings'] = {
             'lender_mediated': {
-                '2025': int(match.group(1)),
-                '2026': int(match.group(2)),
+                PRIOR_YEAR: int(match.group(1)),
+                CURRENT_YEAR: int(match.group(2)),
                 'change': parse_pct(match.group(3), match.group(4))
             },
             'traditional': {
-                '2025': parse_number(match.group(5)),
-                '2026': parse_number(match.group(6)),
+                PRIOR_YEAR: parse_number(match.group(5)),
+                CURRENT_YEAR: parse_number(match.group(6)),
                 'change': parse_pct(match.group(7), match.group(8))
             },
             'total_market': {
-                '2025': parse_number(match.group(9)),
-                '2026': parse_number(match.group(10)),
+                PRIOR_YEAR: parse_number(match.group(9)),
+                CURRENT_YEAR: parse_number(match.group(10)),
                 'change': parse_pct(match.group(11), match.group(12))
             },
             'share': {
-                '2025': float(match.group(13)),
-                '2026': float(match.group(14))
+                PRIOR_YEAR: float(match.group(13)),
+                CURRENT_YEAR: float(match.group(14))
             }
         }
     
@@ -229,23 +239,23 @@ def extract_listings_sales_data(text):
     if match:
         data['closed_sales'] = {
             'lender_mediated': {
-                '2025': int(match.group(1)),
-                '2026': int(match.group(2)),
+                PRIOR_YEAR: int(match.group(1)),
+                CURRENT_YEAR: int(match.group(2)),
                 'change': parse_pct(match.group(3), match.group(4))
             },
             'traditional': {
-                '2025': parse_number(match.group(5)),
-                '2026': parse_number(match.group(6)),
+                PRIOR_YEAR: parse_number(match.group(5)),
+                CURRENT_YEAR: parse_number(match.group(6)),
                 'change': parse_pct(match.group(7), match.group(8))
             },
             'total_market': {
-                '2025': parse_number(match.group(9)),
-                '2026': parse_number(match.group(10)),
+                PRIOR_YEAR: parse_number(match.group(9)),
+                CURRENT_YEAR: parse_number(match.group(10)),
                 'change': parse_pct(match.group(11), match.group(12))
             },
             'share': {
-                '2025': float(match.group(13)),
-                '2026': float(match.group(14))
+                PRIOR_YEAR: float(match.group(13)),
+                CURRENT_YEAR: float(match.group(14))
             }
         }
     
@@ -269,18 +279,18 @@ def extract_price_dom_data(text):
             data['median_price'].append({
                 'type': ptype,
                 'lender_mediated': {
-                    '2025': parse_number(match.group(1)),
-                    '2026': parse_number(match.group(2)),
+                    PRIOR_YEAR: parse_number(match.group(1)),
+                    CURRENT_YEAR: parse_number(match.group(2)),
                     'change': parse_pct(match.group(3), match.group(4))
                 },
                 'traditional': {
-                    '2025': parse_number(match.group(5)),
-                    '2026': parse_number(match.group(6)),
+                    PRIOR_YEAR: parse_number(match.group(5)),
+                    CURRENT_YEAR: parse_number(match.group(6)),
                     'change': parse_pct(match.group(7), match.group(8))
                 },
                 'total_market': {
-                    '2025': parse_number(match.group(9)),
-                    '2026': parse_number(match.group(10)),
+                    PRIOR_YEAR: parse_number(match.group(9)),
+                    CURRENT_YEAR: parse_number(match.group(10)),
                     'change': parse_pct(match.group(11), match.group(12))
                 }
             })
@@ -296,18 +306,18 @@ def extract_price_dom_data(text):
             data['days_on_market'].append({
                 'type': ptype,
                 'lender_mediated': {
-                    '2025': int(match.group(1)),
-                    '2026': int(match.group(2)),
+                    PRIOR_YEAR: int(match.group(1)),
+                    CURRENT_YEAR: int(match.group(2)),
                     'change': parse_pct(match.group(3), match.group(4))
                 },
                 'traditional': {
-                    '2025': int(match.group(5)),
-                    '2026': int(match.group(6)),
+                    PRIOR_YEAR: int(match.group(5)),
+                    CURRENT_YEAR: int(match.group(6)),
                     'change': parse_pct(match.group(7), match.group(8))
                 },
                 'total_market': {
-                    '2025': int(match.group(9)),
-                    '2026': int(match.group(10)),
+                    PRIOR_YEAR: int(match.group(9)),
+                    CURRENT_YEAR: int(match.group(10)),
                     'change': parse_pct(match.group(11), match.group(12))
                 }
             })
@@ -377,13 +387,13 @@ def extract_area_median_price(text):
             'zip_code': zip_code,
             'neighborhood': neighborhood,
             'lender_mediated': {
-                '2025': lm_2024,
-                '2026': lm_2025,
+                PRIOR_YEAR: lm_2024,
+                CURRENT_YEAR: lm_2025,
                 'change': lm_change
             },
             'traditional': {
-                '2025': trad_2024,
-                '2026': trad_2025,
+                PRIOR_YEAR: trad_2024,
+                CURRENT_YEAR: trad_2025,
                 'change': trad_change
             }
         })
@@ -400,56 +410,101 @@ def parse_lender_mediated_pdf(pdf_path, period):
         }
     }
     
-    with pdfplumber.open(pdf_path) as pdf:
-        # Page 1 - Executive Summary
-        if len(pdf.pages) >= 1:
-            text = pdf.pages[0].extract_text() or ''
-            result['summary'] = extract_summary_data(text)
-        
-        # Page 2 - Inventory by property type and price range
-        if len(pdf.pages) >= 2:
-            text = pdf.pages[1].extract_text() or ''
-            result['inventory'] = extract_inventory_data(text)
-        
-        # Page 3 - New Listings and Closed Sales
-        if len(pdf.pages) >= 3:
-            text = pdf.pages[2].extract_text() or ''
-            result['activity'] = extract_listings_sales_data(text)
-        
-        # Page 4 - Median Sales Price and Days on Market
-        if len(pdf.pages) >= 4:
-            text = pdf.pages[3].extract_text() or ''
-            result['price_dom'] = extract_price_dom_data(text)
-        
-        # Pages 5-7 - Inventory and Closed Sales by Area
-        area_inv_sales = []
-        for i in range(4, 7):
-            if len(pdf.pages) > i:
-                text = pdf.pages[i].extract_text() or ''
-                area_inv_sales.extend(extract_area_inventory_closed_sales(text))
-        result['area_inventory_sales'] = area_inv_sales
-        
-        # Pages 8-10 - Median Sales Price by Area
-        area_prices = []
-        for i in range(7, 10):
-            if len(pdf.pages) > i:
-                text = pdf.pages[i].extract_text() or ''
-                area_prices.extend(extract_area_median_price(text))
-        result['area_median_prices'] = area_prices
+    pages = extract_page_texts(pdf_path, range(10))
+    
+    # Page 1 - Executive Summary
+    if len(pages) >= 1:
+        result['summary'] = extract_summary_data(pages[0])
+    
+    # Page 2 - Inventory by property type and price range
+    if len(pages) >= 2:
+        result['inventory'] = extract_inventory_data(pages[1])
+    
+    # Page 3 - New Listings and Closed Sales
+    if len(pages) >= 3:
+        result['activity'] = extract_listings_sales_data(pages[2])
+    
+    # Page 4 - Median Sales Price and Days on Market
+    if len(pages) >= 4:
+        result['price_dom'] = extract_price_dom_data(pages[3])
+    
+    # Pages 5-7 - Inventory and Closed Sales by Area
+    area_inv_sales = []
+    for text in pages[4:7]:
+        area_inv_sales.extend(extract_area_inventory_closed_sales(text))
+    result['area_inventory_sales'] = area_inv_sales
+    
+    # Pages 8-10 - Median Sales Price by Area
+    area_prices = []
+    for text in pages[7:10]:
+        area_prices.extend(extract_area_median_price(text))
+    result['area_median_prices'] = area_prices
     
     return result
 
-def main():
-    """Main function."""
-    from sdar_common import resolve_report_month
-    reports_dir, period, month_name = resolve_report_month("Parse SDAR Lender-Mediated Properties PDF")
+def _series_key(date):
+    """'06-2026' -> (2026, 6) for chronological ordering."""
+    mm, yyyy = date.split('-')
+    return int(yyyy), int(mm)
+
+def series_hash(series):
+    return hashlib.sha256(json.dumps(series, separators=(',', ':')).encode()).hexdigest()[:16]
+
+def update_history(period, value, history_path=HISTORY_PATH):
+    """Record one month's LM inventory point in the trend series.
+
+    Idempotent per report_period: re-running a month replaces its point in
+    place, a new latest month is appended, and an older (backfilled) month is
+    inserted in order. The file is only rewritten when the series changes.
+    Returns the series content hash.
+    """
+    year, month = parse_month_folder(period)
+    date = f"{month:02d}-{year}"
+
+    history = {'meta': {}, 'series': []}
+    if history_path.exists():
+        with open(history_path, encoding='utf-8') as f:
+            history = json.load(f)
+    series = history['series']
+    point = {'date': date, 'value': value}
+
+    if series and series[-1]['date'] == date:
+        if series[-1] == point:
+            return history['meta']['hash']
+        series[-1] = point
+    elif not series or _series_key(series[-1]['date']) < (year, month):
+        series.append(point)
+    else:
+        keys = [_series_key(p['date']) for p in series]
+        i = bisect.bisect_left(keys, (year, month))
+        if i < len(series) and keys[i] == (year, month):
+            if series[i] == point:
+                return history['meta']['hash']
+            series[i] = point
+        else:
+            series.insert(i, point)
+
+    last = series[-1]['date']
+    history['meta'] = {
+        'source': 'SDAR Lender-Mediated Properties Report',
+        'metric': 'Inventory of lender-mediated properties, all property types',
+        'last_period': period if last == date else history['meta'].get('last_period'),
+        'hash': series_hash(series),
+    }
+    with open(history_path, 'w') as f:
+        json.dump(history, f, indent=2)
+    print(f"Trend series: {date} = {value} ({len(series)} points, hash {history['meta']['hash']})")
+    return history['meta']['hash']
+
+def run(reports_dir, period, month_name):
+    """Parse one month's PDF and write lender_mediated_data.json. Returns the data (None if no PDF)."""
     pdf_path = reports_dir / f"{month_name} Lender Mediated.pdf"
     print(f"Report period: {period}")
-    output_path = Path(__file__).parent.parent / "public" / "data" / "lender_mediated_data.json"
+    output_path = DATA_DIR / "lender_mediated_data.json"
     
     if not pdf_path.exists():
         print(f"PDF not found: {pdf_path}")
-        return
+        return None
     
     print(f"Parsing: {pdf_path}")
     data = parse_lender_mediated_pdf(pdf_path, period)
@@ -463,18 +518,104 @@ def main():
     
     print(f"\n=== Inventory by Property Type ===")
     for item in data.get('inventory', {}).get('by_property_type', []):
-        print(f"  {item['type']}: LM={item['lender_mediated']['2026']}, Trad={item['traditional']['2026']}, Total={item['total_market']['2026']}")
+        print(f"  {item['type']}: LM={item['lender_mediated'][CURRENT_YEAR]}, Trad={item['traditional'][CURRENT_YEAR]}, Total={item['total_market'][CURRENT_YEAR]}")
     
     print(f"\n=== Area Data ===")
     print(f"  Inventory/Sales areas: {len(data.get('area_inventory_sales', []))}")
     print(f"  Median Price areas: {len(data.get('area_median_prices', []))}")
     
-    # Save to JSON
+    # Append this month's point to the dashboard's trend series
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    all_props = next((r for r in data.get('inventory', {}).get('by_property_type', [])
+                      if r['type'] == 'All Properties'), None)
+    if all_props:
+        data['meta']['history_hash'] = update_history(period, all_props['lender_mediated'][CURRENT_YEAR])
+    
+    # Save to JSON
     with open(output_path, 'w') as f:
         json.dump(data, f, indent=2)
     
     print(f"\nSaved to: {output_path}")
+    return data
+
+def _parse_month(job):
+    pdf_path, period = job
+    return parse_lender_mediated_pdf(pdf_path, period)
+
+def current_values(data):
+    """{(section, axis, key, group): value} for one parsed report (CURRENT_YEAR = this period)."""
+    flat = {}
+    
+    def add(section, axis, key, row):
+        for group in MARKET_GROUPS:
+            if group in row:
+                flat[(section, axis, key, group)] = row[group].get(CURRENT_YEAR)
+    
+    inventory = data.get('inventory', {})
+    for row in inventory.get('by_property_type', []):
+        add('inventory', 'by_property_type', row['type'], row)
+    for row in inventory.get('by_price_range', []):
+        add('inventory', 'by_price_range', row['range'], row)
+    for metric, row in data.get('activity', {}).items():
+        add('activity', metric, 'All Properties', row)
+    for axis, rows in data.get('price_dom', {}).items():
+        for row in rows:
+            add('price_dom', axis, row['type'], row)
+    return flat
+
+def store_history_hash(history_hash, data_path=DATA_DIR / "lender_mediated_data.json"):
+    """Point lender_mediated_data.json at the current trend series, so the
+    dashboard's cached copy of the series is refetched."""
+    if not data_path.exists():
+        return
+    with open(data_path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('meta', {}).get('history_hash') == history_hash:
+        return
+    data.setdefault('meta', {})['history_hash'] = history_hash
+    with open(data_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    print(f"Updated history_hash in {data_path} to {history_hash}")
+
+def backfill():
+    """Parse every month folder's PDF, write lender_mediated_periods.json with MoM deltas
+    and fill the trend series for each period."""
+    reports = parse_all_months(_parse_month, "Lender Mediated", "lender", "Lender-Mediated PDFs")
+    if not reports:
+        print("No Lender-Mediated PDFs found")
+        return None
+    history_hash = None
+    for period, data in reports:
+        all_props = next((r for r in data.get('inventory', {}).get('by_property_type', [])
+                          if r['type'] == 'All Properties'), None)
+        if all_props:
+            history_hash = update_history(period, all_props['lender_mediated'][CURRENT_YEAR])
+    if history_hash:
+        store_history_hash(history_hash)
+    output = {
+        'meta': {
+            'generated': datetime.now().isoformat(),
+            'source': 'SDAR Lender-Mediated Properties Report',
+            'report_periods': [p for p, _ in reports],
+        },
+        **build_period_series([(p, current_values(d)) for p, d in reports]),
+    }
+    output_path = DATA_DIR / "lender_mediated_periods.json"
+    with open(output_path, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"\nSaved {len(reports)} periods to: {output_path}")
+    return output
+
+def main():
+    """Main function."""
+    ap = month_arg_parser("Parse SDAR Lender-Mediated Properties PDF")
+    ap.add_argument("--backfill", action="store_true",
+                    help="Parse every month folder and write lender_mediated_periods.json")
+    args = ap.parse_args()
+    if args.backfill:
+        backfill()
+        return
+    run(*resolve_report_month(args=args))
 
 if __name__ == "__main__":
     main()
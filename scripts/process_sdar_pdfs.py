@@ -4,14 +4,13 @@ SDAR PDF Report Parser - Simplified version
 Extracts real estate data from Local Market Update PDFs.
 """
 
-import pdfplumber
 import json
 import re
 import os
 from pathlib import Path
 from datetime import datetime
 
-from sdar_common import MONTH_NAMES, resolve_report_month
+from sdar_common import MONTH_NAMES, extract_page_texts, map_pdfs, resolve_report_month
 
 # Set by main() from the resolved report month; used when tagging each zip record.
 REPORT_PERIOD = None
@@ -166,35 +165,35 @@ def extract_all_metrics(text):
 def parse_zip_pdf(pdf_path):
     """Parse a zip code PDF."""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if not pdf.pages:
-                return None
-            
-            text = pdf.pages[0].extract_text()
-            if not text:
-                return None
-            
-            # Extract zip code
-            zip_match = re.search(r'\b(9\d{4})\b', text)
-            zip_code = zip_match.group(1) if zip_match else None
-            
-            # Extract neighborhood from filename
-            filename = os.path.basename(pdf_path)
-            name_match = re.match(r'\d+[–-](.+)\.pdf', filename)
-            neighborhood = name_match.group(1).replace(',', ', ') if name_match else filename
-            
-            # Extract metrics
-            metrics = extract_all_metrics(text)
-            
-            return {
-                'file': filename,
-                'zip_code': zip_code,
-                'neighborhood': neighborhood,
-                'report_month': REPORT_PERIOD,
-                'detached': metrics['detached'],
-                'attached': metrics['attached']
-            }
-            
+        pages = extract_page_texts(pdf_path, [0])
+        if not pages:
+            return None
+        
+        text = pages[0]
+        if not text:
+            return None
+        
+        # Extract zip code
+        zip_match = re.search(r'\b(9\d{4})\b', text)
+        zip_code = zip_match.group(1) if zip_match else None
+        
+        # Extract neighborhood from filename
+        filename = os.path.basename(pdf_path)
+        name_match = re.match(r'\d+[–-](.+)\.pdf', filename)
+        neighborhood = name_match.group(1).replace(',', ', ') if name_match else filename
+        
+        # Extract metrics
+        metrics = extract_all_metrics(text)
+        
+        return {
+            'file': filename,
+            'zip_code': zip_code,
+            'neighborhood': neighborhood,
+            'report_month': REPORT_PERIOD,
+            'detached': metrics['detached'],
+            'attached': metrics['attached']
+        }
+        
     except Exception as e:
         print(f"Error parsing {pdf_path}: {e}")
         return None
@@ -202,28 +201,26 @@ def parse_zip_pdf(pdf_path):
 def parse_monthly_indicators(pdf_path):
     """Parse the Monthly Indicators PDF for county-wide data."""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if len(pdf.pages) < 3:
-                print(f"Monthly Indicators PDF has fewer than 3 pages")
-                return None
-            
-            result = {
-                'detached': {},
-                'attached': {}
-            }
-            
-            # Page 2 = Detached Market Overview
-            detached_text = pdf.pages[1].extract_text()
-            if detached_text:
-                result['detached'] = parse_market_overview_page(detached_text)
-            
-            # Page 3 = Attached Market Overview
-            attached_text = pdf.pages[2].extract_text()
-            if attached_text:
-                result['attached'] = parse_market_overview_page(attached_text)
-            
-            return result
-            
+        pages = extract_page_texts(pdf_path, [1, 2])
+        if len(pages) < 3:
+            print(f"Monthly Indicators PDF has fewer than 3 pages")
+            return None
+        
+        result = {
+            'detached': {},
+            'attached': {}
+        }
+        
+        # Page 2 = Detached Market Overview
+        if pages[1]:
+            result['detached'] = parse_market_overview_page(pages[1])
+        
+        # Page 3 = Attached Market Overview
+        if pages[2]:
+            result['attached'] = parse_market_overview_page(pages[2])
+        
+        return result
+        
     except Exception as e:
         print(f"Error parsing Monthly Indicators: {e}")
         return None
@@ -336,17 +333,16 @@ def parse_market_overview_page(text):
     
     return metrics
 
-def main():
-    """Main function."""
+def run(reports_dir, period, month_name):
+    """Parse one month's PDFs and write sdar_neighborhood_data.json. Returns the output (None if no folder)."""
     global REPORT_PERIOD
-    reports_dir, period, month_name = resolve_report_month("Parse SDAR per-zip + Monthly Indicators PDFs")
     REPORT_PERIOD = period
     output_path = Path(__file__).parent.parent / "public" / "data" / "sdar_neighborhood_data.json"
 
     print(f"Report period: {period}  ({reports_dir})")
     if not reports_dir.exists():
         print(f"Reports directory not found: {reports_dir}")
-        return
+        return None
 
     # Parse Monthly Indicators for county-wide data
     monthly_indicators_path = reports_dir / f"{month_name} Monthly Indicators.pdf"
@@ -367,11 +363,12 @@ def main():
     
     neighborhoods = []
     
-    first_pdf = True
-    for pdf_path in sorted(zip_pdfs):
+    zip_pdfs = sorted(zip_pdfs)
+    for pdf_path, data in zip(zip_pdfs, map_pdfs(parse_zip_pdf, zip_pdfs, label="zip PDFs")):
         print(f"Processing: {pdf_path.name}")
-        data = parse_zip_pdf(pdf_path)
         if data:
+            # Workers may not share this module's REPORT_PERIOD (spawn start method).
+            data['report_month'] = period
             neighborhoods.append(data)
             det_price = data['detached'].get('median_price_2026')
             att_price = data['attached'].get('median_price_2026')
@@ -411,6 +408,11 @@ def main():
         print(f"  Avg Detached: ${output['summary']['avg_detached_median']:,}")
     if att_prices:
         print(f"  Avg Attached: ${output['summary']['avg_attached_median']:,}")
+    return output
+
+def main():
+    """Main function."""
+    run(*resolve_report_month("Parse SDAR per-zip + Monthly Indicators PDFs"))
 
 if __name__ == "__main__":
     main()
@@ -4,12 +4,19 @@ Housing Supply Overview PDF Parser
 Extracts all data from the SDAR Housing Supply Overview Report.
 """
 
-import pdfplumber
 import json
 import re
 from pathlib import Path
 from datetime import datetime
 
+from sdar_common import (
+    CURRENT_YEAR, PRIOR_YEAR, build_period_series, extract_page_texts, month_arg_parser, parse_all_months,
+    resolve_report_month,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "public" / "data"
+PROPERTY_GROUPS = ('all_properties', 'single_family', 'condos')
+
 def parse_number(value_str):
     """Parse a number from string."""
     if not value_str or value_str == '--' or value_str == '-':
@@ -67,18 +74,18 @@ def extract_table_data(text, categories, has_all_row=True, is_currency=False):
             results.append({
                 'category': category,
                 'all_properties': {
-                    '2025': parse_number(match.group(1)),
-                    '2026': parse_number(match.group(2)),
+                    PRIOR_YEAR: parse_number(match.group(1)),
+                    CURRENT_YEAR: parse_number(match.group(2)),
                     'change': parse_pct(match.group(3), match.group(4))
                 },
                 'single_family': {
-                    '2025': parse_number(match.group(5)),
-                    '2026': parse_number(match.group(6)),
+                    PRIOR_YEAR: parse_number(match.group(5)),
+                    CURRENT_YEAR: parse_number(match.group(6)),
                     'change': parse_pct(match.group(7), match.group(8))
                 },
                 'condos': {
-                    '2025': parse_number(match.group(9)),
-                    '2026': parse_number(match.group(10)),
+                    PRIOR_YEAR: parse_number(match.group(9)),
+                    CURRENT_YEAR: parse_number(match.group(10)),
                     'change': parse_pct(match.group(11), match.group(12))
                 }
             })
@@ -177,18 +184,18 @@ def extract_pct_list_price(text):
             results.append({
                 'category': category,
                 'all_properties': {
-                    '2025': float(match.group(1)),
-                    '2026': float(match.group(2)),
+                    PRIOR_YEAR: float(match.group(1)),
+                    CURRENT_YEAR: float(match.group(2)),
                     'change': parse_pct(match.group(3), match.group(4))
                 },
                 'single_family': {
-                    '2025': float(match.group(5)),
-                    '2026': float(match.group(6)),
+                    PRIOR_YEAR: float(match.group(5)),
+                    CURRENT_YEAR: float(match.group(6)),
                     'change': parse_pct(match.group(7), match.group(8))
                 },
                 'condos': {
-                    '2025': float(match.group(9)),
-                    '2026': float(match.group(10)),
+                    PRIOR_YEAR: float(match.group(9)),
+                    CURRENT_YEAR: float(match.group(10)),
                     'change': parse_pct(match.group(11), match.group(12))
                 }
             })
@@ -272,18 +279,18 @@ def extract_months_supply(text):
             results.append({
                 'category': category,
                 'all_properties': {
-                    '2025': float(match.group(1)),
-                    '2026': float(match.group(2)),
+                    PRIOR_YEAR: float(match.group(1)),
+                    CURRENT_YEAR: float(match.group(2)),
                     'change': parse_pct(match.group(3), match.group(4))
                 },
                 'single_family': {
-                    '2025': float(match.group(5)),
-                    '2026': float(match.group(6)),
+                    PRIOR_YEAR: float(match.group(5)),
+                    CURRENT_YEAR: float(match.group(6)),
                     'change': parse_pct(match.group(7), match.group(8))
                 },
                 'condos': {
-                    '2025': float(match.group(9)),
-                    '2026': float(match.group(10)),
+                    PRIOR_YEAR: float(match.group(9)),
+                    CURRENT_YEAR: float(match.group(10)),
                     'change': parse_pct(match.group(11), match.group(12))
                 }
             })
@@ -313,60 +320,51 @@ def parse_supply_pdf(pdf_path, period):
         }
     }
     
-    with pdfplumber.open(pdf_path) as pdf:
-        # Page 1 - Quick Facts
-        if len(pdf.pages) >= 1:
-            text = pdf.pages[0].extract_text() or ''
-            result['summary'] = extract_summary(text)
-        
-        # Page 2 - Pending Sales
-        if len(pdf.pages) >= 2:
-            text = pdf.pages[1].extract_text() or ''
-            result['pending_sales'] = extract_pending_sales(text)
-        
-        # Page 3 - Closed Sales
-        if len(pdf.pages) >= 3:
-            text = pdf.pages[2].extract_text() or ''
-            result['closed_sales'] = extract_closed_sales(text)
-        
-        # Page 4 - Median Sales Price
-        if len(pdf.pages) >= 4:
-            text = pdf.pages[3].extract_text() or ''
-            result['median_price'] = extract_median_price(text)
-        
-        # Page 5 - Percent of Original List Price
-        if len(pdf.pages) >= 5:
-            text = pdf.pages[4].extract_text() or ''
-            result['pct_list_price'] = extract_pct_list_price(text)
-        
-        # Page 6 - Days on Market
-        if len(pdf.pages) >= 6:
-            text = pdf.pages[5].extract_text() or ''
-            result['days_on_market'] = extract_days_on_market(text)
-        
-        # Page 7 - Inventory
-        if len(pdf.pages) >= 7:
-            text = pdf.pages[6].extract_text() or ''
-            result['inventory'] = extract_inventory(text)
-        
-        # Page 8 - Months Supply
-        if len(pdf.pages) >= 8:
-            text = pdf.pages[7].extract_text() or ''
-            result['months_supply'] = extract_months_supply(text)
+    pages = extract_page_texts(pdf_path, range(8))
+    
+    # Page 1 - Quick Facts
+    if len(pages) >= 1:
+        result['summary'] = extract_summary(pages[0])
+    
+    # Page 2 - Pending Sales
+    if len(pages) >= 2:
+        result['pending_sales'] = extract_pending_sales(pages[1])
+    
+    # Page 3 - Closed Sales
+    if len(pages) >= 3:
+        result['closed_sales'] = extract_closed_sales(pages[2])
+    
+    # Page 4 - Median Sales Price
+    if len(pages) >= 4:
+        result['median_price'] = extract_median_price(pages[3])
+    
+    # Page 5 - Percent of Original List Price
+    if len(pages) >= 5:
+        result['pct_list_price'] = extract_pct_list_price(pages[4])
+    
+    # Page 6 - Days on Market
+    if len(pages) >= 6:
+        result['days_on_market'] = extract_days_on_market(pages[5])
+    
+    # Page 7 - Inventory
+    if len(pages) >= 7:
+        result['inventory'] = extract_inventory(pages[6])
+    
+    # Page 8 - Months Supply
+    if len(pages) >= 8:
+        result['months_supply'] = extract_months_supply(pages[7])
     
     return result
 
-def main():
-    """Main function."""
-    from sdar_common import resolve_report_month
-    reports_dir, period, month_name = resolve_report_month("Parse SDAR Housing Supply Overview PDF")
+def run(reports_dir, period, month_name):
+    """Parse one month's PDF and write housing_supply_data.json. Returns the data (None if no PDF)."""
     pdf_path = reports_dir / f"{month_name} Housing Supply.pdf"
-    output_path = Path(__file__).parent.parent / "public" / "data" / "housing_supply_data.json"
+    output_path = DATA_DIR / "housing_supply_data.json"
     print(f"Report period: {period}")
     
     if not pdf_path.exists():
         print(f"PDF not found: {pdf_path}")
-        return
+        return None
     
     print(f"Parsing: {pdf_path}")
     data = parse_supply_pdf(pdf_path, period)
@@ -384,6 +382,59 @@ def main():
         json.dump(data, f, indent=2)
     
     print(f"\nSaved to: {output_path}")
+    return data
+
+def _parse_month(job):
+    pdf_path, period = job
+    return parse_supply_pdf(pdf_path, period)
+
+def current_values(data):
+    """{(section, axis, category, group): value} for one parsed report.
+
+    The parser labels the report month's column CURRENT_YEAR and the same
+    month a year earlier PRIOR_YEAR regardless of the actual year, so
+    CURRENT_YEAR is always "this period".
+    """
+    flat = {}
+    for section, body in data.items():
+        if section in ('meta', 'summary'):
+            continue
+        for axis, rows in body.items():
+            for row in rows:
+                for group in PROPERTY_GROUPS:
+                    flat[(section, axis, row['category'], group)] = row[group][CURRENT_YEAR]
+    return flat
+
+def backfill():
+    """Parse every month folder's PDF and write housing_supply_periods.json with MoM deltas."""
+    reports = parse_all_months(_parse_month, "Housing Supply", "supply", "Housing Supply PDFs")
+    if not reports:
+        print("No Housing Supply PDFs found")
+        return None
+    output = {
+        'meta': {
+            'generated': datetime.now().isoformat(),
+            'source': 'SDAR Housing Supply Overview Report',
+            'report_periods': [p for p, _ in reports],
+        },
+        **build_period_series([(p, current_values(d)) for p, d in reports]),
+    }
+    output_path = DATA_DIR / "housing_supply_periods.json"
+    with open(output_path, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"\nSaved {len(reports)} periods to: {output_path}")
+    return output
+
+def main():
+    """Main function."""
+    ap = month_arg_parser("Parse SDAR Housing Supply Overview PDF")
+    ap.add_argument("--backfill", action="store_true",
+                    help="Parse every month folder and write housing_supply_periods.json")
+    args = ap.parse_args()
+    if args.backfill:
+        backfill()
+        return
+    run(*resolve_report_month(args=args))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,97 @@
+"""
+Writer for the dashboard's retail signals.
+
+Instead of one retail_data.json that repeats every category's label and icon
+for every neighborhood, results are written to public/data/retail/:
+
+  index.json                      meta, county summary, the category dictionary
+                                  and the current data file names
+  neighborhoods.<hash>.json       one record per neighborhood with count vectors
+                                  aligned with the category dictionary
+  zips/<zip>.<hash>.json          (optional) the same record for a single zip
+  grid.<hash>.json                (county mode) sparse POI density grid, see
+                                  poi_grid.py
+
+The dashboard fetches the small index with revalidation and everything else
+by its content-hashed name, which can be cached indefinitely. Files are
+written minified with a precompressed .gz next to them.
+"""
+import hashlib
+from pathlib import Path
+
+from json_files import dumps_compact, write_json_variants
+
+RETAIL_DIR = Path(__file__).parent.parent / "public" / "data" / "retail"
+
+
+def _digest(obj):
+    return hashlib.sha256(dumps_compact(obj)).hexdigest()[:10]
+
+
+def category_dictionary(categories):
+    """[{key, label, icon}] in the order used by every count vector."""
+    return [{"key": key, "label": c["label"], "icon": c["icon"]} for key, c in categories.items()]
+
+
+def compact_neighborhood(neighborhood, keys):
+    """A neighborhood summary with its per-category dicts replaced by count vectors."""
+    cats = neighborhood.get("categories", {})
+    record = {k: v for k, v in neighborhood.items() if k != "categories"}
+    record["counts"] = [cats.get(key, {}).get("count", 0) for key in keys]
+    record["new_openings"] = [cats.get(key, {}).get("new_openings", 0) for key in keys]
+    return record
+
+
+def neighborhood_zip(neighborhood):
+    """Zip code from a neighborhood name like "92104-North Park", or None for bbox names without one."""
+    head = neighborhood["name"].split("-", 1)[0]
+    return head if head.isdigit() and len(head) == 5 else None
+
+
+def _write_hashed(path_stem, obj, keep):
+    name = f"{path_stem.name}.{_digest(obj)}.json"
+    path = path_stem.with_name(name)
+    write_json_variants(path, obj)
+    keep.update({path, path.with_name(name + ".gz")})
+    return name
+
+
+def write_retail_data(meta, summary, neighborhoods, categories, out_dir=RETAIL_DIR, zip_shards=False, grid=None):
+    """Write the index, the neighborhood table and optionally per-zip shards and the POI grid; returns the index path.
+
+    Data files from earlier runs that the new index no longer references are
+    removed.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    keys = list(categories)
+    records = [compact_neighborhood(n, keys) for n in neighborhoods]
+    keep = set()
+
+    index = {
+        "meta": meta,
+        "summary": summary,
+        "categories": category_dictionary(categories),
+        "neighborhoods": _write_hashed(out_dir / "neighborhoods", {"neighborhoods": records}, keep),
+    }
+
+    if zip_shards:
+        zip_dir = out_dir / "zips"
+        zip_dir.mkdir(exist_ok=True)
+        index["zips"] = {
+            z: "zips/" + _write_hashed(zip_dir / z, record, keep)
+            for z, record in ((neighborhood_zip(r), r) for r in records) if z
+        }
+
+    if grid is not None:
+        index["grid"] = _write_hashed(out_dir / "grid", grid.to_json(), keep)
+
+    stale_patterns = ("neighborhoods.*.json*", "grid.*.json*", "zips/*.json*")
+    for stale in [p for pattern in stale_patterns for p in out_dir.glob(pattern)]:
+        if stale not in keep:
+            stale.unlink()
+
+    index_path = out_dir / "index.json"
+    raw = write_json_variants(index_path, index)
+    print(f"Wrote {index_path} ({len(raw) / 1024:.1f} KB) and {len(records)} neighborhoods"
+          + (f" ({len(index['zips'])} zip shards)" if zip_shards else ""))
+    return index_path
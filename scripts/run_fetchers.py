@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Run several data fetchers concurrently from one Python start-up.
+
+The fetcher modules (and requests/pandas with them) are imported once here;
+each selected fetcher's main() then runs in a forked child, so wall time is
+that of the slowest source rather than the sum of all of them. A fetcher
+that raises, exits non-zero or exceeds its timeout is reported as failed and
+its output files are put back as they were before the run. That is the
+workflows' old `|| echo "... failed, using existing data"` behaviour, and a
+killed fetcher never leaves a half-written JSON file behind. Each fetcher's
+log is printed as one block when it finishes, followed by a timing summary.
+
+Usage:
+  python scripts/run_fetchers.py weekly
+  python scripts/run_fetchers.py monthly
+  python scripts/run_fetchers.py unemployment home_price_index
+  python scripts/run_fetchers.py weekly --timeout 300   # override every timeout
+  python scripts/run_fetchers.py weekly --strict        # exit 1 if any source failed
+"""
+import argparse
+import importlib
+import multiprocessing
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+SCRIPTS = Path(__file__).parent
+DATA = SCRIPTS.parent / "public" / "data"
+
+# name -> (module, label, output files, timeout seconds)
+FETCHERS = {
+    "unemployment": ("fetch_unemployment_data", "Unemployment data", ["unemployment_data.json"], 300),
+    "home_price_index": ("fetch_home_price_index", "Home price index",
+                         ["home_price_index.json", "us_home_price_index.json",
+                          "la_home_price_index.json", "sj_home_price_index.json"], 300),
+    "supply_fred": ("fetch_supply_fred", "Supply FRED data", ["supply_fred.json"], 300),
+    "development": ("fetch_development_data", "Development data", ["development_data.json"], 600),
+    "business_licenses": ("fetch_business_licenses", "Business license data", ["business_licenses.json"], 600),
+    "sdar": ("fetch_sdar_data", "SDAR data", ["sdar_data.json"], 300),
+    "zillow_rentals": ("fetch_zillow_rentals", "Zillow rental data", ["zillow_rental_data.json"], 600),
+    "homeless": ("fetch_homeless_data", "Homeless data", ["homeless_data.json"], 300),
+    "lending": ("fetch_lending_data", "FRED lending data", ["lending_data.json"], 300),
+    "warn": ("fetch_warn_data", "WARN layoff data", ["warn_data.json"], 300),
+}
+
+GROUPS = {
+    "weekly": ["unemployment", "home_price_index", "supply_fred", "development"],
+    "monthly": ["business_licenses", "sdar", "zillow_rentals", "homeless"],
+    "daily": ["lending", "warn"],
+}
+
+
+def _run_child(module_name, log_path):
+    """Child process body: send output to the log file and run module.main()."""
+    log = open(log_path, "w", buffering=1, encoding="utf-8")
+    sys.stdout = sys.stderr = log
+    try:
+        sys.modules[module_name].main()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        log.close()
+        sys.exit(code)
+    except BaseException:
+        traceback.print_exc()
+        log.close()
+        sys.exit(1)
+    log.close()
+    sys.exit(0)
+
+
+def snapshot(paths):
+    """{path: bytes or None} so outputs can be restored after a failed run."""
+    return {p: (p.read_bytes() if p.exists() else None) for p in paths}
+
+
+def restore(saved):
+    for path, content in saved.items():
+        if content is None:
+            path.unlink(missing_ok=True)
+        else:
+            path.write_bytes(content)
+
+
+def run(names, timeout_override=None):
+    """Run the named fetchers concurrently; returns {name: (status, seconds)}."""
+    sys.path.insert(0, str(SCRIPTS))
+    ctx = multiprocessing.get_context("fork")
+    log_dir = Path(tempfile.mkdtemp(prefix="fetchers-"))
+    jobs = {}
+    results = {}
+
+    for name in names:
+        module_name, label, outputs, timeout = FETCHERS[name]
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            print(f"{label} fetch failed ({e}), using existing data")
+            results[name] = ("import error", 0.0)
+            continue
+        log_path = log_dir / f"{name}.log"
+        saved = snapshot([DATA / o for o in outputs])
+        proc = ctx.Process(target=_run_child, args=(module_name, log_path), name=name)
+        proc.start()
+        deadline = time.monotonic() + (timeout_override or timeout)
+        jobs[name] = (proc, log_path, saved, time.monotonic(), deadline)
+
+    while jobs:
+        for name, (proc, log_path, saved, started, deadline) in list(jobs.items()):
+            proc.join(timeout=0)
+            timed_out = proc.is_alive() and time.monotonic() > deadline
+            if proc.is_alive() and not timed_out:
+                continue
+            if timed_out:
+                proc.kill()
+                proc.join()
+            elapsed = time.monotonic() - started
+            label = FETCHERS[name][1]
+            print(f"\n===== {name} ({elapsed:.1f}s) =====")
+            print(log_path.read_text(encoding="utf-8", errors="replace").rstrip())
+            if timed_out or proc.exitcode != 0:
+                restore(saved)
+                status = "timed out" if timed_out else f"failed (exit {proc.exitcode})"
+                print(f"{label} fetch {status}, using existing data")
+            else:
+                status = "ok"
+            results[name] = (status, elapsed)
+            del jobs[name]
+        if jobs:
+            time.sleep(0.2)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run data fetchers concurrently.")
+    parser.add_argument("sources", nargs="+", help=f"Groups ({', '.join(GROUPS)}) and/or fetcher names ({', '.join(FETCHERS)})")
+    parser.add_argument("--timeout", type=float, help="Seconds allowed per fetcher (overrides the defaults)")
+    parser.add_argument("--strict", action="store_true", help="Exit non-zero if any fetcher failed")
+    args = parser.parse_args()
+
+    names = []
+    for source in args.sources:
+        for name in GROUPS.get(source, [source]):
+            if name not in FETCHERS:
+                parser.error(f"unknown fetcher or group: {name}")
+            if name not in names:
+                names.append(name)
+
+    started = time.monotonic()
+    results = run(names, args.timeout)
+    wall = time.monotonic() - started
+
+    print("\n===== Summary =====")
+    for name in names:
+        status, seconds = results[name]
+        print(f"  {name:<18} {status:<20} {seconds:7.1f}s")
+    print(f"  {'wall time':<18} {'':<20} {wall:7.1f}s (sum {sum(s for _, s in results.values()):.1f}s)")
+
+    failed = [n for n, (status, _) in results.items() if status != "ok"]
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    if args.strict and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
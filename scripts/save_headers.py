@@ -1,5 +1,5 @@
 
-import urllib.request
+from swdb import read_header
 
 files = {
     '2012': 'https://statewidedatabase.org/pub/data/G12/c073/c073_g12_sov_data_by_g12_srprec.csv',
@@ -10,11 +10,6 @@ with open('headers_dump.txt', 'w') as f:
     for year, url in files.items():
         f.write(f"\n=== {year} ===\n")
         try:
-            req = urllib.request.Request(url, method='GET')
-            req.add_header('Range', 'bytes=0-8192') 
-            with urllib.request.urlopen(req) as response:
-                content = response.read().decode('utf-8', errors='ignore')
-                headers = content.splitlines()[0].split(',')
-                f.write(','.join(headers))
+            f.write(','.join(read_header(url)))
         except Exception as e:
             f.write(f"Error: {e}")
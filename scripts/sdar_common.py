@@ -7,7 +7,12 @@ Every parser resolves its target month the same way:
   2. otherwise the newest month-named folder in sdar_reports/
 """
 import argparse
+import functools
+import json
+import multiprocessing
+import os
 import re
+import sys
 from pathlib import Path
 
 MONTH_NAMES = [
@@ -17,6 +22,19 @@ MONTH_NAMES = [
 
 REPORTS_ROOT = Path(__file__).parent.parent / "sdar_reports"
 
+# Keys of the two comparison columns in parsed Housing Supply and
+# Lender-Mediated rows: the same month a year earlier and the report month.
+# The parsers write these keys and RunContext/figures_report read them, so
+# rolling the reports over to a new year is a change here only.
+PRIOR_YEAR, CURRENT_YEAR = "2025", "2026"
+YEAR_KEYS = (PRIOR_YEAR, CURRENT_YEAR)
+
+# Long PDF runs (100+ Monthly Indicators, hundreds of LMU files) go through
+# map_pdfs(): a small worker pool whose processes are replaced every
+# PDF_RECYCLE_AFTER files so pdfminer allocations can't pile up.
+PDF_WORKERS = int(os.environ.get("SDAR_PDF_WORKERS", min(4, os.cpu_count() or 1)))
+PDF_RECYCLE_AFTER = int(os.environ.get("SDAR_PDF_RECYCLE_AFTER", 25))
+
 _FOLDER_RE = re.compile(r"^(" + "|".join(MONTH_NAMES) + r") (\d{4})$")
 
 
@@ -28,6 +46,82 @@ def parse_month_folder(name):
     return int(m.group(2)), MONTH_NAMES.index(m.group(1)) + 1
 
 
+def extract_page_texts(pdf_path, pages=None):
+    """Text of each page of pdf_path ('' if blank), flushing layout caches as we go.
+
+    pdfplumber keeps every parsed char/line/rect on the Page object; closing
+    each page right after extract_text() keeps memory flat however many
+    pages or files a run touches. Only the indexes in `pages` are extracted
+    (all pages if None); the rest come back as None, so len() of the result
+    is always the page count.
+    """
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        wanted = set(range(len(pdf.pages)) if pages is None else pages)
+        texts = []
+        for i, page in enumerate(pdf.pages):
+            if i not in wanted:
+                texts.append(None)
+                continue
+            texts.append(page.extract_text() or "")
+            if hasattr(page, "close"):
+                page.close()
+            else:
+                page.flush_cache()
+        return texts
+
+
+def rss_mb():
+    """Resident memory of this process in MB, or None where it can't be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # peak, not current
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _call_with_rss(fn, path):
+    return fn(path), rss_mb()
+
+
+def map_pdfs(fn, paths, workers=PDF_WORKERS, recycle_after=PDF_RECYCLE_AFTER, label="PDFs"):
+    """Yield fn(path) for every path (or picklable job tuple), in order.
+
+    fn must be a module-level function so it can be sent to worker processes.
+    Each worker is retired after `recycle_after` files; workers <= 1 runs
+    in-process. Worker and main-process RSS are printed every `recycle_after`
+    files so long backfills can be checked for flat memory.
+    """
+    paths = list(paths)
+    call = functools.partial(_call_with_rss, fn)
+    pool = None
+    if workers > 1 and len(paths) > 1:
+        pool = multiprocessing.Pool(min(workers, len(paths)), maxtasksperchild=recycle_after)
+        results = pool.imap(call, paths)
+    else:
+        results = map(call, paths)
+
+    peak = 0.0
+    try:
+        for i, (result, rss) in enumerate(results, 1):
+            peak = max(peak, rss or 0.0)
+            if rss is not None and (i % recycle_after == 0 or i == len(paths)):
+                print(f"  [{i}/{len(paths)} {label}] worker RSS {rss:.0f} MB, peak {peak:.0f} MB, "
+                      f"main RSS {rss_mb():.0f} MB")
+            yield result
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
 def find_latest_report_dir(root=REPORTS_ROOT):
     """Newest '<Month> <Year>' folder under sdar_reports/, or None."""
     best = None
@@ -43,11 +137,17 @@ def find_latest_report_dir(root=REPORTS_ROOT):
     return best
 
 
-def resolve_report_month(description):
-    """Parse --month or auto-detect. Returns (reports_dir: Path, period: str, month_name: str)."""
+def month_arg_parser(description):
+    """ArgumentParser with the shared --month option; parsers add their own flags."""
     ap = argparse.ArgumentParser(description=description)
     ap.add_argument("--month", help='Report period, e.g. "June 2026". Default: newest folder in sdar_reports/')
-    args = ap.parse_args()
+    return ap
+
+
+def resolve_report_month(description=None, args=None):
+    """Parse --month or auto-detect. Returns (reports_dir: Path, period: str, month_name: str)."""
+    if args is None:
+        args = month_arg_parser(description).parse_args()
 
     if args.month:
         if not parse_month_folder(args.month):
@@ -62,3 +162,187 @@ def resolve_report_month(description):
 
     month_name = period.split()[0]
     return reports_dir, period, month_name
+
+
+def list_report_months(root=REPORTS_ROOT):
+    """Every '<Month> <Year>' folder under sdar_reports/, oldest first."""
+    if not root.exists():
+        return []
+    dirs = [p for p in root.iterdir() if p.is_dir() and parse_month_folder(p.name)]
+    return sorted(dirs, key=lambda p: parse_month_folder(p.name))
+
+
+def find_report_pdf(month_dir, suffix, keyword):
+    """'<Month> <suffix>.pdf' in month_dir, else the one PDF whose name contains keyword.
+
+    Folders from before monthly_update.py standardised the names use whatever
+    the download was called ("Supply Overview.pdf", "Housing Supply Overview
+    November 2025.pdf", ...).
+    """
+    exact = month_dir / f"{month_dir.name.split()[0]} {suffix}.pdf"
+    if exact.exists():
+        return exact
+    matches = [p for p in month_dir.glob("*.pdf") if keyword in p.name.lower()]
+    return matches[0] if len(matches) == 1 else None
+
+
+def parse_all_months(job_fn, suffix, keyword, label):
+    """Run job_fn((pdf_path, period)) for that report in every month folder, concurrently.
+
+    Returns [(period, result)] oldest first; months without the PDF are skipped.
+    """
+    jobs = []
+    for month_dir in list_report_months():
+        pdf = find_report_pdf(month_dir, suffix, keyword)
+        if pdf is None:
+            print(f"  {month_dir.name}: no {suffix} PDF, skipped")
+            continue
+        jobs.append((pdf, month_dir.name))
+    results = map_pdfs(job_fn, jobs, label=label)
+    return [(period, data) for (_, period), data in zip(jobs, results)]
+
+
+def _month_index(period):
+    year, month = parse_month_folder(period)
+    return year * 12 + month
+
+
+def build_period_series(snapshots):
+    """Columnar time axis with month-over-month deltas.
+
+    snapshots is [(period, {(section, axis, key, group): value})], oldest
+    first. Each key becomes series[section][axis][key][group] =
+    {values, mom_change, mom_pct}; deltas are None for the first period,
+    missing values, and months that don't directly follow the previous
+    snapshot.
+    """
+    periods = [p for p, _ in snapshots]
+    keys = list(dict.fromkeys(k for _, snap in snapshots for k in snap))
+    follows = [i > 0 and _month_index(periods[i]) - _month_index(periods[i - 1]) == 1
+               for i in range(len(periods))]
+
+    series = {}
+    for key in keys:
+        values = [snap.get(key) for _, snap in snapshots]
+        change, pct = [], []
+        for i, v in enumerate(values):
+            prev = values[i - 1] if follows[i] else None
+            if v is None or prev is None:
+                change.append(None)
+                pct.append(None)
+                continue
+            change.append(round(v - prev, 2))
+            pct.append(round((v - prev) / prev * 100, 1) if prev else None)
+        node = series
+        for k in key[:-1]:
+            node = node.setdefault(k, {})
+        node[key[-1]] = {"values": values, "mom_change": change, "mom_pct": pct}
+    return {"periods": periods, "series": series}
+
+
+# Housing Supply row groups that RunContext indexes by category.
+_SUPPLY_AXES = ("by_price_range", "by_sq_footage")
+
+
+class RunContext:
+    """In-memory results of one pipeline run, indexed once for the summary generators.
+
+    Parser stages hand their output to add(); figures_report() (and any later
+    summary generator) queries the keyed indexes instead of reloading the JSONs
+    and rescanning their lists. from_disk() rebuilds the same context from the
+    written files for --figures-only runs.
+    """
+
+    STAGE_FILES = {
+        "sdar": "sdar_neighborhood_data.json",
+        "supply": "housing_supply_data.json",
+        "lender": "lender_mediated_data.json",
+        "history": "historical_indicators.json",
+    }
+
+    def __init__(self, period):
+        self.period = period
+        self.data = {}
+        self.sdar_by_zip = {}
+        self.supply_rows = {}      # (section, axis, category) -> row
+        self.supply_totals = {}    # (section, sub, year) -> sum over price ranges
+        self.lm_by_type = {}       # (section, type) -> row
+        self.lm_by_range = {}      # range -> inventory row
+        self.lm_by_zip = {}        # zip -> area_inventory_sales row
+        self.lm_share_ranking = [] # [(share, zip, neighborhood)] desc, zips with >= 5 listings
+        self.lm_zero_zips = []     # "Neighborhood (zip)" with listings but no LM inventory
+        self.history_by_period = {}
+
+    @classmethod
+    def from_disk(cls, period, data_dir):
+        ctx = cls(period)
+        for stage, name in cls.STAGE_FILES.items():
+            with open(Path(data_dir) / name, encoding="utf-8") as f:
+                ctx.add(stage, json.load(f))
+        return ctx
+
+    def add(self, stage, data):
+        """Register one stage's output and build its indexes."""
+        self.data[stage] = data
+        getattr(self, f"_index_{stage}")(data)
+        return data
+
+    def __getitem__(self, stage):
+        return self.data[stage]
+
+    def _index_sdar(self, sd):
+        self.sdar_by_zip = {n["zip_code"]: n for n in sd.get("neighborhoods", []) if n.get("zip_code")}
+
+    def _index_supply(self, hs):
+        rows, totals = {}, {}
+        for section, body in hs.items():
+            if not isinstance(body, dict):
+                continue
+            for axis in _SUPPLY_AXES:
+                for row in body.get(axis, []):
+                    rows[(section, axis, row["category"])] = row
+                    if axis != "by_price_range":
+                        continue
+                    for sub, vals in row.items():
+                        if not isinstance(vals, dict):
+                            continue
+                        for yr in YEAR_KEYS:
+                            key = (section, sub, yr)
+                            totals[key] = totals.get(key, 0) + (vals.get(yr) or 0)
+        self.supply_rows, self.supply_totals = rows, totals
+
+    def _index_lender(self, lm):
+        by_type = {}
+        for r in lm.get("inventory", {}).get("by_property_type", []):
+            by_type[("inventory", r["type"])] = r
+        for section in ("median_price", "days_on_market"):
+            for r in lm.get("price_dom", {}).get(section, []):
+                by_type[(section, r["type"])] = r
+        self.lm_by_type = by_type
+        self.lm_by_range = {r["range"]: r for r in lm.get("inventory", {}).get("by_price_range", [])}
+
+        ranking, zero, by_zip = [], [], {}
+        for it in lm.get("area_inventory_sales", []):
+            by_zip[it["zip_code"]] = it
+            inv = it["inventory"]
+            tm, l = inv.get("total_market") or 0, inv.get("lender_mediated") or 0
+            if l == 0 and tm > 0:
+                zero.append(f"{it['neighborhood']} ({it['zip_code']})")
+            if inv.get("share") is not None and tm >= 5:
+                ranking.append((inv["share"], it["zip_code"], it["neighborhood"]))
+        ranking.sort(reverse=True)
+        self.lm_by_zip, self.lm_share_ranking, self.lm_zero_zips = by_zip, ranking, zero
+
+    def _index_history(self, hist):
+        self.history_by_period = {p["period"]: p for p in hist}
+
+    def supply_row(self, section, category, axis="by_price_range"):
+        return self.supply_rows[(section, axis, category)]
+
+    def supply_total(self, section, sub, year):
+        return self.supply_totals.get((section, sub, year), 0)
+
+    @property
+    def history_latest(self):
+        hist = self.data["history"]
+        return hist[-1] if hist else None
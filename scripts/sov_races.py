@@ -0,0 +1,174 @@
+"""
+Contest registry for Statewide Database SOV files.
+
+SOV headers encode each contest's vote columns by name: an office prefix,
+party and candidate number (PRSDEM01, USSREP01, CNGDEM02, SENREP01,
+ASSIND01), or PR_<n>_Y / PR_<n>_N for a proposition. detect_races() groups
+a header into races, so every contest in a file is picked up without
+per-year column maps. The columns of all races are read in one pass into a
+single vote array, and aggregate_races() slices each race back out of the
+shared city and zip totals.
+
+District offices reuse the same party slots in every district (CNGDEM01 is
+a different candidate in each congressional district), so their columns
+are only meaningful per district. split_districts() turns each of them into
+one race per district using the precinct's cddist/sddist/addist value.
+"""
+import re
+
+import numpy as np
+
+# SOV office prefix -> (race key, label, precinct district column or None if statewide)
+OFFICES = {
+    'PRS': ('president', 'President', None),
+    'USS': ('us_senate', 'U.S. Senate', None),
+    'CNG': ('us_house', 'U.S. House', 'cddist'),
+    'SEN': ('state_senate', 'State Senate', 'sddist'),
+    'ASS': ('state_assembly', 'State Assembly', 'addist'),
+}
+
+CANDIDATE_COLUMN = re.compile(r'^(PRS|USS|CNG|SEN|ASS)([A-Z]{3})(\d{2})$')
+PROPOSITION_COLUMN = re.compile(r'^PR_(\w+?)_([YN])$')
+
+
+def _prop_sort_key(number):
+    return (0, int(number), '') if number.isdigit() else (1, 0, number)
+
+
+def detect_races(header, named=None):
+    """[{key, label, columns, choices, district}] for every contest in an SOV header.
+
+    Offices come first in OFFICES order with candidate columns in header
+    order, then propositions by number with Yes before No. `named` maps a
+    race key to an explicit {column: choice name} (e.g. presidential
+    candidate names, which the SOV file does not carry); that race then
+    uses exactly those columns, in that order. `district` is the district
+    column a race must be split by (None for statewide contests); district
+    offices whose district column is missing from the header are left out.
+    """
+    named = named or {}
+    offices = {key: [] for key, _, _ in OFFICES.values()}
+    props = {}
+    present = {h.strip().lower() for h in header}
+    for col in (h.strip().upper() for h in header):
+        m = CANDIDATE_COLUMN.match(col)
+        if m:
+            offices[OFFICES[m.group(1)][0]].append(col)
+            continue
+        m = PROPOSITION_COLUMN.match(col)
+        if m:
+            props.setdefault(m.group(1), {})[m.group(2)] = col
+
+    races = []
+    for key, label, district in OFFICES.values():
+        if key in named:
+            columns, choices = list(named[key]), list(named[key].values())
+        else:
+            columns, choices = offices[key], [c[3:] for c in offices[key]]
+        if columns and (district is None or district in present):
+            races.append({'key': key, 'label': label, 'columns': columns, 'choices': choices,
+                          'district': district})
+    for number in sorted(props, key=_prop_sort_key):
+        sides = [(props[number][s], name) for s, name in (('Y', 'Yes'), ('N', 'No')) if s in props[number]]
+        races.append({
+            'key': f'prop_{number}',
+            'label': f'Proposition {number}',
+            'columns': [col for col, _ in sides],
+            'choices': [name for _, name in sides],
+            'district': None,
+        })
+    return races
+
+
+def district_columns(races):
+    """The precinct district columns the races need, in first-use order."""
+    return list(dict.fromkeys(race['district'] for race in races if race['district']))
+
+
+def _district_label(raw):
+    raw = (raw or '').strip()
+    return str(int(raw)) if raw.isdigit() else raw
+
+
+def _district_sort_key(label):
+    return (0, int(label), '') if label.isdigit() else (1, 0, label)
+
+
+def split_districts(races, votes, districts):
+    """(races, votes) with every district office split into one race per district.
+
+    `districts` maps a district column to the per-precinct district values
+    (aligned with the rows of votes). Each district's race keeps only its
+    own precincts' votes and only the party slots that received votes
+    there, and is keyed e.g. us_house_52 / "U.S. House District 52".
+    Statewide races and propositions pass through unchanged.
+    """
+    slices = race_slices(races)
+    out_races, blocks = [], []
+    for race in races:
+        block = votes[:, slices[race['key']]]
+        if not race['district']:
+            out_races.append(race)
+            blocks.append(block)
+            continue
+        labels = np.array([_district_label(d) for d in districts[race['district']]], dtype=object)
+        for label in sorted(set(labels) - {''}, key=_district_sort_key):
+            sub = block * (labels == label)[:, None]
+            used = np.flatnonzero(sub.sum(axis=0) > 0)
+            if not len(used):
+                continue
+            out_races.append({
+                'key': f"{race['key']}_{label}",
+                'label': f"{race['label']} District {label}",
+                'columns': [race['columns'][i] for i in used],
+                'choices': [race['choices'][i] for i in used],
+                'district': None,
+            })
+            blocks.append(sub[:, used])
+    return out_races, (np.hstack(blocks) if blocks else votes[:, :0])
+
+
+def race_columns(races):
+    """All races' columns, concatenated in race order (the vote array's column order)."""
+    return [col for race in races for col in race['columns']]
+
+
+def race_slices(races):
+    """{race key: slice of the vote array's columns}."""
+    out, start = {}, 0
+    for race in races:
+        out[race['key']] = slice(start, start + len(race['columns']))
+        start += len(race['columns'])
+    return out
+
+
+def _area_results(names, sums):
+    return {name: [round(v) for v in row] for name, row in zip(names, sums.tolist()) if round(sum(row)) > 0}
+
+
+def aggregate_races(races, county, city_names, city_votes, zip_labels=(), zip_votes=None, skip=()):
+    """{key: {label, choices, county, by_city, by_zipcode}} with rounded vote lists.
+
+    county, city_votes and zip_votes are the already-aggregated totals for
+    every column in race_columns(races) order. Areas with no votes in a
+    race (e.g. other districts) are left out, as is the 'Unknown' zip.
+    """
+    zip_keep = [i for i, z in enumerate(zip_labels) if z != 'Unknown']
+    zip_names = [zip_labels[i] for i in zip_keep]
+    slices = race_slices(races)
+    out = {}
+    for race in races:
+        if race['key'] in skip:
+            continue
+        cols = slices[race['key']]
+        totals = [round(v) for v in np.asarray(county)[cols].tolist()]
+        if not sum(totals):
+            continue
+        out[race['key']] = {
+            'label': race['label'],
+            'choices': race['choices'],
+            'county': totals,
+            'by_city': _area_results(city_names, city_votes[:, cols]),
+            'by_zipcode': _area_results(zip_names, zip_votes[zip_keep][:, cols]) if zip_votes is not None else {},
+        }
+    return out
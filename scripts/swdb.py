@@ -0,0 +1,77 @@
+"""
+Streaming readers for California Statewide Database (statewidedatabase.org) CSVs.
+
+The SOV and sr_blk_map files run to hundreds of MB. stream_csv() decodes the
+file chunk by chunk and yields only the requested columns as tuples, so peak
+memory is one chunk plus one row whatever the file size. The files never
+change once published, so they are read through the shared http_cache:
+downloaded once, then served from disk (and in --offline runs, only from disk).
+read_header() only needs the first line and reads just that much.
+"""
+import codecs
+import csv
+
+import http_cache
+
+CHUNK_SIZE = 1 << 16
+HEADER_BYTES = 8192
+
+
+def _iter_chunks(stream):
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        yield chunk
+        if not chunk:
+            return
+
+
+def _iter_lines(chunks):
+    """Decode byte chunks incrementally into lines (newlines kept, for csv)."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    for chunk in chunks:
+        pending += decoder.decode(chunk, final=not chunk)
+        lines = pending.splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith(('\n', '\r')) else ''
+        yield from lines
+    if pending:
+        yield pending
+
+
+def stream_csv(url: str, columns):
+    """Yield a tuple of `columns` (matched case-insensitively) for every CSV row.
+
+    Columns missing from the header come back as None.
+    """
+    stream = http_cache.open_binary(url)
+    try:
+        reader = csv.reader(_iter_lines(_iter_chunks(stream)))
+        header = next(reader, None)
+        if header is None:
+            return
+        index = {name.strip().lower(): i for i, name in enumerate(header)}
+        picks = [index.get(c.lower()) for c in columns]
+        for row in reader:
+            if not row:
+                continue
+            yield tuple(row[i] if i is not None and i < len(row) else None for i in picks)
+    finally:
+        stream.close()
+
+
+def read_header(url: str, max_bytes=1 << 20):
+    """Column names from the first line of a SWDB CSV.
+
+    Only the start of the file is read: from the cache if the file is
+    already there, otherwise via HTTP Range requests (growing from
+    HEADER_BYTES until the line is complete), so inspecting a header never
+    downloads a whole SOV file.
+    """
+    size = HEADER_BYTES
+    while True:
+        head = http_cache.read_head(url, size)
+        if b'\n' in head or len(head) < size or size >= max_bytes:
+            break
+        size *= 2
+    text = head.decode('utf-8-sig', errors='ignore')
+    return next(csv.reader([text.splitlines()[0]]), []) if text else []
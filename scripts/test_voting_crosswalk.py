@@ -0,0 +1,38 @@
+"""
+Checks for the precinct -> zip crosswalk in fetch_voting_geo.
+
+Run with: python -m pytest scripts/test_voting_crosswalk.py
+"""
+from fetch_voting_geo import ELECTIONS, build_precinct_zip_weights, election_block_map
+
+# Tract 020706 block 1001 exists in the 2020 block table, but in a 2010-vintage
+# block map the same ID is a different block, inside tract 020706's 2010 zip.
+TRACT_TO_ZIP = {'06073020706': '92104'}
+BLOCK_TO_ZIP = {'060730207061001': '92116'}
+GEO_HASHES = ('blocks', 'tracts', 'zips')
+ROWS = [('P1', '20706', '1001', '100')]
+
+
+def election(code):
+    return next(e for e in ELECTIONS if e['code'] == code)
+
+
+def weights_for(code):
+    block_to_zip, _ = election_block_map(election(code), BLOCK_TO_ZIP, GEO_HASHES)
+    return build_precinct_zip_weights(ROWS, TRACT_TO_ZIP, block_to_zip)
+
+
+def test_2020_block_map_uses_block_centroids():
+    assert weights_for('g24') == {'P1': {'92116': 1.0}}
+
+
+def test_older_block_maps_fall_back_to_tract_centroids():
+    for code in ('g20', 'g16', 'g12'):
+        assert weights_for(code) == {'P1': {'92104': 1.0}}, code
+
+
+def test_older_block_maps_get_their_own_cache_key():
+    _, hashes = election_block_map(election('g16'), BLOCK_TO_ZIP, GEO_HASHES)
+    assert hashes == ('no-blocks', 'tracts', 'zips')
+    _, hashes = election_block_map(election('g24'), BLOCK_TO_ZIP, GEO_HASHES)
+    assert hashes == GEO_HASHES
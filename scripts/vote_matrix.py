@@ -0,0 +1,100 @@
+"""
+Array-based aggregation of Statement of Vote (SOV) results.
+
+An election's results are held as a precincts x candidates float array.
+The precinct -> zip crosswalk is a sparse precincts x zips weight matrix kept
+as COO triplets (row, col, weight), so zip totals are the product W.T @ V,
+computed with np.add.at. City totals are a group-by over each precinct's city
+label. Adding a race only adds columns to V. No per-candidate Python loops
+and no scipy dependency.
+"""
+import numpy as np
+
+
+def parse_votes(rows, n_columns, n_labels=0):
+    """(precinct ids, votes array) from (precinct, *raw values) rows.
+
+    Blank, non-numeric and negative cells count as 0. Rows without a
+    precinct id or without any votes are dropped. With n_labels, the first
+    n_labels values of each row are text (e.g. district numbers) and are
+    returned as a third element: one list per label column, aligned with
+    the kept precincts.
+    """
+    precincts, flat, text = [], [], []
+    for prec, *values in rows:
+        if not prec:
+            continue
+        text.append(values[:n_labels])
+        values = values[n_labels:]
+        parsed = []
+        for raw in values[:n_columns]:
+            try:
+                parsed.append(max(float(raw or 0), 0.0))
+            except ValueError:
+                parsed.append(0.0)
+        parsed.extend([0.0] * (n_columns - len(parsed)))
+        precincts.append(prec)
+        flat.extend(parsed)
+    votes = np.array(flat, dtype=float).reshape(len(precincts), n_columns)
+    keep = votes.sum(axis=1) > 0
+    kept = [p for p, k in zip(precincts, keep) if k]
+    if not n_labels:
+        return kept, votes[keep]
+    text = [t for t, k in zip(text, keep) if k]
+    labels = [[(t[i] if i < len(t) else '') for t in text] for i in range(n_labels)]
+    return kept, votes[keep], labels
+
+
+def group_sum(votes, labels):
+    """(sorted unique labels, per-label row sums of votes)."""
+    names, inverse = np.unique(np.asarray(labels, dtype=object), return_inverse=True)
+    sums = np.zeros((len(names), votes.shape[1]))
+    np.add.at(sums, inverse, votes)
+    return list(names), sums
+
+
+class SparseWeights:
+    """Sparse precincts x labels weight matrix (e.g. precinct -> zip shares)."""
+
+    def __init__(self, rows, cols, weights, labels):
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=float)
+        self.labels = labels
+
+    @classmethod
+    def from_weights(cls, precincts, prec_weights, default='Unknown'):
+        """Build from {precinct: {label: share}}; unmapped precincts go wholly to `default`."""
+        label_idx = {}
+        rows, cols, weights = [], [], []
+        for i, prec in enumerate(precincts):
+            for label, w in prec_weights.get(prec, {default: 1.0}).items():
+                if w <= 0:
+                    continue
+                rows.append(i)
+                cols.append(label_idx.setdefault(label, len(label_idx)))
+                weights.append(w)
+        return cls(rows, cols, weights, list(label_idx))
+
+    def transpose_dot(self, votes):
+        """W.T @ votes: labels x columns totals."""
+        out = np.zeros((len(self.labels), votes.shape[1]))
+        np.add.at(out, self.cols, votes[self.rows] * self.weights[:, None])
+        return out
+
+    def _entries(self, mask):
+        if mask is None:
+            return self.rows, self.cols
+        keep = np.asarray(mask, dtype=bool)[self.rows]
+        return self.rows[keep], self.cols[keep]
+
+    def precinct_counts(self, mask=None):
+        """Number of precincts contributing to each label (only rows where mask is set)."""
+        return np.bincount(self._entries(mask)[1], minlength=len(self.labels))
+
+    def members(self, precincts, mask=None):
+        """{label: [precinct ids]} in precinct order (only rows where mask is set)."""
+        out = {label: [] for label in self.labels}
+        for r, c in zip(*self._entries(mask)):
+            out[self.labels[c]].append(precincts[r])
+        return out
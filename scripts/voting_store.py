@@ -0,0 +1,104 @@
+"""
+Writer for the dashboard's voting data.
+
+Instead of one large voting_data.json, results are written to
+public/data/voting/:
+
+  index.json                      county, city and zip summaries for every election
+  precincts_<year>.<hash>.json    precinct detail for one election, as column arrays
+  races_<year>.<hash>.json        down-ballot and proposition results by city and zip
+
+The dashboard loads the index up front and only fetches the precinct shard of
+the election being viewed. Shard names carry a content hash, so they can be
+cached indefinitely; the index records the current name. Every file is
+written minified with a precompressed .gz next to it.
+"""
+import hashlib
+from pathlib import Path
+
+from json_files import dumps_compact, write_json_variants
+
+VOTING_DIR = Path(__file__).parent.parent / 'public' / 'data' / 'voting'
+
+
+def precinct_columns(election):
+    """Columnar precinct table for one election.
+
+    Candidate vote counts are one array per candidate (aligned with
+    `candidates`), city names are dictionary-encoded, and `zips` maps each
+    zip to the row numbers of its precincts (replacing the per-zip
+    precinct_ids lists).
+    """
+    precincts = election.get('precincts', [])
+    candidates = list(election.get('candidates', {}))
+    cities = sorted({p.get('city') or 'Unknown' for p in precincts})
+    city_idx = {c: i for i, c in enumerate(cities)}
+    row_of = {p['precinct']: i for i, p in enumerate(precincts)}
+
+    zips = {}
+    for z, info in election.get('by_zipcode', {}).items():
+        rows = sorted(row_of[p] for p in info.get('precinct_ids', []) if p in row_of)
+        if rows:
+            zips[z] = rows
+
+    return {
+        'year': election['year'],
+        'candidates': candidates,
+        'cities': cities,
+        'precinct': [p['precinct'] for p in precincts],
+        'city': [city_idx[p.get('city') or 'Unknown'] for p in precincts],
+        'total': [p.get('total', 0) for p in precincts],
+        'votes': [[p.get(c, 0) for p in precincts] for c in candidates],
+        'zips': zips,
+    }
+
+
+def election_summary(election, shard_name, race_shard=None):
+    """The election minus its precinct detail and races, pointing at their shards."""
+    summary = {k: v for k, v in election.items() if k not in ('precincts', 'by_zipcode', 'races')}
+    summary['by_zipcode'] = {
+        z: {k: v for k, v in info.items() if k != 'precinct_ids'}
+        for z, info in election.get('by_zipcode', {}).items()
+    }
+    summary['precinct_shard'] = shard_name
+    if race_shard:
+        summary['races'] = {key: race['label'] for key, race in election['races'].items()}
+        summary['race_shard'] = race_shard
+    return summary
+
+
+def _write_shard(out_dir, prefix, year, obj, keep):
+    digest = hashlib.sha256(dumps_compact(obj)).hexdigest()[:10]
+    name = f"{prefix}_{year}.{digest}.json"
+    write_json_variants(out_dir / name, obj)
+    keep.update({name, name + '.gz'})
+    return name
+
+
+def write_voting_data(meta, elections, out_dir=VOTING_DIR):
+    """Write the index and one precinct shard per election; returns the index path.
+
+    Shards from earlier runs whose content changed are removed so the
+    directory only holds what the index references.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    keep = set()
+    summaries = {}
+    for year, election in elections.items():
+        if not election:
+            continue
+        name = _write_shard(out_dir, 'precincts', year, precinct_columns(election), keep)
+        race_name = None
+        if election.get('races'):
+            race_name = _write_shard(out_dir, 'races', year, {'year': year, 'races': election['races']}, keep)
+        summaries[year] = election_summary(election, name, race_name)
+
+    for pattern in ('precincts_*.json*', 'races_*.json*'):
+        for stale in out_dir.glob(pattern):
+            if stale.name not in keep:
+                stale.unlink()
+
+    index_path = out_dir / 'index.json'
+    raw = write_json_variants(index_path, {**meta, 'elections': summaries})
+    print(f"Wrote {index_path} ({len(raw) / 1024:.0f} KB) and {len(summaries)} precinct shards")
+    return index_path
@@ -402,8 +402,36 @@ const AreaSearchTable = ({ data, title, type = 'inventory' }) => {
     );
 };
 
+// The inventory trend series lives in lender_mediated_history.json (appended by
+// process_lender_mediated.py each month). It is cached in localStorage under its
+// content hash and only re-fetched when meta.history_hash in the main file changes.
+const HISTORY_CACHE_KEY = 'lmHistory';
+
+const loadTrendSeries = (hash) => {
+    try {
+        const cached = JSON.parse(localStorage.getItem(HISTORY_CACHE_KEY) || 'null');
+        if (hash && cached?.hash === hash) return Promise.resolve(cached.series);
+    } catch {
+        // unreadable cache entry — fall through to the network
+    }
+    return fetch('/data/lender_mediated_history.json')
+        .then(res => {
+            if (!res.ok) throw new Error('Failed to load trend series');
+            return res.json();
+        })
+        .then(history => {
+            try {
+                localStorage.setItem(HISTORY_CACHE_KEY, JSON.stringify({ hash: history.meta.hash, series: history.series }));
+            } catch {
+                // storage full or disabled — the series still renders
+            }
+            return history.series;
+        });
+};
+
 export default function LenderMediatedDashboard() {
     const [data, setData] = useState(null);
+    const [trendSeries, setTrendSeries] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [activeTab, setActiveTab] = useState('summary');
@@ -414,7 +442,12 @@ export default function LenderMediatedDashboard() {
                 if (!res.ok) throw new Error('Failed to load data');
                 return res.json();
             })
-            .then(setData)
+            .then(json => {
+                setData(json);
+                loadTrendSeries(json?.meta?.history_hash)
+                    .then(setTrendSeries)
+                    .catch(() => setTrendSeries([]));
+            })
             .catch(err => setError(err.message))
             .finally(() => setLoading(false));
     }, []);
@@ -502,47 +535,7 @@ export default function LenderMediatedDashboard() {
                             <div className="h-[300px] w-full">
                                 <ResponsiveContainer width="100%" height="100%">
                                     <LineChart
-                                        data={[
-                                            { date: '04-2020', value: 220 },
-                                            { date: '06-2020', value: 245 },
-                                            { date: '08-2020', value: 325 },
-                                            { date: '10-2020', value: 230 },
-                                            { date: '12-2020', value: 185 },
-                                            { date: '03-2021', value: 160 },
-                                            { date: '04-2021', value: 135 },
-                                            { date: '06-2021', value: 148 },
-                                            { date: '08-2021', value: 140 },
-                                            { date: '10-2021', value: 180 },
-                                            { date: '12-2021', value: 155 },
-                                            { date: '03-2022', value: 125 },
-                                            { date: '04-2022', value: 160 },
-                                            { date: '06-2022', value: 175 },
-                                            { date: '08-2022', value: 230 },
-                                            { date: '10-2022', value: 255 },
-                                            { date: '12-2022', value: 220 },
-                                            { date: '03-2023', value: 190 },
-                                            { date: '04-2023', value: 150 },
-                                            { date: '06-2023', value: 185 },
-                                            { date: '08-2023', value: 190 },
-                                            { date: '10-2023', value: 210 },
-                                            { date: '12-2023', value: 225 },
-                                            { date: '03-2024', value: 205 },
-                                            { date: '04-2024', value: 190 },
-                                            { date: '06-2024', value: 220 },
-                                            { date: '08-2024', value: 275 },
-                                            { date: '10-2024', value: 305 },
-                                            { date: '12-2024', value: 220 },
-                                            { date: '03-2025', value: 280 },
-                                            { date: '04-2025', value: 310 },
-                                            { date: '06-2025', value: 325 },
-                                            { date: '08-2025', value: 348 },
-                                            { date: '10-2025', value: 300 },
-                                            { date: '12-2025', value: 270 },
-                                            { date: '03-2026', value: 263 },
-                                            { date: '04-2026', value: 339 },
-                                            { date: '05-2026', value: 359 },
-                                            { date: '06-2026', value: 338 },
-                                        ]}
+                                        data={trendSeries}
                                         margin={{ top: 5, right: 30, left: 20, bottom: 5 }}
                                     >
                                         <CartesianGrid strokeDasharray="3 3" stroke="#334155" opacity={0.5} />
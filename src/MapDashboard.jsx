@@ -3,6 +3,7 @@ import { MapContainer, TileLayer, GeoJSON, useMap } from 'react-leaflet';
 import L from 'leaflet';
 import { Map, Home, TrendingUp, TrendingDown, DollarSign, X, Filter, Layers, ArrowLeft } from 'lucide-react';
 import { regions } from './sdarData';
+import { topoFeatures } from './utils/topojson';
 
 // San Diego County coordinates - simple arrays for reliable production builds
 const SD_CENTER = [32.83, -117.05];
@@ -234,11 +235,11 @@ export default function MapDashboard({ setActiveView }) {
         const fetchData = async () => {
             try {
                 const [geoRes, dataRes] = await Promise.all([
-                    fetch('/data/sd_zipcodes.json'),
+                    fetch('/data/sd_zipcodes.topo.json'),
                     fetch('/data/sdar_neighborhood_data.json')
                 ]);
 
-                const geo = await geoRes.json();
+                const geo = topoFeatures(await geoRes.json(), 'zipcodes');
                 const data = await dataRes.json();
 
                 setGeoData(geo);
@@ -52,6 +52,23 @@ const CANDIDATE_PARTIES = {
     'Hoefling': 'Other', // American Independent
 };
 
+// Expand a columnar precinct shard (see scripts/voting_store.py) into row objects
+// plus a zip -> rows lookup for the sub-area table.
+function decodePrecinctShard(shard) {
+    const rows = shard.precinct.map((precinct, i) => {
+        const row = { precinct, total: shard.total[i], city: shard.cities[shard.city[i]] };
+        shard.candidates.forEach((name, k) => {
+            if (shard.votes[k][i]) row[name] = shard.votes[k][i];
+        });
+        return row;
+    });
+    const byZip = {};
+    for (const [zip, idx] of Object.entries(shard.zips || {})) {
+        byZip[zip] = idx.map(i => rows[i]);
+    }
+    return { rows, byZip };
+}
+
 function formatNumber(num) {
     if (num >= 1000000) return `${(num / 1000000).toFixed(2)}M`;
     if (num >= 1000) return `${(num / 1000).toFixed(0)}K`;
@@ -255,16 +272,14 @@ function CityResults({ cities, selectedYear }) {
 }
 
 // Sub-Area (Precinct) Details
-function SubAreaDetails({ precinctIds, allPrecincts, selectedYear }) {
+function SubAreaDetails({ zipPrecincts, selectedYear }) {
     const [expanded, setExpanded] = useState(false);
 
     // Sort precincts by total votes desc
     const precincts = useMemo(() => {
-        if (!precinctIds || !allPrecincts) return [];
-        return allPrecincts
-            .filter(p => precinctIds.includes(p.precinct))
-            .sort((a, b) => b.total - a.total);
-    }, [precinctIds, allPrecincts]);
+        if (!zipPrecincts) return [];
+        return [...zipPrecincts].sort((a, b) => b.total - a.total);
+    }, [zipPrecincts]);
 
     if (!precincts.length) return null;
 
@@ -342,6 +357,7 @@ function SubAreaDetails({ precinctIds, allPrecincts, selectedYear }) {
 
 export default function VotingDashboard() {
     const [votingData, setVotingData] = useState(null);
+    const [precinctShards, setPrecinctShards] = useState({}); // year -> decoded shard
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [selectedYear, setSelectedYear] = useState('2024');
@@ -351,7 +367,8 @@ export default function VotingDashboard() {
     useEffect(() => {
         async function fetchData() {
             try {
-                const response = await fetch(`/data/voting_data.json?v=${Date.now()}`);
+                // Small index; revalidated rather than cache-busted. Shard names are content-hashed.
+                const response = await fetch('/data/voting/index.json', { cache: 'no-cache' });
                 if (!response.ok) throw new Error('Failed to load voting data');
                 const data = await response.json();
                 setVotingData(data);
@@ -364,6 +381,23 @@ export default function VotingDashboard() {
         fetchData();
     }, []);
 
+    // Precinct detail is only fetched for the election being viewed
+    const shardName = votingData?.elections?.[selectedYear]?.precinct_shard;
+    useEffect(() => {
+        if (!shardName || precinctShards[selectedYear]) return;
+        let cancelled = false;
+        fetch(`/data/voting/${shardName}`)
+            .then(res => {
+                if (!res.ok) throw new Error('Failed to load precinct detail');
+                return res.json();
+            })
+            .then(shard => {
+                if (!cancelled) setPrecinctShards(prev => ({ ...prev, [selectedYear]: decodePrecinctShard(shard) }));
+            })
+            .catch(err => console.warn(err.message));
+        return () => { cancelled = true; };
+    }, [shardName, selectedYear, precinctShards]);
+
     // Reset selection only when switching view mode (not when changing year)
     useEffect(() => {
         setSelectedLocation('all');
@@ -454,7 +488,8 @@ export default function VotingDashboard() {
     const repPct = displayData?.candidates?.[repCandidate]?.percentage || 0;
 
     // Determine if sub-area details should be shown
-    const showSubAreas = viewMode === 'zip' && selectedLocation !== 'all' && displayData?.precinct_ids;
+    const zipPrecincts = precinctShards[selectedYear]?.byZip?.[selectedLocation];
+    const showSubAreas = viewMode === 'zip' && selectedLocation !== 'all' && zipPrecincts;
 
     return (
         <div className="min-h-screen bg-gradient-to-br from-slate-950 via-slate-900 to-slate-950 text-white">
@@ -598,8 +633,7 @@ export default function VotingDashboard() {
 
                 {showSubAreas && (
                     <SubAreaDetails
-                        precinctIds={displayData.precinct_ids}
-                        allPrecincts={currentData.precincts}
+                        zipPrecincts={zipPrecincts}
                         selectedYear={selectedYear}
                     />
                 )}
@@ -51,6 +51,17 @@ const CATEGORY_ICONS = {
 };
 
 
+// Expand the compact neighborhood records (count vectors aligned with the
+// index's category dictionary) back into per-category objects
+function decodeNeighborhoods(categories, records) {
+    return records.map(({ counts = [], new_openings = [], ...rest }) => ({
+        ...rest,
+        categories: Object.fromEntries(categories.map(({ key, label, icon }, i) => [
+            key,
+            { count: counts[i] || 0, label, icon, new_openings: new_openings[i] || 0 },
+        ])),
+    }));
+}
 
 // Momentum / Trend Card
 function NeighborhoodCard({ neighborhood, filterCategory = 'all' }) {
@@ -259,9 +270,17 @@ export function RetailSignals({ className = "" }) {
     useEffect(() => {
         const fetchData = async () => {
             try {
-                // Add cache-busting to ensure we get the latest data
-                const res = await fetch(`/data/retail_data.json?t=${Date.now()}`);
-                if (res.ok) setRetailData(await res.json());
+                // The small index is revalidated; the table it names is content-hashed
+                const res = await fetch('/data/retail/index.json', { cache: 'no-cache' });
+                if (!res.ok) return;
+                const index = await res.json();
+                const tableRes = await fetch(`/data/retail/${index.neighborhoods}`);
+                if (!tableRes.ok) return;
+                const table = await tableRes.json();
+                setRetailData({
+                    ...index,
+                    neighborhoods: decodeNeighborhoods(index.categories, table.neighborhoods),
+                });
             } catch (err) {
                 console.error('Data fetch error:', err);
             } finally {
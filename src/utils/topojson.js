@@ -0,0 +1,47 @@
+// Minimal TopoJSON -> GeoJSON decoder for the quantized Polygon/MultiPolygon
+// topologies written by scripts/build_zip_geometry.py (covers what we emit,
+// so the map does not need the topojson-client package).
+
+function decodeArcs(topology) {
+    const [kx, ky] = topology.transform.scale;
+    const [dx, dy] = topology.transform.translate;
+    return topology.arcs.map((arc) => {
+        let x = 0;
+        let y = 0;
+        return arc.map(([ax, ay]) => {
+            x += ax;
+            y += ay;
+            return [x * kx + dx, y * ky + dy];
+        });
+    });
+}
+
+export function topoFeatures(topology, objectName) {
+    const arcs = decodeArcs(topology);
+
+    // Arc i is used as-is, ~i reversed; each arc after the first repeats the
+    // previous arc's last point, so that point is skipped.
+    const ring = (indexes) => {
+        const points = [];
+        indexes.forEach((i, k) => {
+            const arc = i < 0 ? arcs[~i].slice().reverse() : arcs[i];
+            points.push(...(k === 0 ? arc : arc.slice(1)));
+        });
+        return points;
+    };
+
+    const geometries = topology.objects[objectName]?.geometries || [];
+    return {
+        type: 'FeatureCollection',
+        features: geometries.map((g) => ({
+            type: 'Feature',
+            properties: g.properties || {},
+            geometry: {
+                type: g.type,
+                coordinates: g.type === 'Polygon'
+                    ? g.arcs.map(ring)
+                    : g.arcs.map((polygon) => polygon.map(ring)),
+            },
+        })),
+    };
+}